@@ -1,7 +1,32 @@
-from .multi_agent import MultiAgent
-from .greeting_agent import GreetingAgent
-from .user_agent import UserAgent
-from .helpline_agent import HelplineAgent
-from .main_agent import MainAgent
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .multi_agent import MultiAgent
+    from .greeting_agent import GreetingAgent
+    from .user_agent import UserAgent
+    from .helpline_agent import HelplineAgent
+    from .main_agent import MainAgent
+
+# Agent classes are imported on first access, so importing ``app.agents`` does not
+# pull in every agent module (and their plugin/MCP dependencies) up front.
+AGENT_MODULES = {
+    "MultiAgent": ".multi_agent",
+    "GreetingAgent": ".greeting_agent",
+    "UserAgent": ".user_agent",
+    "HelplineAgent": ".helpline_agent",
+    "MainAgent": ".main_agent",
+}
 
 __all__ = ["MultiAgent", "GreetingAgent", "UserAgent", "HelplineAgent", "MainAgent"]
+
+
+def __getattr__(name: str) -> Any:
+    module = AGENT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
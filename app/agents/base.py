@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterable
+
+from livekit import rtc
+from livekit.agents import Agent, FunctionTool, ModelSettings, stt
+from livekit.agents.llm import ChatChunk, ChatContext
+
+from app.capacity import track_stream
+from app.context import ContextCompactor
+from app.security import StreamingGuard, refusal_message, report_sensitive_attempt
+
+
+class BankAgent(Agent):
+    """Base for the bank agents: bounds the prompt, checks the LLM stream for secrets before TTS
+    and counts open STT/TTS streams for capacity reporting."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.context_compactor = ContextCompactor.from_settings()
+
+    async def llm_node(
+        self,
+        chat_ctx: ChatContext,
+        tools: list[FunctionTool],
+        model_settings: ModelSettings,
+    ) -> AsyncIterable[ChatChunk | str]:
+        # Long helpline calls would otherwise resend the whole history on every turn
+        chat_ctx = self.context_compactor.compact(chat_ctx, self.session.llm)
+        guard = StreamingGuard()
+        async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+            if isinstance(chunk, str):
+                content, passthrough = chunk, None
+            else:
+                delta = chunk.delta
+                content = delta.content if delta is not None else None
+                # Tool calls and usage still flow through; only the spoken text is held back
+                passthrough = chunk
+                if content:
+                    passthrough = chunk.model_copy(update={"delta": delta.model_copy(update={"content": None})})
+                    if not passthrough.delta.tool_calls and passthrough.usage is None:
+                        passthrough = None
+
+            if content:
+                safe = guard.feed(content)
+                if safe is None:
+                    report_sensitive_attempt(getattr(self.session.userdata, "user_id", None), guard.keyword or "")
+                    yield refusal_message()
+                    return
+                if safe:
+                    yield safe
+            if passthrough is not None:
+                yield passthrough
+
+        rest = guard.flush()
+        if rest is None:
+            report_sensitive_attempt(getattr(self.session.userdata, "user_id", None), guard.keyword or "")
+            yield refusal_message()
+        elif rest:
+            yield rest
+
+    async def stt_node(
+        self, audio: AsyncIterable[rtc.AudioFrame], model_settings: ModelSettings
+    ) -> AsyncIterable[stt.SpeechEvent | str]:
+        # The audio controller measures input SNR on the frames on their way to STT
+        controller = getattr(self.session.userdata, "audio_controller", None)
+        if controller is not None:
+            audio = controller.tap(audio)
+        with track_stream("stt"):
+            async for event in Agent.default.stt_node(self, audio, model_settings):
+                yield event
+
+    async def tts_node(self, text: AsyncIterable[str], model_settings: ModelSettings) -> AsyncIterable[rtc.AudioFrame]:
+        with track_stream("tts"):
+            async for frame in Agent.default.tts_node(self, text, model_settings):
+                yield frame
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
-from loguru import logger
-from livekit.agents import Agent, RunContext, function_tool, JobContext
+import time
+from typing import AsyncIterable
 
+from loguru import logger
+from livekit.agents import Agent, FunctionTool, JobContext, ModelSettings, RunContext, StopResponse, function_tool
+from livekit.agents.llm import ChatChunk, ChatContext, ChatMessage
+
+from app import log
+from app.agents.base import BankAgent
+from app.flow import get_flow
+from app.instructions import session_chat_ctx
+from app.instrumentation import record_stage
 from app.state import SessionState
+from app.scripted import say_scripted
+from app.security import refusal_message
+from app.semantic_cache import get_semantic_cache, is_cacheable_answer, is_cacheable_question
+from app.tool_cache import get_tool_cache
 
 HELPLINE_INSTRUCTIONS = (
     "You're a human customer support specialist at the bank.\n\n"
@@ -28,68 +41,108 @@ HELPLINE_INSTRUCTIONS = (
     "- Listen for phrases like 'that's all', 'thanks bye', 'end session'\n"
 )
 
+HELPLINE_WELCOME = "Hi there! I'm one of our customer support specialists. What can I help you with today?"
+HELPLINE_WELCOME_BACK = "Welcome back! Let's pick up where we left off. What else can I help you with?"
+HELPLINE_FALLBACK_WELCOME = "Hello! How can I help you?"
+HELPLINE_FAREWELL = "Thanks for banking with us! Have a wonderful day. Goodbye!"
 
-class HelplineAgent(Agent):
-    def __init__(self, job_context: JobContext, extra_instructions: str = "") -> None:
-        self.job_context = job_context
-        logger.info("DEBUG - HelplineAgent.__init__ called")
-        logger.info(f"DEBUG - extra_instructions: '{extra_instructions}'")
 
-        instructions = HELPLINE_INSTRUCTIONS + "\n" + extra_instructions
-        logger.info(f"DEBUG - Final instructions length: {len(instructions)}")
+class HelplineAgent(BankAgent):
+    INSTRUCTIONS = HELPLINE_INSTRUCTIONS
+
+    def __init__(self, job_context: JobContext, session_info: str = "") -> None:
+        self.job_context = job_context
+        # (question, turn end time) for a general question the LLM is about to answer
+        self._cache_candidate: tuple[str, float] | None = None
+        log.debug("HelplineAgent created | session_info_len={}", len(session_info))
 
-        super().__init__(instructions=instructions)
-        logger.info("DEBUG - HelplineAgent.__init__ completed")
+        super().__init__(instructions=self.INSTRUCTIONS, chat_ctx=session_chat_ctx(session_info))
 
     async def on_enter(self) -> None:
-        logger.info("DEBUG - HelplineAgent.on_enter() called")
-
         try:
             # Set session state
-            logger.info("DEBUG - Setting session state to HELPLINE")
             self.session.userdata.state = SessionState.HELPLINE
-            logger.info(f"DEBUG - Session state set to: {self.session.userdata.state}")
-
-            # Check session data
-            logger.info(
-                f"DEBUG - Session userdata.user_name: '{getattr(self.session.userdata, 'user_name', 'NOT_SET')}'"
-            )
-            logger.info(
-                f"DEBUG - Session userdata.user_id: '{getattr(self.session.userdata, 'user_id', 'NOT_SET')}'"
+            log.debug(
+                "HelplineAgent entered | user_id={} has_name={}",
+                lambda: self.session.userdata.user_id,
+                lambda: bool(self.session.userdata.user_name),
             )
 
-            # Prepare welcome message
-            welcome = "Hi there! I'm one of our customer support specialists. What can I help you with today?"
-            logger.info(f"DEBUG - Welcome message prepared: '{welcome}'")
+            # Speak the reply
+            resumed, self.session.userdata.resumed = self.session.userdata.resumed, False
+            await say_scripted(self, HELPLINE_WELCOME_BACK if resumed else HELPLINE_WELCOME)
 
-            # Generate the reply
-            logger.info("DEBUG - About to call generate_reply()")
-            result = await self.session.generate_reply(instructions=welcome)
-            logger.info(f"DEBUG - generate_reply() completed with result: {result}")
-
-            logger.info("DEBUG - HelplineAgent.on_enter() completed successfully")
-
-        except Exception as e:
-            logger.error(f"ERROR - Exception in HelplineAgent.on_enter(): {e}")
-            logger.exception("Full exception traceback:")
+        except Exception:
+            logger.exception("Exception in HelplineAgent.on_enter()")
 
             # Fallback attempt
             try:
-                logger.info("DEBUG - Attempting fallback welcome message")
-                await self.session.generate_reply(
-                    instructions="Hello! How can I help you?"
-                )
-                logger.info("DEBUG - Fallback message sent successfully")
+                await say_scripted(self, HELPLINE_FALLBACK_WELCOME)
             except Exception as fallback_error:
-                logger.error(f"ERROR - Even fallback failed: {fallback_error}")
+                logger.error("Helpline fallback welcome failed: {}", fallback_error)
+
+    def _personal_terms(self) -> tuple[str | None, ...]:
+        userdata = self.session.userdata
+        return (userdata.user_name, userdata.user_id)
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Answer a general question from the semantic cache, skipping the LLM turn."""
+        self._cache_candidate = None
+        cache = get_semantic_cache()
+        question = new_message.text_content or ""
+        if cache is None or not is_cacheable_question(question, self._personal_terms()):
+            return
+
+        started = time.perf_counter()
+        entry = cache.lookup(question)
+        if entry is None:
+            record_stage("semantic_cache_miss", time.perf_counter() - started)
+            self._cache_candidate = (question, started)
+            return
+        # Hits are recorded as the LLM wait they saved; hit rate is hits over hits plus misses
+        record_stage("semantic_cache_hit", entry.cost)
+        log.debug("Semantic cache hit | cached_question={!r}", entry.question)
+        self.session.say(entry.answer)
+        raise StopResponse()
+
+    async def llm_node(
+        self,
+        chat_ctx: ChatContext,
+        tools: list[FunctionTool],
+        model_settings: ModelSettings,
+    ) -> AsyncIterable[ChatChunk | str]:
+        candidate, self._cache_candidate = self._cache_candidate, None
+        parts: list[str] = []
+        first_text: float | None = None
+        async for chunk in super().llm_node(chat_ctx, tools, model_settings):
+            if candidate is not None:
+                if isinstance(chunk, str):
+                    parts.append(chunk)
+                    first_text = first_text or time.perf_counter()
+                elif chunk.delta is not None and chunk.delta.tool_calls:
+                    # Answers built from tool results may hold account data
+                    candidate = None
+            yield chunk
+
+        cache = get_semantic_cache()
+        answer = "".join(parts)
+        if cache is None or candidate is None or first_text is None:
+            return
+        if answer == refusal_message() or not is_cacheable_answer(answer, self._personal_terms()):
+            return
+        question, asked_at = candidate
+        cache.put(question, answer, cost=first_text - asked_at)
+        cache.schedule_save()
 
     @function_tool
     async def end_session(self, context: RunContext) -> tuple[Agent, str]:
         """End the customer session"""
-        logger.info("DEBUG - end_session() called")
-        from app.agents.multi_agent import MultiAgent
+        log.debug("end_session called")
 
         try:
+            # Drop cached account data before the user is forgotten
+            get_tool_cache().invalidate_user(getattr(self.session.userdata, "user_id", None))
+
             # Reset userdata properly
             if hasattr(self.session.userdata, "user_name"):
                 self.session.userdata.user_name = None
@@ -97,32 +150,28 @@ class HelplineAgent(Agent):
                 self.session.userdata.user_id = None
             if hasattr(self.session.userdata, "is_authenticated"):
                 self.session.userdata.is_authenticated = False
+            if hasattr(self.session.userdata, "prefetched"):
+                self.session.userdata.prefetched.clear()
 
             self.session.userdata.state = SessionState.UNAUTHORIZED
-            logger.info("DEBUG - Session data cleared")
+            log.debug("Session data cleared")
 
-            farewell = "Thanks for banking with us! Have a wonderful day. Goodbye!"
-            logger.info(f"DEBUG - Farewell message: '{farewell}'")
+            await say_scripted(self, HELPLINE_FAREWELL)
 
-            await self.session.generate_reply(instructions=farewell)
-            logger.info("DEBUG - Farewell message sent successfully")
-
-            return (
-                MultiAgent(
-                    job_context=self.job_context,
-                    user_name=self.session.userdata.user_name,
-                    user_id=self.session.userdata.user_id,
-                ),
-                "Session ended successfully",
-            )
+            return self._restart(), "Session ended successfully"
 
         except Exception as e:
-            logger.error(f"ERROR - Exception in end_session(): {e}")
+            logger.error("Exception in end_session(): {}", e)
             return (
-                MultiAgent(
-                    job_context=self.job_context,
-                    user_name=self.session.userdata.user_name,
-                    user_id=self.session.userdata.user_id,
-                ),
+                self._restart(),
                 "Sorry, I encountered an error while trying to end the session. Please try again later.",
             )
+
+    def _restart(self) -> Agent:
+        return get_flow().handoff(
+            self,
+            "end_session",
+            job_context=self.job_context,
+            user_name=self.session.userdata.user_name,
+            user_id=self.session.userdata.user_id,
+        )
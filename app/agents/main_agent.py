@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import time
+
 from loguru import logger
 from livekit.agents import (
     Agent,
@@ -10,10 +12,25 @@ from livekit.agents import (
     AudioConfig,
     BuiltinAudioClip,
     JobContext,
+    StopResponse,
 )
+from livekit.agents.llm import ChatContext, ChatMessage
 
+from app import intents
+from app.agents.base import BankAgent
+from app.config import get_settings
+from app.flow import get_flow
+from app.instructions import session_chat_ctx, session_facts
+from app.instrumentation import record_stage
 from app.state import SessionState
-from app.agents.helpline_agent import HelplineAgent
+from app.prefetch import prefetched_context, start_prefetch
+from app.scripted import say_scripted
+
+WELCOME_WITH_NAME = "You have successfully authenticated, {name}. How can I help you with your account today?"
+WELCOME_ANONYMOUS = "You have successfully authenticated. How can I help you with your account today?"
+WELCOME_BACK_WITH_NAME = "Welcome back, {name}. What else can I help you with on your account?"
+WELCOME_BACK_ANONYMOUS = "Welcome back. What else can I help you with on your account?"
+HELPLINE_HANDOFF = "Alright {name}, let me get you over to one of our specialists."
 
 MAIN_INSTRUCTIONS = (
     "You're a helpful bank representative assisting customers with their account information.\n\n"
@@ -58,41 +75,84 @@ MAIN_INSTRUCTIONS = (
 )
 
 
-class MainAgent(Agent):
-    def __init__(self, job_context: JobContext, extra_instructions: str = "") -> None:
+class MainAgent(BankAgent):
+    INSTRUCTIONS = MAIN_INSTRUCTIONS
+
+    def __init__(self, job_context: JobContext, session_info: str = "") -> None:
         self.job_context = job_context
-        instructions = MAIN_INSTRUCTIONS + "\n" + extra_instructions
-        super().__init__(instructions=instructions)
+        super().__init__(instructions=self.INSTRUCTIONS, chat_ctx=session_chat_ctx(session_info))
 
     async def on_enter(self) -> None:
         self.session.userdata.state = SessionState.MAIN
 
         logger.info(f"MainAgent entered for user: {self.session.userdata.user_name}")
 
-        # Simple success message
-        user_name = self.session.userdata.user_name
-        if user_name:
-            welcome = f"You have successfully authenticated, {user_name}. How can I help you with your account today?"
+        # Look up the account while the welcome is being spoken
+        prefetch = start_prefetch(self.session.userdata)
+
+        # Simple success message, or a welcome back when a dropped call was resumed
+        userdata = self.session.userdata
+        user_name = userdata.user_name
+        resumed, userdata.resumed = userdata.resumed, False
+        if resumed:
+            welcome = WELCOME_BACK_WITH_NAME if user_name else WELCOME_BACK_ANONYMOUS
         else:
-            welcome = "You have successfully authenticated. How can I help you with your account today?"
+            welcome = WELCOME_WITH_NAME if user_name else WELCOME_ANONYMOUS
+        await say_scripted(self, welcome, name=user_name)
+
+        if prefetch is not None:
+            await self._inject_prefetched(prefetch)
+
+    async def _inject_prefetched(self, prefetch: asyncio.Task[dict[str, str]]) -> None:
+        try:
+            prefetched = await prefetch
+        except Exception as e:
+            logger.warning("Account prefetch failed: {}", e)
+            return
+        if not prefetched:
+            return
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.add_message(role="system", content=prefetched_context(prefetched))
+        await self.update_chat_ctx(chat_ctx)
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Answer a plain account lookup from a template, skipping both LLM turns."""
+        settings = get_settings()
+        if not settings.intent_router:
+            return
+        intent = intents.classify(new_message.text_content or "", settings.intent_max_words)
+        if intent is None:
+            return
 
-        await self.session.generate_reply(instructions=f"{welcome}")
+        started = time.perf_counter()
+        try:
+            reply = await intents.answer(intent, self.session.userdata)
+        except Exception as e:
+            logger.warning("Intent {} lookup failed, falling back to the LLM: {}", intent.name, e)
+            return
+        if reply is None:
+            return
+        record_stage("intent_answer", time.perf_counter() - started)
+        logger.info("Answered {} locally for {}", intent.name, self.session.userdata.user_name)
+        self.session.say(reply)
+        raise StopResponse()
 
     @function_tool
     async def switch_to_helpline(self, context: RunContext) -> tuple[Agent, str]:
         """Connect customer to human support"""
         userdata = self.session.userdata
 
-        helpline_context = (
-            f"You're a human support specialist helping {userdata.user_name}. "
-            f"Their account ID is {userdata.user_id}. "
-            "Be helpful and professional. Talk naturally like a real person. "
-            "If they want to end the call, use the end_session function. "
-            "Never use special formatting or mention technical processes."
+        helpline_context = session_facts(
+            f"You're a human support specialist helping {userdata.user_name}.",
+            f"Their account ID is {userdata.user_id}.",
+            "Be helpful and professional. Talk naturally like a real person.",
+            "If they want to end the call, use the end_session function.",
+            "Never use special formatting or mention technical processes.",
         )
 
         # First send the connecting message
-        await self.session.generate_reply(
-            instructions=f"Alright {userdata.user_name}, let me get you over to one of our specialists."
+        await say_scripted(self, HELPLINE_HANDOFF, name=userdata.user_name)
+        helpline = get_flow().handoff(
+            self, "switch_to_helpline", job_context=self.job_context, session_info=helpline_context
         )
-        return HelplineAgent(job_context= self.job_context, extra_instructions=helpline_context), ""
+        return helpline, ""
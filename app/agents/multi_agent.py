@@ -1,15 +1,32 @@
 from __future__ import annotations
 
 import re
+import time
+
 from loguru import logger
-from livekit.agents import Agent, RunContext, function_tool, JobContext
+from livekit.agents import Agent, RunContext, function_tool, JobContext, StopResponse
+from livekit.agents.llm import ChatContext, ChatMessage
 
+from app.agents.base import BankAgent
+from app.config import get_settings
+from app.flow import get_flow
+from app.instructions import session_chat_ctx, session_facts
+from app.mcp_server import result_text
+from app.otp import auth_result, extract_otp
 from app.state import ConversationContext, SessionState
-from app.agents.main_agent import MainAgent
+from app.scripted import say_scripted
 
 USER_ID_REGEX = re.compile(r"^u\d{3}$")
 OTP_REGEX = re.compile(r"^\d{4}$")
 
+GREETING_WITH_NAME = "Hey {name}! I'll need your four-digit security OTP code to get you into your account."
+GREETING_ANONYMOUS = "Hello! Please give me your four-digit security code so I can help you access your account."
+OTP_RETRY = "Hmm, that code didn't match. Could you read me the four digits again?"
+OTP_LOCKED = (
+    "That code didn't match either, so to keep your account safe I'll end the call here. "
+    "Please call back once you have a new code."
+)
+
 AUTHENTICATION_INSTRUCTIONS = (
     "ROLE:\n"
     "You are a friendly bank representative verifying a customer's 4-digit security OTP code.\n"
@@ -42,7 +59,9 @@ AUTHENTICATION_INSTRUCTIONS = (
 )
 
 
-class MultiAgent(Agent):
+class MultiAgent(BankAgent):
+    INSTRUCTIONS = AUTHENTICATION_INSTRUCTIONS
+
     def __init__(
         self,
         job_context: JobContext,
@@ -53,46 +72,85 @@ class MultiAgent(Agent):
         self.user_name = user_name
         self.user_id = user_id
 
-        session_context = (
-            f"\nCRITICAL SESSION INFO:\n"
-            f"The user's name is: {self.user_name}\n"
-            f"The user's ID is: {self.user_id}\n"
-            f"IMPORTANT: When calling authenticate_user, you MUST use user_id='{self.user_id}' EXACTLY as written.\n"
-            f"DO NOT change or modify this ID. DO NOT add letters. Use the exact number: {self.user_id}\n"
+        facts = session_facts(
+            f"The user's name is: {self.user_name}",
+            f"The user's ID is: {self.user_id}",
+            f"IMPORTANT: When calling authenticate_user, you MUST use user_id='{self.user_id}' EXACTLY as written.",
+            f"DO NOT change or modify this ID. DO NOT add letters. Use the exact number: {self.user_id}",
         )
 
-        super().__init__(instructions=AUTHENTICATION_INSTRUCTIONS + session_context)
+        super().__init__(instructions=self.INSTRUCTIONS, chat_ctx=session_chat_ctx(facts))
 
     async def on_enter(self) -> None:
         self.session.userdata.state = SessionState.AUTHENTICATING
         self.session.userdata.user_name = self.user_name
         self.session.userdata.user_id = self.user_id
 
-        # Direct, natural greeting
-        if self.user_name:
-            greeting = f"Hey {self.user_name}! I'll need your four-digit security OTP code to get you into your account."
-        else:
-            greeting = "Hello! Please give me your four-digit security code so I can help you access your account."
+        # Direct, natural greeting spoken as-is, no LLM turn needed
+        greeting = GREETING_WITH_NAME if self.user_name else GREETING_ANONYMOUS
+        await say_scripted(self, greeting, name=self.user_name)
 
-        await self.session.generate_reply(instructions=f"Greeting: {greeting}")
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Verify a spoken OTP directly, skipping the authenticate_user/switch_to_main LLM turns."""
+        userdata: ConversationContext = self.session.userdata
+        settings = get_settings()
+        if userdata.auth_attempts >= settings.otp_max_attempts:
+            # Locked out and shutting down: no more guesses, through the LLM's tool call either
+            raise StopResponse()
+        if not settings.otp_fast_path or userdata.is_authenticated or userdata.mcp_server is None:
+            return
+        if not userdata.user_id or not USER_ID_REGEX.match(userdata.user_id):
+            return
 
-    @function_tool
-    async def switch_to_main(self, context: RunContext) -> tuple[Agent, str]:
-        """Switch to MainAgent after successful authentication"""
+        otp = extract_otp(new_message.text_content or "")
+        if otp is None or not OTP_REGEX.match(otp):
+            return
+
+        try:
+            result = await userdata.mcp_server.call_tool(
+                settings.otp_auth_tool, {"user_id": userdata.user_id, settings.otp_argument: otp}
+            )
+        except Exception as e:
+            logger.warning("OTP fast path failed, falling back to the LLM: {}", e)
+            return
+
+        verdict = auth_result(result, result_text(result))
+        if verdict is None:
+            # Unrecognised response shape: let the LLM read it
+            return
+
+        userdata.auth_attempts += 1
+        if verdict:
+            logger.info("OTP verified locally, switching to MainAgent for {}", userdata.user_name)
+            self.session.update_agent(self._authenticated_handoff())
+        elif userdata.auth_attempts >= settings.otp_max_attempts:
+            logger.warning("OTP failed {} times for {}, ending the session", userdata.auth_attempts, userdata.user_id)
+            say_scripted(self, OTP_LOCKED)
+            # Drain: the goodbye finishes playing before the session closes
+            self.session.shutdown(drain=True)
+        else:
+            say_scripted(self, OTP_RETRY)
+        raise StopResponse()
+
+    def _authenticated_handoff(self) -> Agent:
         userdata = self.session.userdata
         userdata.is_authenticated = True
+        userdata.authenticated_at = time.time()
 
         # Simple context without exposing user ID to user
-        main_context = (
-            f"User {userdata.user_name} is authenticated. "
-            f"Always use user_id '{userdata.user_id}' for all MCP calls. "
-            "Be helpful and conversational. No special formatting."
+        main_context = session_facts(
+            f"User {userdata.user_name} is authenticated.",
+            f"Always use user_id '{userdata.user_id}' for all MCP calls.",
+            "Be helpful and conversational. No special formatting.",
         )
+        return get_flow().handoff(self, "switch_to_main", job_context=self.job_context, session_info=main_context)
 
-        logger.info(f"Successfully switching to MainAgent for {userdata.user_name}")
+    @function_tool
+    async def switch_to_main(self, context: RunContext) -> tuple[Agent, str]:
+        """Switch to MainAgent after successful authentication"""
+        main_agent = self._authenticated_handoff()
+
+        logger.info("Successfully switching to MainAgent for {}", self.session.userdata.user_name)
 
         # Return with empty message - let MainAgent handle the greeting
-        return (
-            MainAgent(job_context=self.job_context, extra_instructions=main_context),
-            "",
-        )
+        return main_agent, ""
@@ -0,0 +1,430 @@
+"""Per-session noise cancellation and VAD sized to this host's audio CPU budget.
+
+Noise cancellation and Silero VAD run on every input frame and are the main CPU
+cost per session on a busy node. Each session gets a share of the host's audio
+budget (``AUDIO_CPU_BUDGET`` of every core, across the active sessions in the
+capacity snapshots) and the heaviest profile that fits it. Which profiles are on
+offer depends on the caller's input SNR: clean input gains nothing from noise
+cancellation and drops it whatever the budget, noisy input gives up the 16 kHz
+VAD first and never loses the lighter NC model (its floor is ``reduced``), and
+until the SNR is known the ladder is BVC, the lighter NC model, no noise
+cancellation, then an 8 kHz VAD. When the budget runs short, the
+noisiest callers are served first (see ``allocate``).
+
+The SNR that drives noise cancellation is measured on a separate, unfiltered 8 kHz
+stream of the caller's microphone; the frames reaching STT have already been
+through the filter. LiveKit applies noise cancellation inside the room's native
+audio stream, so a change rebuilds that stream (between utterances, at most every
+``_NC_SWITCH_SECONDS``). The VAD's sample rate is fixed when it is loaded, so that
+part of the profile is chosen when the session starts. The post-filter SNR retunes
+the VAD thresholds and windows. The capacity snapshot carries the tap's own cost
+and an even split of the process's CPU across its sessions; the split includes
+STT, LLM and HTTP work, so it is not the audio stages' cost.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator
+
+import numpy as np
+from livekit import rtc
+from loguru import logger
+
+from app.capacity import get_process_load, read_process_loads
+from app.config import Settings, get_settings
+from app.instrumentation import record_stage
+from app.plugins import load_plugin
+
+# SNR is the spread between loud (speech) and quiet (background) frames
+_SPEECH_PERCENTILE = 90
+_NOISE_PERCENTILE = 10
+# Frames needed before the estimate means anything: about two seconds of audio
+_MIN_FRAMES = 100
+_SILENCE_DB = -90.0
+# Input at or above CLEAN_SNR_DB needs no noise cancellation; below NOISY_SNR_DB it needs it most
+CLEAN_SNR_DB = 25.0
+NOISY_SNR_DB = 12.0
+# Rebuilding the input stream drops a few frames, so noise cancellation changes at most this often
+_NC_SWITCH_SECONDS = 30.0
+_RAW_SAMPLE_RATE = 8000
+
+# Key under JobProcess.userdata for the lazily loaded 8 kHz VAD
+VAD_8K_KEY = "vad_8k"
+
+
+class SnrMeter:
+    """Rolling SNR estimate in dB from int16 frame levels."""
+
+    def __init__(self, window: int = 500) -> None:
+        self.levels: deque[float] = deque(maxlen=window)
+        self.frames = 0
+
+    def add(self, samples: Any) -> None:
+        data = np.frombuffer(samples, dtype=np.int16)
+        if not data.size:
+            return
+        power = float(np.dot(data, data.astype(np.float64))) / data.size
+        self.levels.append(10 * np.log10(power / 32768**2) if power > 0 else _SILENCE_DB)
+        self.frames += 1
+
+    def snr(self) -> float | None:
+        if len(self.levels) < _MIN_FRAMES:
+            return None
+        speech, noise = np.percentile(np.fromiter(self.levels, float), (_SPEECH_PERCENTILE, _NOISE_PERCENTILE))
+        return float(speech - noise)
+
+
+@dataclass(frozen=True)
+class AudioProfile:
+    name: str
+    # "bvc", "nc" or "off"
+    noise_cancellation: str
+    vad_sample_rate: int
+
+    def cost(self, settings: Settings) -> float:
+        """Estimated fraction of one core per session (calibrate with benchmarks/bench_audio_budget.py)."""
+        nc = {"bvc": settings.audio_cost_bvc, "nc": settings.audio_cost_nc, "off": 0.0}[self.noise_cancellation]
+        vad = settings.audio_cost_vad if self.vad_sample_rate == 16000 else settings.audio_cost_vad_8k
+        return nc + vad
+
+
+FULL = AudioProfile("full", "bvc", 16000)
+STANDARD = AudioProfile("standard", "nc", 16000)
+REDUCED = AudioProfile("reduced", "nc", 8000)
+LIGHT = AudioProfile("light", "off", 16000)
+MINIMAL = AudioProfile("minimal", "off", 8000)
+
+# Heaviest first; a session gets the first one its CPU share covers
+PROFILES: tuple[AudioProfile, ...] = (FULL, STANDARD, LIGHT, MINIMAL)
+# Noisy callers keep noise cancellation however short the budget is
+NOISY_PROFILES: tuple[AudioProfile, ...] = (FULL, STANDARD, REDUCED)
+CLEAN_PROFILES: tuple[AudioProfile, ...] = (LIGHT, MINIMAL)
+
+
+def profiles_for(snr: float | None) -> tuple[AudioProfile, ...]:
+    if snr is None or NOISY_SNR_DB <= snr < CLEAN_SNR_DB:
+        return PROFILES
+    return CLEAN_PROFILES if snr >= CLEAN_SNR_DB else NOISY_PROFILES
+
+
+def choose_profile(
+    share: float,
+    settings: Settings | None = None,
+    snr: float | None = None,
+    vad_sample_rate: int | None = None,
+) -> AudioProfile:
+    """The heaviest profile for ``snr`` that ``share`` covers, optionally limited to a VAD rate already loaded."""
+    settings = settings or get_settings()
+    ladder = [p for p in profiles_for(snr) if vad_sample_rate is None or p.vad_sample_rate == vad_sample_rate]
+    for profile in ladder:
+        if profile.cost(settings) <= share:
+            return profile
+    return ladder[-1]
+
+
+def host_budget(settings: Settings) -> float:
+    """Audio CPU for the whole host, in fractions of one core."""
+    return settings.audio_cpu_budget * (os.cpu_count() or 1)
+
+
+def allocate(snrs: dict[str, float | None], budget: float, settings: Settings | None = None) -> dict[str, float]:
+    """Each session's share of ``budget``, given every session's input SNR (``None`` when unmeasured).
+
+    Everyone starts on the cheapest profile of their ladder; then, noisiest first, sessions
+    move up their ladder one step per round while the budget lasts. When it runs short,
+    clean callers are the ones without noise cancellation and noisy callers keep it.
+    """
+    settings = settings or get_settings()
+    ladders = {key: profiles_for(snr)[::-1] for key, snr in snrs.items()}
+    level = dict.fromkeys(snrs, 0)
+    spent = sum(ladder[0].cost(settings) for ladder in ladders.values())
+    # Unmeasured sessions rank between the noisy and the clean ones
+    unknown = (NOISY_SNR_DB + CLEAN_SNR_DB) / 2
+    order = sorted(snrs, key=lambda key: (unknown if snrs[key] is None else snrs[key], key))
+    upgraded = True
+    while upgraded:
+        upgraded = False
+        for key in order:
+            ladder, step = ladders[key], level[key]
+            if step + 1 == len(ladder):
+                continue
+            extra = ladder[step + 1].cost(settings) - ladder[step].cost(settings)
+            if spent + extra <= budget:
+                level[key], spent, upgraded = step + 1, spent + extra, True
+    return {key: ladders[key][level[key]].cost(settings) for key in snrs}
+
+
+def _read_remote_snrs(settings: Settings) -> dict[str, float | None]:
+    """Input SNR of the sessions in this host's other processes, from their snapshots."""
+    pid = os.getpid()
+    snrs: dict[str, float | None] = {}
+    for load in read_process_loads(settings.capacity_dir, settings.capacity_stale_after):
+        if load.get("pid") == pid:
+            continue
+        audio = load.get("audio", ())
+        snrs.update((entry["session"], entry.get("raw_snr_db")) for entry in audio if "session" in entry)
+        # Sessions that have not reported audio yet count as unmeasured
+        for i in range(int(load.get("sessions", 0)) - len(audio)):
+            snrs[f"{load.get('pid')}:{i}"] = None
+    return snrs
+
+
+# (monotonic time read, _read_remote_snrs()) shared by every controller in this process; the
+# tick task refreshes it off the event loop
+_remote_snrs: tuple[float, dict[str, float | None]] | None = None
+
+
+async def refresh_remote_snrs(settings: Settings) -> None:
+    """Re-read the other processes' snapshots in a thread once the cached map is a tick old."""
+    global _remote_snrs
+    now = time.monotonic()
+    if _remote_snrs is not None and now - _remote_snrs[0] < settings.audio_tick_seconds:
+        return
+    # Claim the refresh first so the other sessions' ticks keep using the current map meanwhile
+    _remote_snrs = (now, _remote_snrs[1] if _remote_snrs is not None else {})
+    _remote_snrs = (now, await asyncio.to_thread(_read_remote_snrs, settings))
+
+
+def host_snrs(settings: Settings, session_id: str) -> dict[str, float | None]:
+    """Input SNR of every active session on this host, this process's from memory and the others' from
+    the cached map (read here only when no session has refreshed it recently)."""
+    global _remote_snrs
+    pid = os.getpid()
+    if _remote_snrs is None or time.monotonic() - _remote_snrs[0] > settings.capacity_stale_after:
+        _remote_snrs = (time.monotonic(), _read_remote_snrs(settings))
+    snrs = _remote_snrs[1]
+    local = {controller.session_id: controller.raw_meter.snr() for controller in _active}
+    local.setdefault(session_id, None)
+    for i in range(get_process_load().sessions - len(local)):
+        local[f"{pid}:{i}"] = None
+    return {**snrs, **local}
+
+
+def session_share(session_id: str, settings: Settings, sessions: int | None = None) -> float:
+    """This session's share of the host audio budget; ``sessions`` stands in for the host's unmeasured sessions."""
+    if sessions is not None:
+        snrs: dict[str, float | None] = {f"other:{i}": None for i in range(sessions - 1)}
+        snrs[session_id] = None
+    else:
+        snrs = host_snrs(settings, session_id)
+    return allocate(snrs, host_budget(settings), settings)[session_id]
+
+
+@dataclass(frozen=True)
+class VadTuning:
+    activation_threshold: float
+    min_silence_duration: float
+    prefix_padding_duration: float
+
+
+def vad_tuning(snr: float | None) -> VadTuning:
+    """Stricter speech detection and longer end-of-speech windows as the input gets noisier."""
+    if snr is None or snr >= CLEAN_SNR_DB:
+        return VadTuning(0.5, 0.55, 0.5)
+    if snr >= NOISY_SNR_DB:
+        return VadTuning(0.6, 0.65, 0.5)
+    return VadTuning(0.7, 0.8, 0.6)
+
+
+def _load_vad_8k() -> Any:
+    return load_plugin("silero").VAD.load(sample_rate=8000)
+
+
+def _noise_cancellation(mode: str, prewarmed: Any) -> Any:
+    if mode == "bvc":
+        return prewarmed
+    if mode == "nc":
+        return load_plugin("noise_cancellation").NC()
+    return None
+
+
+# Controllers for sessions running in this process; the process's CPU is split between them
+_active: set[SessionAudioController] = set()
+
+
+class SessionAudioController:
+    """Chooses one session's audio profile, measures its input and CPU, and retunes its VAD and noise
+    cancellation."""
+
+    def __init__(self, session_id: str, settings: Settings | None = None, sessions: int | None = None) -> None:
+        self.session_id = session_id
+        self.settings = settings or get_settings()
+        self.share = session_share(session_id, self.settings, sessions) if self.settings.audio_adaptive else float("inf")
+        self.profile = choose_profile(self.share, self.settings)
+        # After noise cancellation (what STT and the VAD hear) and before it (what decides it)
+        self.meter = SnrMeter()
+        self.raw_meter = SnrMeter()
+        self.tuning: VadTuning | None = None
+        self.tap_seconds = 0.0
+        # Process CPU (audio, STT, LLM, HTTP) split evenly across this process's sessions
+        self.process_cpu_seconds = 0.0
+        self.process_cpu_per_frame = 0.0
+        self._vad: Any = None
+        self._prewarmed_nc: Any = None
+        self._nc: Any = None
+        self._session: Any = None
+        self._participant: rtc.RemoteParticipant | None = None
+        self._nc_switched_at = time.monotonic()
+        self._frames_marked = 0
+        self._cpu_mark = time.process_time()
+        self._task: asyncio.Task[None] | None = None
+        self._raw_task: asyncio.Task[None] | None = None
+
+    def models(self, vad: Any, noise_cancellation: Any, userdata: dict[str, Any]) -> tuple[Any, Any]:
+        """The VAD and a noise-cancellation selector for this session's profile, given the prewarmed
+        16 kHz VAD and BVC filter and the process's model cache. RoomIO calls the selector each time
+        it builds the input stream, so it always gets the current profile's filter."""
+        if self.profile.vad_sample_rate != 16000:
+            if VAD_8K_KEY not in userdata:
+                userdata[VAD_8K_KEY] = _load_vad_8k()
+            vad = userdata[VAD_8K_KEY]
+        self._vad = vad
+        self._prewarmed_nc = noise_cancellation
+        self._nc = _noise_cancellation(self.profile.noise_cancellation, noise_cancellation)
+        return vad, self.select_noise_cancellation
+
+    def select_noise_cancellation(self, params: Any) -> Any:
+        return self._nc
+
+    async def tap(self, audio: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """Pass frames through unchanged, feeding the SNR meter."""
+        async for frame in audio:
+            started = time.perf_counter()
+            self.meter.add(frame.data)
+            self.tap_seconds += time.perf_counter() - started
+            yield frame
+
+    def start(self, participant: rtc.RemoteParticipant | None = None) -> SessionAudioController:
+        _active.add(self)
+        self._cpu_mark = time.process_time()
+        self._task = asyncio.create_task(self._tick_forever(), name=f"audio_budget_{self.session_id}")
+        if participant is not None and self.settings.audio_adaptive:
+            self._participant = participant
+            self._raw_task = asyncio.create_task(self._meter_raw(participant), name=f"audio_snr_{self.session_id}")
+        logger.info(
+            "Audio profile {} | nc={} vad={}Hz share={:.3f} cores",
+            self.profile.name,
+            self.profile.noise_cancellation,
+            self.profile.vad_sample_rate,
+            self.share,
+        )
+        return self
+
+    def attach(self, session: Any) -> None:
+        """The started ``AgentSession``, whose room input is rebuilt when noise cancellation changes."""
+        self._session = session
+
+    async def _meter_raw(self, participant: rtc.RemoteParticipant) -> None:
+        stream = rtc.AudioStream.from_participant(
+            participant=participant,
+            track_source=rtc.TrackSource.SOURCE_MICROPHONE,
+            sample_rate=_RAW_SAMPLE_RATE,
+            frame_size_ms=20,
+        )
+        try:
+            async for event in stream:
+                self.raw_meter.add(event.frame.data)
+        finally:
+            await stream.aclose()
+
+    def _retune_noise_cancellation(self) -> None:
+        snr = self.raw_meter.snr()
+        if snr is None or time.monotonic() - self._nc_switched_at < _NC_SWITCH_SECONDS:
+            return
+        session, participant = self._session, self._participant
+        audio_input = session.input.audio if session is not None else None
+        # Only RoomIO's input can be rebuilt; never cut into an utterance
+        if participant is None or not hasattr(audio_input, "set_participant") or session.user_state == "speaking":
+            return
+        self.share = session_share(self.session_id, self.settings)
+        profile = choose_profile(self.share, self.settings, snr, vad_sample_rate=self.profile.vad_sample_rate)
+        if profile.noise_cancellation == self.profile.noise_cancellation:
+            return
+        logger.info(
+            "Audio profile {} -> {} for snr={:.1f}dB | nc={}",
+            self.profile.name,
+            profile.name,
+            snr,
+            profile.noise_cancellation,
+        )
+        self.profile = profile
+        self._nc = _noise_cancellation(profile.noise_cancellation, self._prewarmed_nc)
+        self._nc_switched_at = time.monotonic()
+        # Relinking the participant recreates the native stream, which asks the selector again
+        audio_input.set_participant(None)
+        audio_input.set_participant(participant.identity)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._raw_task is not None:
+            self._raw_task.cancel()
+            self._raw_task = None
+        self.tick()
+        _active.discard(self)
+        load = get_process_load()
+        load.audio = {key: value for key, value in load.audio.items() if key != self.session_id}
+        logger.info(
+            "Audio session done | profile={} process_cpu_share={:.2f}s tap={:.3f}s frames={}",
+            self.profile.name,
+            self.process_cpu_seconds,
+            self.tap_seconds,
+            self.meter.frames,
+        )
+
+    async def _tick_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.audio_tick_seconds)
+            try:
+                await refresh_remote_snrs(self.settings)
+                self.tick()
+            except Exception as e:
+                logger.warning("Audio budget tick failed: {}", e)
+
+    def tick(self) -> None:
+        cpu = time.process_time()
+        delta = (cpu - self._cpu_mark) / max(1, len(_active))
+        self._cpu_mark = cpu
+        self.process_cpu_seconds += delta
+        frames = self.meter.frames - self._frames_marked
+        self._frames_marked = self.meter.frames
+        if frames:
+            self.process_cpu_per_frame = delta / frames
+            record_stage("process_cpu_per_audio_frame", self.process_cpu_per_frame)
+
+        snr = self.meter.snr()
+        tuning = vad_tuning(snr)
+        if tuning != self.tuning and self._vad is not None and hasattr(self._vad, "update_options"):
+            self._vad.update_options(
+                activation_threshold=tuning.activation_threshold,
+                min_silence_duration=tuning.min_silence_duration,
+                prefix_padding_duration=tuning.prefix_padding_duration,
+            )
+            if self.tuning is not None:
+                logger.info("Retuned VAD for snr={:.1f}dB | {}", snr, tuning)
+            self.tuning = tuning
+        self._retune_noise_cancellation()
+        raw_snr = self.raw_meter.snr()
+
+        # Rebinding (rather than mutating) keeps the publisher thread's view consistent
+        load = get_process_load()
+        load.audio = {
+            **load.audio,
+            self.session_id: {
+                "session": self.session_id,
+                "profile": self.profile.name,
+                "noise_cancellation": self.profile.noise_cancellation,
+                "vad_sample_rate": self.profile.vad_sample_rate,
+                "snr_db": round(snr, 1) if snr is not None else None,
+                "raw_snr_db": round(raw_snr, 1) if raw_snr is not None else None,
+                "tap_seconds": round(self.tap_seconds, 3),
+                "process_cpu_share_seconds": round(self.process_cpu_seconds, 3),
+                "process_cpu_per_frame_us": round(self.process_cpu_per_frame * 1e6, 1),
+                "share": round(self.share, 3),
+            },
+        }
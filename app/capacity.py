@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Awaitable, Iterator
+
+from loguru import logger
+
+from app.config import Settings, get_settings
+
+# --- job-process side -----------------------------------------------------------------
+# Each job runs in its own process, so every process measures itself and publishes a
+# small JSON snapshot; the worker's load_fnc and the health server read them all.
+# Publishing runs on a thread started at prewarm, so idle prewarmed processes keep
+# reporting too and a missing snapshot means the process is gone.
+
+_LAG_INTERVAL = 0.1
+# Loop-lag samples kept for the reported p95: about five seconds at the interval above
+_LAG_WINDOW = 50
+
+
+class ProcessLoad:
+    """Event-loop lag, CPU and session/stream counts for the current process."""
+
+    def __init__(self) -> None:
+        self.prewarmed = False
+        self.sessions = 0
+        self.streams: Counter[str] = Counter()
+        self.lag: deque[float] = deque(maxlen=_LAG_WINDOW)
+        # Scalars derived on the event loop, so the publisher thread never iterates ``lag``
+        self.lag_p95 = 0.0
+        self.lag_max = 0.0
+        self._cpu_mark = (time.monotonic(), time.process_time())
+        self.cpu = 0.0
+        # Per-session audio profile, SNR and CPU time, keyed by session (see app.audio_budget)
+        self.audio: dict[str, dict[str, Any]] = {}
+
+    def record_lag(self, seconds: float) -> None:
+        self.lag.append(seconds)
+        ordered = sorted(self.lag)
+        self.lag_p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        self.lag_max = ordered[-1]
+
+    def sample_cpu(self) -> float:
+        """Fraction of one core used since the previous sample."""
+        wall, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._cpu_mark
+        self._cpu_mark = (wall, cpu)
+        if wall > last_wall:
+            self.cpu = (cpu - last_cpu) / (wall - last_wall)
+        return self.cpu
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "prewarmed": self.prewarmed,
+            "sessions": self.sessions,
+            "stt_streams": self.streams["stt"],
+            "tts_streams": self.streams["tts"],
+            "loop_lag_p95": self.lag_p95,
+            "loop_lag_max": self.lag_max,
+            "cpu": self.sample_cpu(),
+            "audio": list(self.audio.values()),
+        }
+
+
+_load = ProcessLoad()
+
+
+def get_process_load() -> ProcessLoad:
+    return _load
+
+
+@contextmanager
+def track_stream(kind: str) -> Iterator[None]:
+    """Count an open STT/TTS stream for as long as the block runs."""
+    _load.streams[kind] += 1
+    try:
+        yield
+    finally:
+        _load.streams[kind] -= 1
+
+
+def session_started() -> Callable[[], Awaitable[None]]:
+    """Count a session; the returned callback (a shutdown callback) uncounts it once."""
+    _load.sessions += 1
+    released = False
+
+    async def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            _load.sessions -= 1
+            await asyncio.to_thread(_write_snapshot, get_settings().capacity_dir)
+
+    return release
+
+
+def _write_snapshot(directory: str) -> None:
+    path = Path(directory) / f"{os.getpid()}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-thread temp name: the publisher thread and session shutdown can write at once
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(_load.snapshot(), separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def _publish_forever(directory: str, interval: float) -> None:
+    while True:
+        try:
+            _write_snapshot(directory)
+        except OSError as e:
+            logger.warning("Failed to publish capacity snapshot: {}", e)
+        time.sleep(interval)
+
+
+_publisher: threading.Thread | None = None
+
+
+def start_publisher(prewarmed: bool = False) -> None:
+    """Start this process's snapshot publisher thread, once."""
+    global _publisher
+    if prewarmed:
+        _load.prewarmed = True
+    if _publisher is None:
+        settings = get_settings()
+        _publisher = threading.Thread(
+            target=_publish_forever,
+            args=(settings.capacity_dir, settings.capacity_publish_interval),
+            name="capacity_publisher",
+            daemon=True,
+        )
+        _publisher.start()
+
+
+async def _sample_lag_forever() -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(_LAG_INTERVAL)
+        _load.record_lag(max(0.0, time.perf_counter() - started - _LAG_INTERVAL))
+
+
+_monitor: asyncio.Task[None] | None = None
+
+
+def ensure_monitor() -> None:
+    """Start this process's loop-lag sampler (and the publisher if prewarm did not), once."""
+    global _monitor
+    start_publisher()
+    if _monitor is None or _monitor.done():
+        _monitor = asyncio.create_task(_sample_lag_forever(), name="capacity_monitor")
+
+
+# --- worker / health side -------------------------------------------------------------
+
+
+def read_process_loads(directory: str, max_age: float) -> list[dict[str, Any]]:
+    loads = []
+    now = time.time()
+    for path in Path(directory).glob("*.json"):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if now - data.get("time", 0) > max_age:
+            # Process is gone (or wedged): its sessions no longer count
+            path.unlink(missing_ok=True)
+            continue
+        loads.append(data)
+    return loads
+
+
+def capacity_summary(loads: list[dict[str, Any]], settings: Settings | None = None) -> dict[str, Any]:
+    """Combine process snapshots into one 0..1 load figure: the worst of sessions, loop lag and CPU."""
+    settings = settings or get_settings()
+    sessions = sum(int(p.get("sessions", 0)) for p in loads)
+    lag = max((float(p.get("loop_lag_p95", 0.0)) for p in loads), default=0.0)
+    cpu = sum(float(p.get("cpu", 0.0)) for p in loads) / (os.cpu_count() or 1)
+    components = {
+        "sessions": sessions / settings.capacity_max_sessions,
+        "loop_lag": lag / (settings.capacity_max_loop_lag_ms / 1000),
+        "cpu": cpu,
+    }
+    load = min(1.0, max(components.values()))
+    audio = [session for p in loads for session in p.get("audio", ())]
+    return {
+        "load": round(load, 3),
+        "threshold": settings.capacity_load_threshold,
+        "accepting": load < settings.capacity_load_threshold,
+        "limiting": max(components, key=components.get),
+        "sessions": sessions,
+        "max_sessions": settings.capacity_max_sessions,
+        "stt_streams": sum(int(p.get("stt_streams", 0)) for p in loads),
+        "tts_streams": sum(int(p.get("tts_streams", 0)) for p in loads),
+        "loop_lag_p95_ms": round(lag * 1000, 1),
+        "cpu": round(cpu, 3),
+        "processes": len(loads),
+        "prewarmed_processes": sum(1 for p in loads if p.get("prewarmed")),
+        "audio_profiles": dict(Counter(session.get("profile", "?") for session in audio)),
+        "audio_tap_seconds": round(sum(float(session.get("tap_seconds", 0.0)) for session in audio), 3),
+    }
+
+
+class CapacityGate:
+    """``load_fnc`` and ``request_fnc`` for ``WorkerOptions``, backed by the process snapshots.
+
+    Reading the snapshot directory is cached briefly because LiveKit polls the load
+    often and admission decisions come in bursts.
+    """
+
+    def __init__(self, settings: Settings | None = None, cache_seconds: float = 0.5) -> None:
+        self.settings = settings or get_settings()
+        self.cache_seconds = cache_seconds
+        self._cached: tuple[float, dict[str, Any]] | None = None
+        # Jobs accepted but whose process has not published yet still count
+        self._recent_accepts: deque[float] = deque()
+        # LiveKit polls load_fnc from the worker loop, which doubles as a liveness heartbeat
+        self.worker: Any = None
+        self.last_polled: float | None = None
+
+    def summary(self) -> dict[str, Any]:
+        now = time.monotonic()
+        if self._cached is None or now - self._cached[0] > self.cache_seconds:
+            settings = self.settings
+            loads = read_process_loads(settings.capacity_dir, settings.capacity_stale_after)
+            self._cached = (now, capacity_summary(loads, settings))
+        while self._recent_accepts and now - self._recent_accepts[0] > self.settings.capacity_publish_interval * 2:
+            self._recent_accepts.popleft()
+        summary = self._cached[1]
+        if self._recent_accepts:
+            sessions = summary["sessions"] + len(self._recent_accepts)
+            load = max(summary["load"], min(1.0, sessions / self.settings.capacity_max_sessions))
+            summary = {**summary, "sessions": sessions, "load": round(load, 3)}
+        return summary
+
+    def load_fnc(self, worker: Any = None) -> float:
+        self.last_polled = time.monotonic()
+        if worker is not None:
+            self.worker = worker
+        return self.summary()["load"]
+
+    async def request_fnc(self, request: Any) -> None:
+        """Accept below the threshold; otherwise wait up to CAPACITY_DEFER_SECONDS, then reject.
+
+        A rejected job is offered to another worker, which is the point: better a
+        different pod than choppy audio for everyone on this one.
+        """
+        deadline = time.monotonic() + self.settings.capacity_defer_seconds
+        summary = self.summary()
+        while not summary["accepting"] and time.monotonic() < deadline:
+            await asyncio.sleep(self.cache_seconds)
+            summary = self.summary()
+        if not summary["accepting"]:
+            logger.warning(
+                "Rejecting job {} | load={} limiting={}", getattr(request, "id", "?"), summary["load"], summary["limiting"]
+            )
+            await request.reject()
+            return
+        self._recent_accepts.append(time.monotonic())
+        await request.accept()
@@ -5,6 +5,17 @@ from pydantic import BaseModel, Field
 from functools import lru_cache
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str, default: str) -> list[str]:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
 class Settings(BaseModel):
     livekit_url: str = Field(default_factory=lambda: os.getenv("LIVEKIT_URL", "wss://your-livekit-server"))
     livekit_api_key: str = Field(default_factory=lambda: os.getenv("LIVEKIT_API_KEY", ""))
@@ -14,6 +25,103 @@ class Settings(BaseModel):
     openrouter_base_url: str = Field(default_factory=lambda: os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"))
     openrouter_model: str = Field(default_factory=lambda: os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini"))
 
+    llm_api_key: str = Field(default_factory=lambda: os.getenv("LLM_API_KEY", "").strip())
+    llm_base_url: str = Field(default_factory=lambda: os.getenv("LLM_BASE_URL", "").strip())
+    llm_model: str = Field(default_factory=lambda: os.getenv("LLM_MODEL_NAME", "gpt-4o-mini").strip())
+    llm_max_connections: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_CONNECTIONS", "20")))
+    llm_max_keepalive_connections: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")))
+    llm_keepalive_expiry: float = Field(default_factory=lambda: float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120")))
+    llm_http2: bool = Field(default_factory=lambda: _env_bool("LLM_HTTP2", True))
+
+    # Routing across LLM_* and OPENROUTER_* endpoints (only when both are configured)
+    llm_hedge: bool = Field(default_factory=lambda: _env_bool("LLM_HEDGE", True))
+    llm_hedge_min_delay: float = Field(default_factory=lambda: float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.25")))
+    llm_hedge_default_delay: float = Field(default_factory=lambda: float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "1.0")))
+    llm_ewma_alpha: float = Field(default_factory=lambda: float(os.getenv("LLM_EWMA_ALPHA", "0.2")))
+    # Every Nth request goes to the runner-up first so it keeps being measured (0 disables)
+    llm_explore_every: int = Field(default_factory=lambda: int(os.getenv("LLM_EXPLORE_EVERY", "10")))
+    llm_breaker_failures: int = Field(default_factory=lambda: int(os.getenv("LLM_BREAKER_FAILURES", "3")))
+    llm_breaker_cooldown: float = Field(default_factory=lambda: float(os.getenv("LLM_BREAKER_COOLDOWN", "30")))
+
+    scripted_utterances: bool = Field(default_factory=lambda: _env_bool("SCRIPTED_UTTERANCES", True))
+    scripted_audio_cache_mb: int = Field(default_factory=lambda: int(os.getenv("SCRIPTED_AUDIO_CACHE_MB", "32")))
+
+    # Text cut into TTS chunks: an early first clause, then sentence-sized chunks (app/speech_chunker.py)
+    tts_chunking: bool = Field(default_factory=lambda: _env_bool("TTS_CHUNKING", True))
+    tts_first_chunk_min_chars: int = Field(default_factory=lambda: int(os.getenv("TTS_FIRST_CHUNK_MIN_CHARS", "20")))
+    tts_first_chunk_max_chars: int = Field(default_factory=lambda: int(os.getenv("TTS_FIRST_CHUNK_MAX_CHARS", "60")))
+    tts_chunk_min_chars: int = Field(default_factory=lambda: int(os.getenv("TTS_CHUNK_MIN_CHARS", "80")))
+    tts_chunk_max_chars: int = Field(default_factory=lambda: int(os.getenv("TTS_CHUNK_MAX_CHARS", "240")))
+    tts_normalize_numbers: bool = Field(default_factory=lambda: _env_bool("TTS_NORMALIZE_NUMBERS", True))
+    tts_digit_run_min: int = Field(default_factory=lambda: int(os.getenv("TTS_DIGIT_RUN_MIN", "5")))
+
+    # Reused answers to general helpline questions (app/semantic_cache.py)
+    semantic_cache_enabled: bool = Field(default_factory=lambda: _env_bool("SEMANTIC_CACHE", False))
+    semantic_cache_path: str = Field(
+        default_factory=lambda: os.getenv("SEMANTIC_CACHE_PATH", "/tmp/voice-agent-semantic-cache").strip()
+    )
+    semantic_cache_threshold: float = Field(default_factory=lambda: float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85")))
+    semantic_cache_ttl: float = Field(default_factory=lambda: float(os.getenv("SEMANTIC_CACHE_TTL", "86400")))
+    semantic_cache_max_entries: int = Field(default_factory=lambda: int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "512")))
+
+    mcp_server_url: str = Field(default_factory=lambda: os.getenv("MCP_SERVER_URL", "").strip())
+    mcp_cache_ttls: str = Field(
+        default_factory=lambda: os.getenv(
+            "MCP_CACHE_TTLS",
+            "get_user_info=300,get_user_contact=300,get_user_bill=60,get_user_last_login=30",
+        )
+    )
+    prefetch_enabled: bool = Field(default_factory=lambda: _env_bool("PREFETCH_ENABLED", True))
+    prefetch_tools: list[str] = Field(
+        default_factory=lambda: _env_list("PREFETCH_TOOLS", "get_user_bill,get_user_info,get_user_last_login")
+    )
+    otp_fast_path: bool = Field(default_factory=lambda: _env_bool("OTP_FAST_PATH", True))
+    otp_auth_tool: str = Field(default_factory=lambda: os.getenv("OTP_AUTH_TOOL", "authenticate_user"))
+    otp_argument: str = Field(default_factory=lambda: os.getenv("OTP_ARGUMENT", "otp"))
+    # Wrong codes before the call is ended
+    otp_max_attempts: int = Field(default_factory=lambda: int(os.getenv("OTP_MAX_ATTEMPTS", "3")))
+    # Resume dropped calls from a snapshot (app/session_store.py); empty disables it
+    session_store_url: str = Field(
+        default_factory=lambda: os.getenv("SESSION_STORE_URL", "sqlite:////tmp/voice-agent-sessions.db").strip()
+    )
+    session_auth_window: float = Field(default_factory=lambda: float(os.getenv("SESSION_AUTH_WINDOW", "300")))
+    session_history_items: int = Field(default_factory=lambda: int(os.getenv("SESSION_HISTORY_ITEMS", "12")))
+    # Template answers for plain account lookups, without an LLM turn (app/intents.py)
+    intent_router: bool = Field(default_factory=lambda: _env_bool("INTENT_ROUTER", True))
+    intent_max_words: int = Field(default_factory=lambda: int(os.getenv("INTENT_MAX_WORDS", "12")))
+    # Per-session noise cancellation and VAD sized to the host's audio CPU budget (app/audio_budget.py)
+    audio_adaptive: bool = Field(default_factory=lambda: _env_bool("AUDIO_ADAPTIVE", True))
+    audio_cpu_budget: float = Field(default_factory=lambda: float(os.getenv("AUDIO_CPU_BUDGET", "0.5")))
+    audio_cost_bvc: float = Field(default_factory=lambda: float(os.getenv("AUDIO_COST_BVC", "0.06")))
+    audio_cost_nc: float = Field(default_factory=lambda: float(os.getenv("AUDIO_COST_NC", "0.03")))
+    audio_cost_vad: float = Field(default_factory=lambda: float(os.getenv("AUDIO_COST_VAD", "0.015")))
+    audio_cost_vad_8k: float = Field(default_factory=lambda: float(os.getenv("AUDIO_COST_VAD_8K", "0.01")))
+    audio_tick_seconds: float = Field(default_factory=lambda: float(os.getenv("AUDIO_TICK_SECONDS", "2")))
+    metrics_enabled: bool = Field(default_factory=lambda: _env_bool("METRICS_ENABLED", True))
+    metrics_dir: str = Field(default_factory=lambda: os.getenv("METRICS_DIR", "/tmp/voice-agent-metrics"))
+    metrics_publish_interval: float = Field(default_factory=lambda: float(os.getenv("METRICS_PUBLISH_INTERVAL", "10")))
+    metrics_max_age: float = Field(default_factory=lambda: float(os.getenv("METRICS_MAX_AGE", "900")))
+    capacity_dir: str = Field(default_factory=lambda: os.getenv("CAPACITY_DIR", "/tmp/voice-agent-capacity"))
+    capacity_publish_interval: float = Field(default_factory=lambda: float(os.getenv("CAPACITY_PUBLISH_INTERVAL", "1")))
+    capacity_stale_after: float = Field(default_factory=lambda: float(os.getenv("CAPACITY_STALE_AFTER", "5")))
+    capacity_max_sessions: int = Field(default_factory=lambda: max(1, int(os.getenv("CAPACITY_MAX_SESSIONS", "25"))))
+    capacity_max_loop_lag_ms: float = Field(default_factory=lambda: float(os.getenv("CAPACITY_MAX_LOOP_LAG_MS", "100")))
+    capacity_load_threshold: float = Field(default_factory=lambda: float(os.getenv("CAPACITY_LOAD_THRESHOLD", "0.8")))
+    capacity_defer_seconds: float = Field(default_factory=lambda: float(os.getenv("CAPACITY_DEFER_SECONDS", "2")))
+    health_host: str = Field(default_factory=lambda: os.getenv("HEALTH_HOST", "0.0.0.0"))
+    health_port: int = Field(default_factory=lambda: int(os.getenv("HEALTH_PORT", "2000")))
+    health_heartbeat_timeout: float = Field(default_factory=lambda: float(os.getenv("HEALTH_HEARTBEAT_TIMEOUT", "15")))
+    health_startup_grace: float = Field(default_factory=lambda: float(os.getenv("HEALTH_STARTUP_GRACE", "120")))
+    context_budget_tokens: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_BUDGET_TOKENS", "2500")))
+    context_keep_turns: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_KEEP_TURNS", "4")))
+    context_tool_digest_chars: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_TOOL_DIGEST_CHARS", "200")))
+    context_summarize: bool = Field(default_factory=lambda: _env_bool("CONTEXT_SUMMARIZE", True))
+    log_level: str = Field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
+    log_json: bool = Field(
+        default_factory=lambda: _env_bool("LOG_JSON", os.getenv("ENVIRONMENT", "development").lower() == "production")
+    )
+    log_debug_sample_every: int = Field(default_factory=lambda: max(1, int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "20"))))
+
     deepgram_api_key: str = Field(default_factory=lambda: os.getenv("DEEPGRAM_API_KEY", ""))
 
     environment: str = Field(default_factory=lambda: os.getenv("ENVIRONMENT", "development"))
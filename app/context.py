@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Iterable
+
+from loguru import logger
+from livekit.agents import llm
+from livekit.agents.llm import ChatContext
+
+from app.config import get_settings
+
+# Rough English/BPE ratio; only used to compare against the budget, never billed
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+SUMMARY_INSTRUCTIONS = (
+    "Summarize this part of a bank support call in at most 80 words. "
+    "Keep amounts, dates, what the customer asked for and what was promised. "
+    "Never include passwords, PINs or codes. Plain text only."
+)
+
+
+def item_text(item: Any) -> str:
+    kind = getattr(item, "type", None)
+    if kind == "message":
+        return item.text_content or ""
+    if kind == "function_call":
+        return f"{item.name}({item.arguments})"
+    if kind == "function_call_output":
+        return item.output or ""
+    return ""
+
+
+def estimate_tokens(items: Iterable[Any]) -> int:
+    # Each item also carries a few tokens of role/framing overhead
+    return sum(len(item_text(item)) // CHARS_PER_TOKEN + 4 for item in items)
+
+
+def _is_system(item: Any) -> bool:
+    return getattr(item, "type", None) == "message" and item.role in ("system", "developer")
+
+
+def _digest(item: Any, max_chars: int) -> Any:
+    if len(item.output or "") <= max_chars:
+        return item
+    output = " ".join(item.output.split())[:max_chars].rsplit(" ", 1)[0]
+    return item.model_copy(update={"output": output + " ..."})
+
+
+class RollingSummarizer:
+    """Folds turns dropped by the compactor into a short summary, in the background.
+
+    ``submit`` never waits: if a summary is already being written the new turns are
+    picked up on a later call, and until then the reply simply goes out without them.
+    """
+
+    def __init__(self) -> None:
+        self.summary = ""
+        self._covered: set[str] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    def covers(self, item: Any) -> bool:
+        """Whether ``item`` is already folded into ``summary``."""
+        return item.id in self._covered
+
+    def submit(self, model: llm.LLM, dropped: list[Any]) -> None:
+        fresh = [
+            item
+            for item in dropped
+            if getattr(item, "type", None) == "message" and item.id not in self._covered and item_text(item)
+        ]
+        if not fresh or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._summarize(model, fresh), name="context_summary")
+
+    async def _summarize(self, model: llm.LLM, items: list[Any]) -> None:
+        transcript = "\n".join(f"{item.role}: {item_text(item)}" for item in items)
+        if self.summary:
+            transcript = f"{SUMMARY_PREFIX}{self.summary}\n{transcript}"
+        ctx = ChatContext.empty()
+        ctx.add_message(role="system", content=SUMMARY_INSTRUCTIONS)
+        ctx.add_message(role="user", content=transcript)
+        parts: list[str] = []
+        try:
+            async with model.chat(chat_ctx=ctx) as stream:
+                async for chunk in stream:
+                    if chunk.delta is not None and chunk.delta.content:
+                        parts.append(chunk.delta.content)
+        except Exception as e:
+            logger.warning("Context summarization failed: {}", e)
+            return
+        summary = "".join(parts).strip()
+        if summary:
+            self.summary = summary
+            self._covered.update(item.id for item in items)
+
+
+class ContextCompactor:
+    """Keeps the chat context sent to the LLM under a token budget.
+
+    The leading system messages stay first and untouched (they are the cacheable
+    prefix); system messages added later, such as the prefetched account context,
+    stay where they are and are never dropped. The last ``keep_turns`` user turns
+    stay verbatim, older tool outputs are cut to a short digest and, if that is not
+    enough, the oldest turns are dropped and handed to the summarizer. Turns the
+    summary already covers are sent only as the summary. The agent's own chat
+    context is never modified.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        keep_turns: int,
+        tool_digest_chars: int,
+        summarizer: RollingSummarizer | None = None,
+    ) -> None:
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.tool_digest_chars = tool_digest_chars
+        self.summarizer = summarizer
+
+    @classmethod
+    def from_settings(cls) -> ContextCompactor:
+        settings = get_settings()
+        return cls(
+            budget_tokens=settings.context_budget_tokens,
+            keep_turns=settings.context_keep_turns,
+            tool_digest_chars=settings.context_tool_digest_chars,
+            summarizer=RollingSummarizer() if settings.context_summarize else None,
+        )
+
+    def compact(self, chat_ctx: ChatContext, model: llm.LLM | None = None) -> ChatContext:
+        items = chat_ctx.items
+        lead = 0
+        while lead < len(items) and _is_system(items[lead]):
+            lead += 1
+        head, body = items[:lead], items[lead:]
+
+        # Everything from the Nth most recent user message onwards is kept verbatim
+        start = len(body)
+        turns = 0
+        for i in range(len(body) - 1, -1, -1):
+            if getattr(body[i], "role", None) == "user":
+                turns += 1
+                start = i
+                if turns >= self.keep_turns:
+                    break
+        older, recent = body[:start], body[start:]
+        if not older:
+            return chat_ctx
+
+        summarizer = self.summarizer
+        summary = summarizer.summary if summarizer is not None else ""
+        older = [
+            _digest(item, self.tool_digest_chars) if getattr(item, "type", None) == "function_call_output" else item
+            for item in older
+            if not (summary and summarizer.covers(item))
+        ]
+
+        total = estimate_tokens(head) + estimate_tokens(older) + estimate_tokens(recent)
+        if summary:
+            total += len(summary) // CHARS_PER_TOKEN + 4
+        dropped: list[Any] = []
+        for item in older:
+            if total <= self.budget_tokens:
+                break
+            if not _is_system(item):
+                dropped.append(item)
+                total -= estimate_tokens([item])
+        dropped_ids = {item.id for item in dropped}
+        older = [item for item in older if item.id not in dropped_ids]
+
+        # A call and its output go together: never send one without the other
+        kept_calls = {item.call_id for item in older if getattr(item, "type", None) == "function_call"}
+        kept_outputs = {item.call_id for item in older if getattr(item, "type", None) == "function_call_output"}
+        older = [
+            item
+            for item in older
+            if getattr(item, "type", None) not in ("function_call", "function_call_output")
+            or (item.call_id in kept_calls and item.call_id in kept_outputs)
+        ]
+
+        if dropped and summarizer is not None and model is not None:
+            summarizer.submit(model, dropped)
+
+        compacted = ChatContext(items=head)
+        if summary:
+            compacted.add_message(role="system", content=SUMMARY_PREFIX + summary)
+        compacted.items.extend(older)
+        compacted.items.extend(recent)
+        return compacted
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+from livekit.agents import Agent
+from livekit.agents.llm import is_function_tool
+
+from app.state import SessionState
+
+
+class FlowError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """One state of the call flow: which agent handles it and where its tools lead.
+
+    ``transitions`` maps a function tool on the agent to the state it hands off to.
+    """
+
+    agent: str
+    transitions: dict[str, SessionState] = field(default_factory=dict)
+
+
+ENTRY_STATE = SessionState.AUTHENTICATING
+
+FLOW: dict[SessionState, AgentSpec] = {
+    SessionState.AUTHENTICATING: AgentSpec("MultiAgent", {"switch_to_main": SessionState.MAIN}),
+    SessionState.MAIN: AgentSpec("MainAgent", {"switch_to_helpline": SessionState.HELPLINE}),
+    SessionState.HELPLINE: AgentSpec("HelplineAgent", {"end_session": SessionState.AUTHENTICATING}),
+}
+
+
+@dataclass(frozen=True)
+class CompiledState:
+    state: SessionState
+    agent_cls: type[Agent]
+    transitions: dict[str, SessionState]
+
+
+class CompiledFlow:
+    """The validated flow with agent classes resolved, built once per process."""
+
+    def __init__(self, states: dict[SessionState, CompiledState], entry: SessionState) -> None:
+        self.states = states
+        self.entry = entry
+        self._by_class = {compiled.agent_cls: compiled for compiled in states.values()}
+
+    def state_of(self, agent: Agent) -> CompiledState:
+        compiled = self._by_class.get(type(agent))
+        if compiled is None:
+            raise FlowError(f"{type(agent).__name__} is not part of the flow")
+        return compiled
+
+    def create(self, state: SessionState, **kwargs: Any) -> Agent:
+        return self.states[state].agent_cls(**kwargs)
+
+    def handoff(self, agent: Agent, tool: str, **kwargs: Any) -> Agent:
+        """Build the agent that ``tool`` on ``agent`` leads to."""
+        target = self.state_of(agent).transitions.get(tool)
+        if target is None:
+            raise FlowError(f"{type(agent).__name__}.{tool} has no transition in the flow")
+        return self.create(target, **kwargs)
+
+
+def compile_flow(flow: dict[SessionState, AgentSpec] = FLOW, entry: SessionState = ENTRY_STATE) -> CompiledFlow:
+    """Resolve agent classes and check every state, tool and transition; raises ``FlowError``."""
+    import app.agents
+
+    if entry not in flow:
+        raise FlowError(f"entry state {entry.name} has no agent")
+
+    states: dict[SessionState, CompiledState] = {}
+    for state, spec in flow.items():
+        agent_cls = getattr(app.agents, spec.agent, None)
+        if agent_cls is None:
+            raise FlowError(f"{state.name}: unknown agent {spec.agent}")
+        instructions = getattr(agent_cls, "INSTRUCTIONS", None)
+        if not isinstance(instructions, str) or not instructions:
+            raise FlowError(f"{spec.agent} must define static INSTRUCTIONS")
+        for tool, target in spec.transitions.items():
+            if not is_function_tool(getattr(agent_cls, tool, None)):
+                raise FlowError(f"{spec.agent}.{tool} is not a function tool")
+            if target not in flow:
+                raise FlowError(f"{spec.agent}.{tool} leads to {target.name}, which has no agent")
+        states[state] = CompiledState(state, agent_cls, dict(spec.transitions))
+
+    reachable = {entry}
+    frontier = [entry]
+    while frontier:
+        for target in flow[frontier.pop()].transitions.values():
+            if target not in reachable:
+                reachable.add(target)
+                frontier.append(target)
+    for state in flow.keys() - reachable:
+        logger.warning("Flow state {} is unreachable from {}", state.name, entry.name)
+
+    return CompiledFlow(states, entry)
+
+
+_flow: CompiledFlow | None = None
+
+
+def get_flow() -> CompiledFlow:
+    global _flow
+    if _flow is None:
+        _flow = compile_flow()
+    return _flow
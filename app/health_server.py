@@ -0,0 +1,172 @@
+"""Liveness, readiness and metrics over plain asyncio HTTP, served from inside the worker.
+
+Runs on a daemon thread with its own event loop, so a busy or wedged worker loop
+can't stall the probe itself, and the probe can report that the worker is wedged.
+
+    GET /livez     200 while the LiveKit worker loop is polling load_fnc
+    GET /readyz    200 when alive, not draining, a prewarmed process is up and the LLM/MCP hosts answer
+    GET /status    drain state, live sessions and every readiness check
+    GET /capacity  combined process load (see app.capacity)
+    GET /latency   per-stage latency summary
+    GET /metrics   Prometheus text
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from app.capacity import CapacityGate, capacity_summary, read_process_loads
+from app.config import Settings, get_settings
+from app.instrumentation import merge_snapshots, read_snapshots, render_prometheus, summarize, summarize_prompt_cache
+
+_DEFAULT_LLM_URL = "https://api.openai.com/v1"
+_PROBE_TIMEOUT = 2.0
+_PROBE_TTL = 15.0
+
+_REASONS = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+def _host_port(url: str) -> tuple[str, int] | None:
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return None
+    return parts.hostname, parts.port or (443 if parts.scheme in ("https", "wss") else 80)
+
+
+class HealthServer:
+    def __init__(self, gate: CapacityGate | None = None, settings: Settings | None = None) -> None:
+        self.gate = gate
+        self.settings = settings or get_settings()
+        self.started_at = time.monotonic()
+        self._probes: dict[tuple[str, int], tuple[float, bool]] = {}
+
+    # --- checks ---------------------------------------------------------------------
+
+    def alive(self) -> bool:
+        if self.gate is None:
+            return True
+        if self.gate.last_polled is None:
+            # The worker loop has not polled yet: still starting up
+            return time.monotonic() - self.started_at < self.settings.health_startup_grace
+        return time.monotonic() - self.gate.last_polled < self.settings.health_heartbeat_timeout
+
+    def draining(self) -> bool:
+        worker = self.gate.worker if self.gate is not None else None
+        return bool(getattr(worker, "draining", False))
+
+    async def _reachable(self, url: str) -> bool:
+        target = _host_port(url)
+        if target is None:
+            return False
+        cached = self._probes.get(target)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < _PROBE_TTL:
+            return cached[1]
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(*target), _PROBE_TIMEOUT)
+            writer.close()
+            ok = True
+        except (OSError, asyncio.TimeoutError):
+            ok = False
+        self._probes[target] = (now, ok)
+        return ok
+
+    async def checks(self) -> dict[str, bool]:
+        settings = self.settings
+        loads = read_process_loads(settings.capacity_dir, settings.capacity_stale_after)
+        llm_urls = [settings.llm_base_url or _DEFAULT_LLM_URL]
+        if settings.openrouter_api_key:
+            llm_urls.append(settings.openrouter_base_url)
+        # Any LLM endpoint will do: the router fails over between them
+        llm_ok = any(await asyncio.gather(*(self._reachable(url) for url in llm_urls)))
+        checks = {
+            "alive": self.alive(),
+            "not_draining": not self.draining(),
+            "prewarmed": any(load.get("prewarmed") for load in loads),
+            "llm_reachable": llm_ok,
+        }
+        if settings.mcp_server_url:
+            checks["mcp_reachable"] = await self._reachable(settings.mcp_server_url)
+        return checks
+
+    async def status(self) -> dict[str, Any]:
+        settings = self.settings
+        worker = self.gate.worker if self.gate is not None else None
+        checks = await self.checks()
+        return {
+            "ready": all(checks.values()),
+            "checks": checks,
+            "draining": self.draining(),
+            "active_jobs": len(getattr(worker, "active_jobs", None) or []),
+            "capacity": capacity_summary(read_process_loads(settings.capacity_dir, settings.capacity_stale_after), settings),
+        }
+
+    # --- HTTP -----------------------------------------------------------------------
+
+    def _merged_latency(self):
+        return merge_snapshots(read_snapshots(self.settings.metrics_dir, self.settings.metrics_max_age))
+
+    async def route(self, path: str) -> tuple[int, str, str]:
+        if path in ("/", "/livez"):
+            alive = self.alive()
+            return (200 if alive else 503), "application/json", json.dumps({"status": "ok" if alive else "wedged"})
+        if path == "/readyz":
+            checks = await self.checks()
+            ready = all(checks.values())
+            return (200 if ready else 503), "application/json", json.dumps({"ready": ready, "checks": checks})
+        if path == "/status":
+            return 200, "application/json", json.dumps(await self.status())
+        if path == "/capacity":
+            settings = self.settings
+            loads = read_process_loads(settings.capacity_dir, settings.capacity_stale_after)
+            return 200, "application/json", json.dumps(capacity_summary(loads, settings))
+        if path == "/latency":
+            merged = self._merged_latency()
+            body = {"stages": summarize(merged), "prompt_cache": summarize_prompt_cache(merged)}
+            return 200, "application/json", json.dumps(body)
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4", render_prometheus(self._merged_latency())
+        return 404, "application/json", json.dumps({"error": "not found"})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5.0)
+            # Headers are not used; read them so the client sees a clean response
+            while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b"\r\n", b"\n", b""):
+                pass
+            method, _, rest = request_line.decode("latin-1").partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+            if method not in ("GET", "HEAD"):
+                status, content_type, body = 405, "application/json", json.dumps({"error": "method not allowed"})
+            else:
+                status, content_type, body = await self.route(path)
+            payload = body.encode()
+            head = (
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+            )
+            writer.write(head.encode() + (payload if method != "HEAD" else b""))
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError, ValueError):
+            pass
+        except Exception:
+            logger.exception("Health request failed")
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        server = await asyncio.start_server(self._handle, self.settings.health_host, self.settings.health_port)
+        logger.info("Health server listening on {}:{}", self.settings.health_host, self.settings.health_port)
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=asyncio.run, args=(self.serve_forever(),), name="health_server", daemon=True)
+        thread.start()
+        return thread
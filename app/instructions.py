@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from livekit.agents.llm import ChatContext
+
+# Providers cache prompts by exact prefix, so each agent class keeps its static
+# instructions byte-identical across sessions. Anything that varies per caller
+# (name, user ID, handoff notes) goes into this message, which sits right after
+# the instructions in the chat context.
+SESSION_FACTS_HEADER = "SESSION INFO:\n"
+
+
+def session_facts(*lines: str | None) -> str:
+    return SESSION_FACTS_HEADER + "\n".join(line for line in lines if line)
+
+
+def session_chat_ctx(facts: str) -> ChatContext:
+    """Initial chat context for an agent: the per-session facts as one system message."""
+    ctx = ChatContext.empty()
+    if facts:
+        ctx.add_message(role="system", content=facts)
+    return ctx
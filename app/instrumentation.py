@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from loguru import logger
+
+from app.config import get_settings
+from app.log import sample_debug
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 2**_SUB_BITS linear sub-buckets per power of two: ~1.5% worst-case relative error
+_SUB_BITS = 6
+_SUB_COUNT = 1 << _SUB_BITS
+_HALF_SUB = _SUB_COUNT >> 1
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < _SUB_COUNT:
+        return micros
+    shift = micros.bit_length() - _SUB_BITS
+    return shift * _HALF_SUB + (micros >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    if index < _SUB_COUNT:
+        return float(index)
+    shift = index // _HALF_SUB - 1
+    mantissa = index - shift * _HALF_SUB
+    return ((mantissa << shift) + ((mantissa + 1) << shift)) / 2
+
+
+class LatencyHistogram:
+    """Streaming HDR-style histogram of durations, stored as sparse log-linear buckets.
+
+    Recording is O(1) and memory only grows with the number of distinct buckets
+    hit, so histograms can stay on for the lifetime of a process. Two histograms
+    merge by adding bucket counts, which is how per-process snapshots combine.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds < 0:
+            return
+        index = _bucket_index(int(seconds * 1_000_000))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_value(index) / 1_000_000, self.max)
+        return self.max
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"counts": self.counts, "count": self.count, "sum": self.total, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LatencyHistogram:
+        hist = cls()
+        hist.counts = {int(index): int(n) for index, n in data.get("counts", {}).items()}
+        hist.count = int(data.get("count", 0))
+        hist.total = float(data.get("sum", 0.0))
+        hist.max = float(data.get("max", 0.0))
+        return hist
+
+
+StageKey = tuple[str, str, str]
+
+
+class PromptCacheCounter:
+    """LLM requests and prompt tokens for one agent class, split by provider cache hits."""
+
+    __slots__ = ("requests", "prompt_tokens", "cached_tokens")
+
+    def __init__(self, requests: int = 0, prompt_tokens: int = 0, cached_tokens: int = 0) -> None:
+        self.requests = requests
+        self.prompt_tokens = prompt_tokens
+        self.cached_tokens = cached_tokens
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+
+class LatencyRegistry:
+    """Histograms per (stage, agent class, session state) for one process, plus prompt-cache counters per agent."""
+
+    def __init__(self) -> None:
+        self.histograms: dict[StageKey, LatencyHistogram] = {}
+        self.prompt_cache: dict[str, PromptCacheCounter] = {}
+
+    def record(self, stage: str, seconds: float, agent: str = "-", state: str = "-") -> None:
+        key = (stage, agent, state)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        hist.record(seconds)
+
+    def record_prompt(self, agent: str, prompt_tokens: int, cached_tokens: int) -> None:
+        counter = self.prompt_cache.get(agent)
+        if counter is None:
+            counter = self.prompt_cache[agent] = PromptCacheCounter()
+        counter.requests += 1
+        counter.prompt_tokens += prompt_tokens
+        counter.cached_tokens += cached_tokens
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "histograms": [[*key, hist.to_dict()] for key, hist in self.histograms.items()],
+            "prompt_cache": [
+                [agent, c.requests, c.prompt_tokens, c.cached_tokens] for agent, c in self.prompt_cache.items()
+            ],
+        }
+
+    def merge_dict(self, data: dict[str, Any]) -> None:
+        for stage, agent, state, hist_data in data.get("histograms", []):
+            key = (stage, agent, state)
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = LatencyHistogram()
+            hist.merge(LatencyHistogram.from_dict(hist_data))
+        for agent, requests, prompt_tokens, cached_tokens in data.get("prompt_cache", []):
+            counter = self.prompt_cache.setdefault(agent, PromptCacheCounter())
+            counter.requests += int(requests)
+            counter.prompt_tokens += int(prompt_tokens)
+            counter.cached_tokens += int(cached_tokens)
+
+
+_registry = LatencyRegistry()
+
+
+def get_latency_registry() -> LatencyRegistry:
+    return _registry
+
+
+class SessionInstrumentation:
+    """Per-turn stage timings for one ``AgentSession``, tagged with room SID, agent and state."""
+
+    def __init__(self, session: Any, room_sid: str, registry: LatencyRegistry | None = None) -> None:
+        self.session = session
+        self.room_sid = room_sid
+        self.registry = registry or _registry
+        self.turn_id = 0
+        self._speaking_since: float | None = None
+
+    def tags(self) -> tuple[str, str]:
+        agent = getattr(self.session, "current_agent", None)
+        agent_name = type(agent).__name__ if agent is not None else "-"
+        state = getattr(getattr(self.session, "userdata", None), "state", None)
+        return agent_name, getattr(state, "name", "-")
+
+    def record(self, stage: str, seconds: float | None) -> None:
+        if seconds is None:
+            return
+        agent, state = self.tags()
+        self.registry.record(stage, seconds, agent, state)
+        sample_debug(stage, "stage={} seconds={:.4f} agent={} state={}", stage, seconds, agent, state)
+
+    def attach(self) -> SessionInstrumentation:
+        self.session.on("metrics_collected", self._on_metrics)
+        self.session.on("user_input_transcribed", self._on_transcribed)
+        self.session.on("agent_state_changed", self._on_agent_state)
+        _current.set(self)
+        return self
+
+    def _on_transcribed(self, ev: Any) -> None:
+        if getattr(ev, "is_final", False):
+            self.turn_id += 1
+
+    def _on_agent_state(self, ev: Any) -> None:
+        now = time.perf_counter()
+        if ev.new_state == "speaking":
+            self._speaking_since = now
+        elif self._speaking_since is not None:
+            self.record("playout", now - self._speaking_since)
+            self._speaking_since = None
+
+    def _on_metrics(self, ev: Any) -> None:
+        metrics = ev.metrics
+        kind = type(metrics).__name__
+        if kind == "EOUMetrics":
+            self.record("vad_end_of_speech", getattr(metrics, "end_of_utterance_delay", None))
+            self.record("stt_final", getattr(metrics, "transcription_delay", None))
+            self.record("turn_decision", getattr(metrics, "on_user_turn_completed_delay", None))
+        elif kind == "LLMMetrics":
+            ttft = getattr(metrics, "ttft", None)
+            self.record("llm_ttft", ttft)
+            self.record("llm_duration", getattr(metrics, "duration", None))
+            prompt_tokens = getattr(metrics, "prompt_tokens", 0) or 0
+            cached_tokens = getattr(metrics, "prompt_cached_tokens", 0) or 0
+            if prompt_tokens:
+                agent, _ = self.tags()
+                self.registry.record_prompt(agent, prompt_tokens, cached_tokens)
+                # Split TTFT by provider prompt-cache outcome to see what the stable prefix saves
+                self.record("llm_ttft_cache_hit" if cached_tokens else "llm_ttft_cache_miss", ttft)
+        elif kind == "TTSMetrics":
+            self.record("tts_ttfb", getattr(metrics, "ttfb", None))
+        elif kind == "STTMetrics":
+            self.record("stt_duration", getattr(metrics, "duration", None))
+        elif kind == "VADMetrics":
+            count = getattr(metrics, "inference_count", 0)
+            if count:
+                self.record("vad_inference", metrics.inference_duration_total / count)
+
+
+_current: contextvars.ContextVar[SessionInstrumentation | None] = contextvars.ContextVar(
+    "session_instrumentation", default=None
+)
+
+
+def current_instrumentation() -> SessionInstrumentation | None:
+    return _current.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a stage measured outside session events (e.g. tool calls)."""
+    instrumentation = _current.get()
+    if instrumentation is not None:
+        instrumentation.record(stage, seconds)
+    else:
+        _registry.record(stage, seconds)
+
+
+# --- cross-process export -------------------------------------------------------------
+# Jobs run in their own processes, so each one publishes its registry as a JSON
+# snapshot into a shared directory and the health server merges them on scrape.
+
+
+def snapshot_path(directory: str, pid: int | None = None) -> Path:
+    return Path(directory) / f"{pid or os.getpid()}.json"
+
+
+def write_snapshot(directory: str, extra: dict[str, Any] | None = None) -> None:
+    path = snapshot_path(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"pid": os.getpid(), "time": time.time(), **_registry.to_dict(), **(extra or {})}
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def read_snapshots(directory: str, max_age: float) -> list[dict[str, Any]]:
+    snapshots = []
+    now = time.time()
+    for path in Path(directory).glob("*.json"):
+        try:
+            if now - path.stat().st_mtime > max_age:
+                path.unlink(missing_ok=True)
+                continue
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge_snapshots(snapshots: Iterable[dict[str, Any]]) -> LatencyRegistry:
+    merged = LatencyRegistry()
+    for snapshot in snapshots:
+        merged.merge_dict(snapshot)
+    return merged
+
+
+async def flush_snapshot() -> None:
+    try:
+        await asyncio.to_thread(write_snapshot, get_settings().metrics_dir)
+    except OSError as e:
+        logger.warning("Failed to publish metrics snapshot: {}", e)
+
+
+async def _publish_forever(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await flush_snapshot()
+
+
+_publisher: asyncio.Task[None] | None = None
+
+
+def ensure_publisher() -> None:
+    """Start the periodic snapshot writer for this process, once."""
+    global _publisher
+    if _publisher is None or _publisher.done():
+        interval = get_settings().metrics_publish_interval
+        _publisher = asyncio.create_task(_publish_forever(interval), name="metrics_publisher")
+
+
+def summarize(registry: LatencyRegistry) -> list[dict[str, Any]]:
+    rows = []
+    for (stage, agent, state), hist in sorted(registry.histograms.items()):
+        rows.append(
+            {
+                "stage": stage,
+                "agent": agent,
+                "state": state,
+                "count": hist.count,
+                **{f"p{int(q * 100)}_ms": round(hist.quantile(q) * 1000, 2) for q in QUANTILES},
+                "max_ms": round(hist.max * 1000, 2),
+            }
+        )
+    return rows
+
+
+def summarize_prompt_cache(registry: LatencyRegistry) -> list[dict[str, Any]]:
+    return [
+        {
+            "agent": agent,
+            "requests": c.requests,
+            "prompt_tokens": c.prompt_tokens,
+            "cached_tokens": c.cached_tokens,
+            "hit_rate": round(c.hit_rate, 4),
+        }
+        for agent, c in sorted(registry.prompt_cache.items())
+    ]
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(registry: LatencyRegistry) -> str:
+    lines = [
+        "# HELP voice_agent_stage_latency_seconds Per-turn pipeline stage latency.",
+        "# TYPE voice_agent_stage_latency_seconds summary",
+    ]
+    for (stage, agent, state), hist in sorted(registry.histograms.items()):
+        for q in QUANTILES:
+            labels = _labels(stage=stage, agent=agent, state=state, quantile=str(q))
+            lines.append(f"voice_agent_stage_latency_seconds{labels} {hist.quantile(q):.6f}")
+        labels = _labels(stage=stage, agent=agent, state=state)
+        lines.append(f"voice_agent_stage_latency_seconds_sum{labels} {hist.total:.6f}")
+        lines.append(f"voice_agent_stage_latency_seconds_count{labels} {hist.count}")
+    # Each metric family is one contiguous block: its HELP/TYPE, then all of its samples
+    prompt_families = (
+        ("voice_agent_llm_prompt_tokens_total", "Prompt tokens sent to the LLM.", "prompt_tokens"),
+        (
+            "voice_agent_llm_prompt_cached_tokens_total",
+            "Prompt tokens served from the provider prompt cache.",
+            "cached_tokens",
+        ),
+    )
+    for name, help_text, field in prompt_families:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for agent, counter in sorted(registry.prompt_cache.items()):
+            lines.append(f"{name}{_labels(agent=agent)} {getattr(counter, field)}")
+    return "\n".join(lines) + "\n"
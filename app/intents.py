@@ -0,0 +1,166 @@
+"""Answer the commonest account lookups without an LLM turn.
+
+"what's my bill" normally costs one completion to pick ``get_user_bill`` and a
+second to phrase the result. For short, unambiguous requests the router matches
+the final transcript against keyword rules, calls the MCP tool directly (or reuses
+the prefetched result) and speaks a template. Anything it is unsure of — two
+intents at once, a follow-up like "why is it so high", a long utterance, a result
+it can't parse — returns ``None`` and the LLM handles the turn as before.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from app.mcp_server import result_text
+from app.security import contains_sensitive_request
+from app.speech_chunker import normalize_for_speech
+from app.state import ConversationContext
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    tool: str
+    patterns: tuple[re.Pattern[str], ...]
+    render: Callable[[dict[str, Any], str | None], str | None]
+
+
+# Requests that need reasoning or an action, not a lookup read back
+_NEEDS_LLM_RE = re.compile(
+    r"\b(?:why|wrong|dispute|explain|change|update|cancel|pay|paying|split|lower|reduce|increase|late fee|"
+    r"refund|can(?:no|')t|didn't|don't|not|never|compare|last (?:month|year|few)|previous|help me)\b",
+    re.IGNORECASE,
+)
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _pattern(*alternatives: str) -> re.Pattern[str]:
+    return re.compile("|".join(rf"\b(?:{alternative})\b" for alternative in alternatives), re.IGNORECASE)
+
+
+def _ordinal(day: int) -> str:
+    suffix = "th" if 11 <= day % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def _parse_time(value: Any) -> datetime | None:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _spoken_date(when: datetime) -> str:
+    return f"{when:%B} {_ordinal(when.day)}"
+
+
+def _spoken_time(when: datetime) -> str:
+    hour = when.hour % 12 or 12
+    minutes = f":{when.minute:02d}" if when.minute else ""
+    return f"{hour}{minutes} {'AM' if when.hour < 12 else 'PM'}"
+
+
+def _greeting(name: str | None) -> str:
+    return f"{name.split()[0]}, " if name else ""
+
+
+def _capitalized(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def _render_bill(data: dict[str, Any], name: str | None) -> str | None:
+    amount, currency = data.get("amount"), str(data.get("currency") or "USD").upper()
+    if not isinstance(amount, (int, float)) or currency not in ("USD", "GBP", "EUR"):
+        return None
+    symbol = {"USD": "$", "GBP": "£", "EUR": "€"}[currency]
+    text = f"your current bill is {normalize_for_speech(f'{symbol}{amount:.2f}')}"
+    due = _parse_time(data.get("due_date"))
+    if due is not None:
+        text += f", due on {_spoken_date(due)}"
+    return _capitalized(f"{_greeting(name)}{text}. Is there anything else I can help with?")
+
+
+def _render_last_login(data: dict[str, Any], name: str | None) -> str | None:
+    when = _parse_time(data.get("last_login"))
+    if when is None:
+        return None
+    zone = " UTC" if when.utcoffset() is not None and not when.utcoffset() else ""
+    text = f"your last login was on {when:%A}, {_spoken_date(when)} at {_spoken_time(when)}{zone}"
+    return _capitalized(f"{_greeting(name)}{text}. Anything else you'd like to check?")
+
+
+def _render_contact(data: dict[str, Any], name: str | None) -> str | None:
+    email, phone = data.get("email"), data.get("phone")
+    if not isinstance(email, str) or not isinstance(phone, str):
+        return None
+    email = email.replace("@", " at ").replace(".", " dot ")
+    text = f"the email we have on file is {email}, and the phone number is {phone}"
+    return _capitalized(f"{_greeting(name)}{text}. Is there anything else?")
+
+
+INTENTS: tuple[Intent, ...] = (
+    Intent(
+        "bill",
+        "get_user_bill",
+        (
+            _pattern(r"(?:my|the) (?:current |latest |monthly )?bill", r"how much do i owe", r"amount due"),
+            _pattern(r"when is (?:my|the) (?:bill|payment) due", r"what do i owe"),
+        ),
+        _render_bill,
+    ),
+    Intent(
+        "last_login",
+        "get_user_last_login",
+        (
+            _pattern(r"last (?:log ?in|login|signed in|sign in)", r"when did i (?:last )?(?:log|sign)(?:ged)? ?in"),
+            _pattern(r"(?:log ?in|login) (?:history|activity)", r"most recent (?:log ?in|login)"),
+        ),
+        _render_last_login,
+    ),
+    Intent(
+        "contact",
+        "get_user_contact",
+        (
+            _pattern(r"(?:email|e-mail|phone number|contact (?:details|info)) (?:do you have )?on file"),
+            _pattern(r"what(?:'s| is) my (?:email|e-mail|phone number|contact (?:details|info))"),
+        ),
+        _render_contact,
+    ),
+)
+
+
+def classify(text: str, max_words: int = 12) -> Intent | None:
+    """The single intent ``text`` confidently asks for, or ``None`` to leave the turn to the LLM."""
+    text = text.strip()
+    if not text or len(_WORD_RE.findall(text)) > max_words:
+        return None
+    if _NEEDS_LLM_RE.search(text) or contains_sensitive_request(text):
+        return None
+    matched = [intent for intent in INTENTS if any(pattern.search(text) for pattern in intent.patterns)]
+    # Two lookups in one breath ("my bill and my last login") are the LLM's job
+    return matched[0] if len(matched) == 1 else None
+
+
+async def answer(intent: Intent, userdata: ConversationContext) -> str | None:
+    """Fetch the intent's data (prefetched if available) and render the spoken answer."""
+    text = userdata.prefetched.get(intent.tool)
+    if text is None:
+        if userdata.mcp_server is None or not userdata.user_id:
+            return None
+        result = await userdata.mcp_server.call_tool(intent.tool, {"user_id": userdata.user_id})
+        if getattr(result, "isError", False):
+            return None
+        text = result_text(result)
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return intent.render(data, userdata.user_name)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+import httpx
+from loguru import logger
+
+from app.config import Settings, get_settings
+from app.plugins import load_plugin
+
+if TYPE_CHECKING:
+    from livekit.plugins import openai
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    requests_waited: int = 0
+    connections_open: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "requests_waited": self.requests_waited,
+            "connections_open": self.connections_open,
+        }
+
+
+@dataclass
+class RequestTiming:
+    """When a request's headers went out on a connection, i.e. after any TCP/TLS setup."""
+
+    sent_at: float | None = None
+
+
+# Set by a caller timing its requests (the router); the transport fills it in from its trace hook
+request_timing: ContextVar[RequestTiming | None] = ContextVar("llm_request_timing", default=None)
+
+
+# Bounds on reading the rest of a response body the caller closed early
+_DRAIN_BYTES = 64 * 1024
+_DRAIN_SECONDS = 0.1
+
+
+class _DrainingStream(httpx.AsyncByteStream):
+    """Response body that reads what is left before closing, so the connection goes back to the pool.
+
+    The OpenAI SDK closes a streamed completion as soon as it sees ``[DONE]``, which
+    leaves the chunked-encoding terminator unread; httpcore then drops the connection
+    instead of keeping it alive. A body abandoned mid-generation (an interruption) is
+    only drained briefly, after which the connection is dropped as before.
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            drained = 0
+            async with asyncio.timeout(_DRAIN_SECONDS):
+                async for chunk in self._stream:
+                    drained += len(chunk)
+                    if drained > _DRAIN_BYTES:
+                        break
+        except (TimeoutError, httpx.HTTPError, httpx.StreamError):
+            pass
+        finally:
+            await self._stream.aclose()
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that records connection reuse through httpcore trace events."""
+
+    def __init__(self, stats: PoolStats, limits: httpx.Limits, **kwargs: Any) -> None:
+        super().__init__(limits=limits, **kwargs)
+        self._stats = stats
+        self._max_connections = limits.max_connections
+
+    def _open_connections(self) -> list[Any]:
+        return list(self._pool.connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        connections = self._open_connections()
+        saturated = (
+            self._max_connections is not None
+            and len(connections) >= self._max_connections
+            and not any(conn.is_available() for conn in connections)
+        )
+        opened = False
+        # A caller's own trace hook still runs; ours is chained in front of it
+        previous_trace = request.extensions.get("trace")
+        timing = request_timing.get()
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.started":
+                opened = True
+            elif timing is not None and event_name.endswith("send_request_headers.started"):
+                timing.sent_at = time.perf_counter()
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._stats.requests += 1
+        if saturated:
+            self._stats.requests_waited += 1
+        try:
+            response = await super().handle_async_request(request)
+        finally:
+            if opened:
+                self._stats.connections_opened += 1
+            else:
+                self._stats.connections_reused += 1
+            self._stats.connections_open = len(self._open_connections())
+        response.stream = _DrainingStream(response.stream)
+        return response
+
+
+@dataclass
+class _HttpPool:
+    client: httpx.AsyncClient
+    stats: PoolStats
+
+
+class LLMClientRegistry:
+    """Process-wide OpenAI-compatible clients, keyed by (base_url, api_key, model).
+
+    Clients for the same base URL share one tuned ``httpx.AsyncClient`` so TCP/TLS
+    and HTTP/2 connections survive across jobs handled by the same process.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self._settings = settings or get_settings()
+        self._http_pools: dict[str, _HttpPool] = {}
+        self._llms: dict[tuple[str, str, str], openai.LLM] = {}
+        self._closer: asyncio.Task[None] | None = None
+
+    def _http_pool(self, base_url: str) -> _HttpPool:
+        pool = self._http_pools.get(base_url)
+        if pool is not None:
+            return pool
+
+        settings = self._settings
+        http2 = settings.llm_http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("LLM_HTTP2 is enabled but the h2 package is missing, falling back to HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+        stats = PoolStats()
+        transport = _CountingTransport(stats, limits, http2=http2)
+        client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        pool = _HttpPool(client=client, stats=stats)
+        self._http_pools[base_url] = pool
+        return pool
+
+    def http_client(self, base_url: str) -> httpx.AsyncClient:
+        return self._http_pool(base_url).client
+
+    def get_llm(self, base_url: str, api_key: str, model: str) -> openai.LLM:
+        key = (base_url, api_key, model)
+        llm = self._llms.get(key)
+        if llm is None:
+            from openai import AsyncClient
+
+            openai_plugin = load_plugin("openai")
+            client = AsyncClient(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=self.http_client(base_url),
+            )
+            llm = openai_plugin.LLM(client=client, model=model)
+            self._llms[key] = llm
+        return llm
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {base_url: pool.stats.as_dict() for base_url, pool in self._http_pools.items()}
+
+    def close_on_shutdown(self) -> None:
+        """Close the pools when this process's event loop shuts down, not when a job ends.
+
+        LiveKit cancels the tasks still pending on the job loop as the process (or the
+        thread runner) exits, which runs the close below; jobs that come and go in
+        between keep the connections.
+        """
+        if self._closer is None or self._closer.done():
+            self._closer = asyncio.create_task(self._close_at_shutdown(), name="llm_pool_closer")
+
+    async def _close_at_shutdown(self) -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        pools = list(self._http_pools.values())
+        self._http_pools.clear()
+        self._llms.clear()
+        for pool in pools:
+            logger.info("Closing LLM HTTP pool | stats={}", pool.stats.as_dict())
+        await asyncio.gather(*(pool.client.aclose() for pool in pools), return_exceptions=True)
+
+
+_registry: LLMClientRegistry | None = None
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
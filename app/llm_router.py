@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from livekit.agents import APIConnectionError, APIConnectOptions, llm
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+
+from app.config import Settings, get_settings
+from app.instrumentation import LatencyHistogram, record_stage
+from app.llm_pool import LLMClientRegistry, RequestTiming, get_llm_registry, request_timing
+
+# The p95 used as hedge deadline is only trusted once an endpoint has this many samples
+_MIN_HEDGE_SAMPLES = 20
+# An EWMA older than this no longer says much; the endpoint is probed again
+_STALE_AFTER = 30.0
+
+
+@dataclass(frozen=True)
+class RouteEndpoint:
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+
+
+class EndpointHealth:
+    """TTFT EWMA, TTFT distribution and circuit-breaker state for one endpoint.
+
+    Shared by every job in the process, so a slow or failing endpoint found by one
+    call is avoided by the next.
+    """
+
+    def __init__(self, alpha: float, failure_threshold: int, cooldown: float) -> None:
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_ttft: float | None = None
+        self.measured_at = 0.0
+        self.ttft = LatencyHistogram()
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.wins = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        # Past the cooldown the breaker is half-open: the next request is a trial
+        return now >= self.open_until
+
+    def score(self, now: float) -> float:
+        """Ranking key: the TTFT EWMA, or 0 when unmeasured or stale so the endpoint gets probed."""
+        if self.ewma_ttft is None or now - self.measured_at > _STALE_AFTER:
+            return 0.0
+        return self.ewma_ttft
+
+    def record_success(self, ttft: float, probe: bool = False) -> None:
+        """Fold a TTFT sample into the EWMA.
+
+        A probe's sample, or any sample once the EWMA is stale, replaces the estimate
+        outright: the old value describes a period when the endpoint was not in use, and
+        blending with it would keep one slow sample in charge for many probes.
+        """
+        now = time.monotonic()
+        if self.ewma_ttft is None or probe or now - self.measured_at > _STALE_AFTER:
+            self.ewma_ttft = ttft
+        else:
+            self.ewma_ttft = self.alpha * ttft + (1 - self.alpha) * self.ewma_ttft
+        self.measured_at = now
+        self.ttft.record(ttft)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_slow(self, elapsed: float) -> None:
+        """A hedge loser cancelled before its first token: its TTFT was at least ``elapsed``."""
+        if self.ewma_ttft is None or elapsed > self.ewma_ttft:
+            self.ewma_ttft = elapsed if self.ewma_ttft is None else self.alpha * elapsed + (1 - self.alpha) * self.ewma_ttft
+            self.measured_at = time.monotonic()
+
+    def record_failure(self, name: str) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_until = time.monotonic() + self.cooldown
+            # Forget the old latency so the half-open trial after the cooldown goes first
+            self.ewma_ttft = None
+            logger.warning(
+                "LLM endpoint {} taken out of rotation for {:.0f}s after {} failures",
+                name,
+                self.cooldown,
+                self.consecutive_failures,
+            )
+
+    def hedge_delay(self, default: float, minimum: float) -> float:
+        if self.ttft.count < _MIN_HEDGE_SAMPLES:
+            return default
+        return max(minimum, self.ttft.quantile(0.95))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ewma_ttft_ms": round(self.ewma_ttft * 1000, 1) if self.ewma_ttft is not None else None,
+            "p95_ttft_ms": round(self.ttft.quantile(0.95) * 1000, 1),
+            "requests": self.requests,
+            "wins": self.wins,
+            "failures": self.failures,
+            "open": not self.available(time.monotonic()),
+        }
+
+
+_health: dict[str, EndpointHealth] = {}
+
+
+def get_endpoint_health(name: str, settings: Settings | None = None) -> EndpointHealth:
+    health = _health.get(name)
+    if health is None:
+        settings = settings or get_settings()
+        health = _health[name] = EndpointHealth(
+            alpha=settings.llm_ewma_alpha,
+            failure_threshold=settings.llm_breaker_failures,
+            cooldown=settings.llm_breaker_cooldown,
+        )
+    return health
+
+
+def router_stats() -> dict[str, dict[str, Any]]:
+    return {name: health.as_dict() for name, health in _health.items()}
+
+
+class RoutedLLM(llm.LLM):
+    """Sends each request to the fastest healthy endpoint, hedging to the runner-up.
+
+    Endpoints are ranked by TTFT EWMA; unmeasured or stale endpoints rank first so
+    they get probed, and ties go by configuration order. Every ``LLM_EXPLORE_EVERY``
+    requests the runner-up goes first instead, so an endpoint that lost on one bad
+    sample gets measured again. If the first token has not arrived by the primary's p95,
+    the same request goes to the next endpoint and the slower one is cancelled.
+    Clients come from the shared ``LLMClientRegistry`` on every request, so pooled
+    connections are reused and recreated after the pool closes.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[RouteEndpoint],
+        *,
+        registry: LLMClientRegistry | None = None,
+        settings: Settings | None = None,
+    ) -> None:
+        super().__init__()
+        self._settings = settings or get_settings()
+        self._registry = registry or get_llm_registry()
+        self.endpoints = endpoints
+        self.health = {endpoint.name: get_endpoint_health(endpoint.name, self._settings) for endpoint in endpoints}
+        self._routed = 0
+
+    @property
+    def model(self) -> str:
+        return self.ranked()[0].model
+
+    def ranked(self, explore: bool = False) -> list[RouteEndpoint]:
+        now = time.monotonic()
+        available = [e for e in self.endpoints if self.health[e.name].available(now)]
+        if not available:
+            # Everything is tripped: try the one that comes back soonest rather than failing outright
+            return sorted(self.endpoints, key=lambda e: self.health[e.name].open_until)
+        order = {e.name: i for i, e in enumerate(self.endpoints)}
+        ranked = sorted(available, key=lambda e: (self.health[e.name].score(now), order[e.name]))
+        if explore and len(ranked) > 1:
+            ranked.insert(0, ranked.pop(1))
+        return ranked
+
+    def _explore_turn(self) -> bool:
+        every = self._settings.llm_explore_every
+        self._routed += 1
+        return every > 0 and self._routed % every == 0
+
+    def client_for(self, endpoint: RouteEndpoint) -> llm.LLM:
+        return self._registry.get_llm(endpoint.base_url, endpoint.api_key, endpoint.model)
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[Any] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        **kwargs: Any,
+    ) -> RoutedLLMStream:
+        return RoutedLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options, extra=kwargs)
+
+
+@dataclass
+class _Attempt:
+    endpoint: RouteEndpoint
+    stream: llm.LLMStream
+    first: llm.ChatChunk | None
+    ttft: float
+    probe: bool
+
+
+class RoutedLLMStream(llm.LLMStream):
+    def __init__(self, router: RoutedLLM, *, extra: dict[str, Any], **kwargs: Any) -> None:
+        super().__init__(router, **kwargs)
+        self._router = router
+        self._extra = extra
+
+    async def _start(self, endpoint: RouteEndpoint, timing: RequestTiming, probe: bool) -> _Attempt:
+        router = self._router
+        router.health[endpoint.name].requests += 1
+        # The inner stream's task inherits this context, so the pooled transport can stamp
+        # when the request went out and TTFT leaves out connection setup
+        token = request_timing.set(timing)
+        try:
+            # Retries are ours to make (on another endpoint), not the inner client's
+            stream = router.client_for(endpoint).chat(
+                chat_ctx=self._chat_ctx,
+                tools=self._tools,
+                conn_options=APIConnectOptions(max_retry=0, timeout=self._conn_options.timeout),
+                **self._extra,
+            )
+        finally:
+            request_timing.reset(token)
+        started = time.perf_counter()
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except BaseException:
+            await stream.aclose()
+            raise
+        ttft = time.perf_counter() - (timing.sent_at or started)
+        return _Attempt(endpoint=endpoint, stream=stream, first=first, ttft=ttft, probe=probe)
+
+    async def _race(self) -> _Attempt:
+        router = self._router
+        settings = router._settings
+        explore = router._explore_turn()
+        candidates = router.ranked(explore)
+        pending: dict[asyncio.Task[_Attempt], tuple[RouteEndpoint, float, RequestTiming]] = {}
+
+        def launch() -> None:
+            # Only the endpoint moved to the front is a probe; hedges and failovers are ordinary requests
+            nonlocal explore
+            endpoint = candidates.pop(0)
+            timing = RequestTiming()
+            task = asyncio.create_task(self._start(endpoint, timing, explore))
+            explore = False
+            pending[task] = (endpoint, time.perf_counter(), timing)
+
+        primary = router.health[candidates[0].name]
+        deadline = primary.hedge_delay(settings.llm_hedge_default_delay, settings.llm_hedge_min_delay)
+        launch()
+        hedged = False
+        try:
+            while pending:
+                timeout = deadline if settings.llm_hedge and not hedged and candidates else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    # Recorded as a stage so hedge frequency and deadlines show up next to TTFT
+                    record_stage("llm_hedge_deadline", deadline)
+                    launch()
+                    continue
+                for task in done:
+                    endpoint, _, _ = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    logger.warning("LLM endpoint {} failed: {}", endpoint.name, task.exception())
+                    router.health[endpoint.name].record_failure(endpoint.name)
+                    # Fail over right away instead of waiting for a hedge deadline
+                    if not pending and candidates:
+                        launch()
+            raise APIConnectionError("all LLM endpoints failed")
+        finally:
+            now = time.perf_counter()
+            for task, (endpoint, started, timing) in pending.items():
+                if not task.done():
+                    router.health[endpoint.name].record_slow(now - (timing.sent_at or started))
+                task.cancel()
+            losers = await asyncio.gather(*pending, return_exceptions=True)
+            for loser in losers:
+                if isinstance(loser, _Attempt):
+                    await loser.stream.aclose()
+
+    async def _run(self) -> None:
+        attempt = await self._race()
+        health = self._router.health[attempt.endpoint.name]
+        health.record_success(attempt.ttft, probe=attempt.probe)
+        health.wins += 1
+        try:
+            if attempt.first is not None:
+                self._event_ch.send_nowait(attempt.first)
+            async for chunk in attempt.stream:
+                self._event_ch.send_nowait(chunk)
+        except Exception:
+            # Mid-stream errors can't switch endpoints without repeating speech; let the caller retry
+            health.record_failure(attempt.endpoint.name)
+            raise
+        finally:
+            await attempt.stream.aclose()
+
+
+def configured_endpoints(settings: Settings) -> list[RouteEndpoint]:
+    endpoints = [RouteEndpoint("primary", settings.llm_base_url, settings.llm_api_key, settings.llm_model)]
+    if settings.openrouter_api_key:
+        endpoints.append(
+            RouteEndpoint(
+                "openrouter", settings.openrouter_base_url, settings.openrouter_api_key, settings.openrouter_model
+            )
+        )
+    return endpoints
+
+
+def build_llm(settings: Settings | None = None, registry: LLMClientRegistry | None = None) -> llm.LLM:
+    """The session LLM: a plain pooled client for one endpoint, a ``RoutedLLM`` for several."""
+    settings = settings or get_settings()
+    registry = registry or get_llm_registry()
+    endpoints = configured_endpoints(settings)
+    if len(endpoints) == 1:
+        endpoint = endpoints[0]
+        return registry.get_llm(endpoint.base_url, endpoint.api_key, endpoint.model)
+    return RoutedLLM(endpoints, registry=registry, settings=settings)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import sys
+import traceback
+from dataclasses import dataclass, field
+from datetime import timezone
+from typing import Any, Callable
+
+from loguru import logger
+
+from app.config import Settings, get_settings
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+# Chosen by configure_logging(), which reads the settings (so nothing here does at import):
+# in production every ``log.debug()`` call site is a no-op function call, so arguments are
+# never formatted and nothing reaches the queue. Debug records are dropped until then.
+DEBUG_ENABLED = False
+debug: Callable[..., None] = _noop
+_sample_every = 1
+
+
+@dataclass
+class _SessionLogContext:
+    room_sid: str
+    turn_id: Callable[[], int]
+    sample_counts: dict[str, int] = field(default_factory=dict)
+
+
+_session: contextvars.ContextVar[_SessionLogContext | None] = contextvars.ContextVar("session_log", default=None)
+
+
+def bind_session(room_sid: str, turn_id: Callable[[], int] = lambda: 0) -> None:
+    """Tag every record logged from this job's tasks with the room SID and current turn."""
+    _session.set(_SessionLogContext(room_sid=room_sid, turn_id=turn_id))
+
+
+def sample_debug(event: str, message: str, *args: Any) -> None:
+    """Emit one in ``LOG_DEBUG_SAMPLE_EVERY`` debug records per event name and session."""
+    if not DEBUG_ENABLED:
+        return
+    # Plain values, not the lazy callables ``debug`` expects
+    ctx = _session.get()
+    if ctx is None:
+        logger.debug(message, *args, event=event)
+        return
+    seen = ctx.sample_counts.get(event, 0)
+    ctx.sample_counts[event] = seen + 1
+    if seen % _sample_every == 0:
+        logger.debug(message, *args, event=event, sampled=seen + 1)
+
+
+def _patch(record: dict[str, Any]) -> None:
+    ctx = _session.get()
+    if ctx is not None:
+        record["extra"].setdefault("room_sid", ctx.room_sid)
+        record["extra"].setdefault("turn_id", ctx.turn_id())
+
+
+def _json_sink(message: Any) -> None:
+    """One compact JSON line per record; runs on loguru's queue thread when ``enqueue=True``."""
+    record = message.record
+    payload = {
+        "ts": record["time"].astimezone(timezone.utc).isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "msg": record["message"],
+        "logger": record["name"],
+        **record["extra"],
+    }
+    if record["exception"] is not None:
+        payload["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    sys.stderr.write(json.dumps(payload, default=str) + "\n")
+
+
+def configure_logging(settings: Settings | None = None) -> None:
+    """Route loguru through a queue-backed background sink; JSON lines when ``LOG_JSON`` is on."""
+    global DEBUG_ENABLED, debug, _sample_every
+    settings = settings or get_settings()
+    level = settings.log_level.upper()
+    DEBUG_ENABLED = settings.environment.lower() != "production" and level in ("TRACE", "DEBUG")
+    # lazy=True: callables passed as arguments are only evaluated when the record is emitted
+    debug = logger.opt(lazy=True).debug if DEBUG_ENABLED else _noop
+    _sample_every = settings.log_debug_sample_every
+
+    logger.remove()
+    logger.configure(patcher=_patch)
+    if settings.log_json:
+        logger.add(_json_sink, level=level, enqueue=True, backtrace=False, diagnose=False)
+    else:
+        logger.add(sys.stderr, level=level, enqueue=True, backtrace=False, diagnose=False)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from livekit.agents import mcp
+
+from app.instrumentation import record_stage
+from app.tool_cache import ToolCallCache, get_tool_cache
+
+
+def result_text(result: Any) -> str:
+    """Join the text parts of an MCP ``CallToolResult``."""
+    parts = [getattr(part, "text", None) for part in getattr(result, "content", None) or []]
+    return "\n".join(part for part in parts if part)
+
+
+class _CachingClientSession:
+    """Proxy around the MCP ``ClientSession`` that routes ``call_tool`` through the cache."""
+
+    def __init__(self, inner: Any, cache: ToolCallCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self._cache.call(
+                name,
+                arguments,
+                lambda: self._inner.call_tool(name, arguments, *args, **kwargs),
+                cacheable=lambda result: not getattr(result, "isError", False),
+            )
+        finally:
+            record_stage("tool_call", time.perf_counter() - started)
+
+
+class CachedMCPServerHTTP(mcp.MCPServerHTTP):
+    """``MCPServerHTTP`` whose tool calls, from the LLM or from code, share the process tool cache."""
+
+    def __init__(self, *args: Any, cache: ToolCallCache | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._cache = cache or get_tool_cache()
+
+    @property
+    def cache(self) -> ToolCallCache:
+        return self._cache
+
+    async def initialize(self) -> None:
+        await super().initialize()
+        # A repeated or concurrent initialize must not wrap the proxy again: the nested cache
+        # would find the outer call's in-flight entry and wait on it forever
+        if not isinstance(self._client, _CachingClientSession):
+            self._client = _CachingClientSession(self._client, self._cache)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Any:
+        if not self.initialized:
+            await self.initialize()
+        return await self._client.call_tool(name, arguments)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+OTP_LENGTH = 4
+
+_WORD_DIGITS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+# Common STT mishearings; at most one is trusted per code, next to real digits
+_WEAK_DIGITS = {"oh": "0", "o": "0", "to": "2", "too": "2", "for": "4", "won": "1", "ate": "8"}
+_REPEATS = {"double": 2, "triple": 3}
+_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+
+def extract_otp(transcript: str, length: int = OTP_LENGTH) -> str | None:
+    """Find a spoken ``length``-digit code in a final transcript.
+
+    Accepts ``"1234"``, ``"12 34"``, ``"one two three four"`` and ``"double five
+    six seven"``. Returns ``None`` when there is no run of exactly ``length`` digits
+    or when the transcript holds more than one candidate.
+    """
+    runs: list[tuple[str, int]] = []
+    digits, strong, repeat = "", 0, 1
+    has_weak = has_number = False
+
+    def close_run() -> None:
+        nonlocal digits, strong, repeat, has_weak, has_number
+        # "paid 20 for 3" is prose, not a code: misheard words only count between single digits
+        if digits and not (has_weak and has_number):
+            runs.append((digits, strong))
+        digits, strong, repeat = "", 0, 1
+        has_weak = has_number = False
+
+    for token in _TOKEN_RE.findall((transcript or "").lower()):
+        if token.isdigit():
+            value, is_strong = token, True
+            has_number = has_number or len(token) > 1
+        elif token in _WORD_DIGITS:
+            value, is_strong = _WORD_DIGITS[token], True
+        elif token in _WEAK_DIGITS:
+            value, is_strong = _WEAK_DIGITS[token], False
+            has_weak = True
+        elif token in _REPEATS:
+            repeat = _REPEATS[token]
+            continue
+        else:
+            close_run()
+            continue
+        digits += value * repeat
+        strong += len(value) * repeat if is_strong else 0
+        repeat = 1
+    close_run()
+
+    candidates = [run for run, strong in runs if len(run) == length and strong >= length - 1]
+    if len(candidates) != 1 or any(len(run) > length for run, _ in runs):
+        return None
+    return candidates[0]
+
+
+_SUCCESS_KEYS = ("success", "authenticated", "is_authenticated", "verified", "valid")
+_STATUS_KEYS = ("status", "result")
+_SUCCESS_STATUSES = {"success", "succeeded", "ok", "authenticated", "verified", "valid"}
+_FAILURE_STATUSES = {"failure", "failed", "error", "invalid", "denied", "unauthorized", "rejected"}
+
+
+def auth_result(result: Any, text: str) -> bool | None:
+    """Interpret an ``authenticate_user`` result: True, False, or None when unclear.
+
+    Only structured fields decide: the MCP ``isError`` flag, a boolean such as
+    ``success``, or a ``status`` value. Free text is left to the LLM, since
+    "authenticated successfully, no errors found" holds words of both kinds.
+    """
+    if getattr(result, "isError", False):
+        return False
+    try:
+        payload = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    for key in _SUCCESS_KEYS:
+        value = payload.get(key)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return value.strip().lower() == "true"
+    for key in _STATUS_KEYS:
+        value = payload.get(key)
+        if isinstance(value, str):
+            status = value.strip().lower()
+            if status in _SUCCESS_STATUSES:
+                return True
+            if status in _FAILURE_STATUSES:
+                return False
+    return None
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import importlib
+import time
+from types import ModuleType
+
+from loguru import logger
+
+# LiveKit plugins are imported on first use rather than when worker.py loads, so
+# the supervisor process and ``download-files`` only pay for what they need.
+PLUGIN_MODULES = {
+    "deepgram": "livekit.plugins.deepgram",
+    "openai": "livekit.plugins.openai",
+    "silero": "livekit.plugins.silero",
+    "turn_detector": "livekit.plugins.turn_detector",
+    "noise_cancellation": "livekit.plugins.noise_cancellation",
+}
+
+# Plugins with model files fetched by ``python worker.py download-files``
+DOWNLOAD_PLUGINS = ("silero", "turn_detector", "noise_cancellation")
+
+# Plugins every job touches; prewarm imports them before a job is assigned
+JOB_PLUGINS = ("deepgram", "openai")
+
+
+def load_plugin(name: str) -> ModuleType:
+    # import_module caches in sys.modules, so repeat calls are a dict lookup
+    return importlib.import_module(PLUGIN_MODULES[name])
+
+
+def preload_plugins(names: tuple[str, ...]) -> None:
+    for name in names:
+        started = time.perf_counter()
+        load_plugin(name)
+        logger.debug("Imported plugin {} in {:.3f}s", name, time.perf_counter() - started)
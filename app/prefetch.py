@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+
+from app.config import get_settings
+from app.mcp_server import result_text
+from app.state import ConversationContext
+
+
+async def prefetch_account(userdata: ConversationContext, tools: list[str] | None = None) -> dict[str, str]:
+    """Fetch account data for the authenticated user concurrently and store it on ``userdata``.
+
+    Results arriving after the user logged out (or switched) are dropped. The calls go
+    through the tool cache, so a later LLM tool call for the same data is a cache hit.
+    """
+    server = userdata.mcp_server
+    user_id = userdata.user_id
+    tools = get_settings().prefetch_tools if tools is None else tools
+    if server is None or not user_id or not tools or not userdata.is_authenticated:
+        return {}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(server.call_tool(tool, {"user_id": user_id}) for tool in tools),
+        return_exceptions=True,
+    )
+
+    if not userdata.is_authenticated or userdata.user_id != user_id:
+        logger.info("Discarding account prefetch, session logged out while it ran")
+        return {}
+
+    fetched: dict[str, str] = {}
+    for tool, result in zip(tools, results):
+        if isinstance(result, BaseException):
+            logger.warning("Prefetch of {} failed: {}", tool, result)
+            continue
+        if getattr(result, "isError", False):
+            continue
+        text = result_text(result)
+        if text:
+            fetched[tool] = text
+    userdata.prefetched.update(fetched)
+    logger.info(
+        "Prefetched {} in {:.0f} ms", sorted(fetched), (time.perf_counter() - started) * 1000
+    )
+    return fetched
+
+
+def start_prefetch(userdata: ConversationContext) -> asyncio.Task[dict[str, str]] | None:
+    if not get_settings().prefetch_enabled:
+        return None
+    return asyncio.create_task(prefetch_account(userdata), name="account_prefetch")
+
+
+def prefetched_context(prefetched: dict[str, str]) -> str:
+    lines = [f"- {tool}: {text}" for tool, text in prefetched.items()]
+    return (
+        "Account data already retrieved for this user (current, no need to call these tools again):\n"
+        + "\n".join(lines)
+    )
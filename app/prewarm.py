@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from loguru import logger
+from livekit.agents import JobContext, JobProcess
+
+from app.capacity import start_publisher
+from app.plugins import JOB_PLUGINS, load_plugin, preload_plugins
+from app.procstats import format_bytes, rss_bytes
+
+# Keys under JobProcess.userdata shared by every job that runs in the process
+VAD_KEY = "vad"
+TURN_DETECTOR_KEY = "turn_detector"
+NOISE_CANCELLATION_KEY = "noise_cancellation"
+LOAD_REPORT_KEY = "model_load_report"
+
+
+@dataclass(frozen=True)
+class ModelLoad:
+    name: str
+    seconds: float
+    rss_delta_bytes: int
+    rss_after_bytes: int
+
+
+def _load_vad() -> Any:
+    return load_plugin("silero").VAD.load()
+
+
+def _load_turn_detector() -> Any:
+    from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+    return MultilingualModel()
+
+
+def _load_noise_cancellation() -> Any:
+    return load_plugin("noise_cancellation").BVC()
+
+
+MODEL_LOADERS: dict[str, Callable[[], Any]] = {
+    VAD_KEY: _load_vad,
+    TURN_DETECTOR_KEY: _load_turn_detector,
+    NOISE_CANCELLATION_KEY: _load_noise_cancellation,
+}
+
+
+def _timed_load(name: str, loader: Callable[[], Any]) -> tuple[Any, ModelLoad]:
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    model = loader()
+    elapsed = time.perf_counter() - started
+    rss_after = rss_bytes()
+    return model, ModelLoad(name, elapsed, rss_after - rss_before, rss_after)
+
+
+def prewarm(proc: JobProcess) -> None:
+    """Load the per-process models once, before any job is assigned to this process."""
+    preload_plugins(JOB_PLUGINS)
+    # Validates the agent flow too, so a broken flow fails the process before it takes a job
+    from app.flow import get_flow
+
+    get_flow()
+    # Helpline answers saved by earlier processes, mapped in before the first call
+    from app.semantic_cache import get_semantic_cache
+
+    get_semantic_cache()
+    report: list[ModelLoad] = []
+    for name, loader in MODEL_LOADERS.items():
+        model, load = _timed_load(name, loader)
+        proc.userdata[name] = model
+        report.append(load)
+        logger.info(
+            "Prewarmed {} in {:.3f}s (+{}, rss={})",
+            name,
+            load.seconds,
+            format_bytes(load.rss_delta_bytes),
+            format_bytes(load.rss_after_bytes),
+        )
+    proc.userdata[LOAD_REPORT_KEY] = report
+    # Tells the worker's readiness probe this process can take a call
+    start_publisher(prewarmed=True)
+
+
+def get_model(ctx: JobContext, name: str) -> Any:
+    """Return a prewarmed model, loading it cold if prewarm did not run in this process."""
+    model = ctx.proc.userdata.get(name)
+    if model is None:
+        model, load = _timed_load(name, MODEL_LOADERS[name])
+        ctx.proc.userdata[name] = model
+        logger.warning("Model {} was not prewarmed, loaded cold in {:.3f}s", name, load.seconds)
+    return model
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import string
+from collections import OrderedDict
+from typing import Any, AsyncIterator
+
+from loguru import logger
+from livekit import rtc
+from livekit.agents import Agent, AgentSession
+
+from app.config import get_settings
+
+
+class AudioLRUCache:
+    """Synthesized frames keyed by (voice, text), evicted least-recently-used by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], tuple[list[rtc.AudioFrame], int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple[str, str]) -> list[rtc.AudioFrame] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: tuple[str, str], frames: list[rtc.AudioFrame]) -> None:
+        size = sum(frame.data.nbytes for frame in frames)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (frames, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+
+_audio_cache: AudioLRUCache | None = None
+
+
+def get_audio_cache() -> AudioLRUCache:
+    global _audio_cache
+    if _audio_cache is None:
+        _audio_cache = AudioLRUCache(get_settings().scripted_audio_cache_mb * 1024 * 1024)
+    return _audio_cache
+
+
+def voice_key(tts: Any) -> str:
+    # StreamAdapter and similar wrappers keep the real engine on ``_tts``
+    inner = getattr(tts, "_tts", tts)
+    model = getattr(inner, "model", None)
+    if not isinstance(model, str):
+        model = getattr(getattr(inner, "_opts", None), "model", None)
+    return f"{type(inner).__module__}.{type(inner).__name__}:{model or 'default'}"
+
+
+def split_template(template: str, values: dict[str, str | None]) -> list[str]:
+    """Split a template into static and per-user segments, dropping empty ones.
+
+    ``"You have successfully authenticated, {name}."`` with ``name="John"`` gives
+    ``["You have successfully authenticated,", "John."]``: the static prefix is shared
+    by every caller and the short name part is the only audio synthesized per user.
+    """
+    segments: list[str] = []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        if literal:
+            segments.append(literal)
+        if field_name is not None:
+            segments.append(values.get(field_name) or "")
+    # Trailing punctuation belongs to the word before it, not to the next static chunk
+    merged: list[str] = []
+    for segment in segments:
+        stripped = segment.strip()
+        if not stripped:
+            continue
+        head = len(stripped) - len(stripped.lstrip(".,!?;:"))
+        if head and merged:
+            merged[-1] += stripped[:head]
+            stripped = stripped[head:].strip()
+        if stripped:
+            merged.append(stripped)
+    return merged
+
+
+async def _segment_frames(tts: Any, voice: str, text: str, cache: AudioLRUCache) -> AsyncIterator[rtc.AudioFrame]:
+    key = (voice, text)
+    cached = cache.get(key)
+    if cached is not None:
+        for frame in cached:
+            yield frame
+        return
+
+    frames: list[rtc.AudioFrame] = []
+    async with tts.synthesize(text) as stream:
+        async for audio in stream:
+            frames.append(audio.frame)
+            yield audio.frame
+    cache.put(key, frames)
+
+
+async def _utterance_audio(tts: Any, segments: list[str], cache: AudioLRUCache) -> AsyncIterator[rtc.AudioFrame]:
+    voice = voice_key(tts)
+    for segment in segments:
+        async for frame in _segment_frames(tts, voice, segment, cache):
+            yield frame
+
+
+def say_scripted(agent: Agent, template: str, **values: str | None):
+    """Speak a known sentence through TTS directly, skipping the LLM completion.
+
+    Audio for each static segment is served from the process-wide cache after the
+    first call. Falls back to ``generate_reply`` when scripted mode is disabled or
+    the session has no TTS.
+    """
+    session: AgentSession = agent.session
+    text = template.format(**{key: value or "" for key, value in values.items()})
+    tts = session.tts
+    if not get_settings().scripted_utterances or tts is None:
+        return session.generate_reply(instructions=text)
+
+    segments = split_template(template, values)
+    logger.debug("Scripted utterance | segments={}", segments)
+    return session.say(text, audio=_utterance_audio(tts, segments, get_audio_cache()))
@@ -1,15 +1,101 @@
 from __future__ import annotations
 
+import asyncio
+import re
+from typing import Any, Callable
+
 from loguru import logger
 
 SENSITIVE_KEYWORDS = {
     "password", "passcode", "otp", "o.t.p", "pin", "p.i.n", "secret", "cvv", "c.v.v"
 }
 
+# All keywords in one alternation, longest first, with word boundaries so "pin" does not
+# match "spinning". An optional plural "s" keeps "passwords" and "pins" covered.
+_KEYWORD_ALTERNATION = "|".join(
+    re.escape(keyword) for keyword in sorted(SENSITIVE_KEYWORDS, key=len, reverse=True)
+)
+SENSITIVE_REQUEST_RE = re.compile(
+    rf"(?<![a-z0-9])(?:{_KEYWORD_ALTERNATION})s?(?![a-z0-9])", re.IGNORECASE
+)
+
+# A keyword followed shortly by a value: "your PIN is 4821", "password: 'hunter2'".
+# The value must be quoted or a token of three or more characters with a digit, so
+# "your PIN is something I can't see" and "your OTP code is 4 digits" (a length, not
+# a code) do not trip it.
+SENSITIVE_DISCLOSURE_RE = re.compile(
+    rf"(?<![a-z0-9])(?:{_KEYWORD_ALTERNATION})s?(?![a-z0-9])"
+    r"(?:\s+(?:code|number|value))?\s*(?:is|was|are|would\s+be|:|=)\s*"
+    r"(?:['\"][^'\"\s]{2,}|(?=[a-z0-9]*\d)[a-z0-9]{3,}\b(?![-\s]*(?:digits?|characters?|chars?|letters?|numbers?|long)\b))",
+    re.IGNORECASE,
+)
+
+# Longest possible match prefix before the value starts; text older than this can't
+# become part of a future match, so it is safe to release.
+_DISCLOSURE_WINDOW = 48
+
 
 def contains_sensitive_request(text: str) -> bool:
-    lower = (text or "").lower()
-    return any(keyword in lower for keyword in SENSITIVE_KEYWORDS)
+    return SENSITIVE_REQUEST_RE.search(text or "") is not None
+
+
+class StreamingGuard:
+    """Incremental disclosure check for text that arrives in chunks (LLM tokens).
+
+    ``feed`` returns the part of the stream that is safe to speak now, holding back
+    only a trailing partial word and any keyword still waiting for its value, or
+    ``None`` once a secret is detected. The whole response is never buffered.
+    """
+
+    def __init__(self, pattern: re.Pattern[str] = SENSITIVE_DISCLOSURE_RE, window: int = _DISCLOSURE_WINDOW) -> None:
+        self._pattern = pattern
+        self._window = window
+        self._pending = ""
+        self.tripped = False
+        self.matched: str | None = None
+
+    @property
+    def keyword(self) -> str | None:
+        """The keyword that tripped the guard, safe to log (``matched`` includes the value)."""
+        if self.matched is None:
+            return None
+        found = SENSITIVE_REQUEST_RE.search(self.matched)
+        return found.group(0) if found else None
+
+    def feed(self, chunk: str) -> str | None:
+        if self.tripped:
+            return None
+        pending = self._pending + chunk
+        match = self._pattern.search(pending)
+        if match is not None:
+            self.tripped = True
+            self.matched = match.group(0)
+            self._pending = ""
+            return None
+
+        cut = len(pending)
+        # Keep a trailing partial word: "pass" may still become "password"
+        if pending and not pending[-1].isspace():
+            cut = max(pending.rfind(" "), pending.rfind("\n")) + 1
+        # Keep any keyword that could still be followed by a value
+        for keyword in SENSITIVE_REQUEST_RE.finditer(pending, 0, cut):
+            if len(pending) - keyword.start() < self._window:
+                cut = min(cut, keyword.start())
+                break
+        safe, self._pending = pending[:cut], pending[cut:]
+        return safe
+
+    def flush(self) -> str | None:
+        if self.tripped:
+            return None
+        match = self._pattern.search(self._pending)
+        if match is not None:
+            self.tripped = True
+            self.matched = match.group(0)
+            self._pending = ""
+            return None
+        rest, self._pending = self._pending, ""
+        return rest
 
 
 def refusal_message() -> str:
@@ -22,4 +108,40 @@ def refusal_message() -> str:
 def log_sensitive_attempt(user_id: str | None, text: str) -> None:
     logger.warning(
         "Sensitive info request blocked | user_id={}, text={}", user_id, text
-    )
\ No newline at end of file
+    )
+
+
+def _log_sensitive_keyword(user_id: str | None, keyword: str, action: str) -> None:
+    logger.warning("Sensitive info request {} | user_id={}, keyword={}", action, user_id, keyword)
+
+
+def report_sensitive_attempt(user_id: str | None, keyword: str, action: str = "blocked") -> None:
+    """Log the matched keyword (never the text around it, which may hold the secret) off the
+    current hot path: deferred to the next loop iteration when one is running."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _log_sensitive_keyword(user_id, keyword, action)
+        return
+    loop.call_soon(_log_sensitive_keyword, user_id, keyword, action)
+
+
+class TranscriptGuard:
+    """Flags sensitive requests in interim STT transcripts, once per utterance.
+
+    Subscribe ``on_transcribed`` to the session's ``user_input_transcribed`` event;
+    the keyword is usually caught on a partial transcript, before end of turn.
+    """
+
+    def __init__(self, user_id: Callable[[], str | None]) -> None:
+        self._user_id = user_id
+        self._reported = False
+
+    def on_transcribed(self, ev: Any) -> None:
+        found = None if self._reported else SENSITIVE_REQUEST_RE.search(ev.transcript or "")
+        if found is not None:
+            self._reported = True
+            # Only flagged here; the LLM output guard is what blocks a disclosure
+            report_sensitive_attempt(self._user_id(), found.group(0).lower(), action="flagged")
+        if ev.is_final:
+            self._reported = False
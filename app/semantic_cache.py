@@ -0,0 +1,352 @@
+"""Answers to general helpline questions, reused when a new question is close enough.
+
+Questions are embedded with feature hashing (words, word pairs and character
+trigrams into a fixed-size vector), which needs no model download and costs tens
+of microseconds on CPU. Vectors live in an in-memory matrix searched with one
+dot product, and are persisted to a memory-mapped ``.npy`` file next to a JSON
+sidecar so prewarmed processes and restarts start with the answers already seen.
+
+Hashing measures shared wording, not meaning: "open" and "close a joint savings
+account" score as near neighbours. So a hit also needs both questions to agree on
+every key term either contains (negations, actions such as open/close, places and
+channels, account and card products), the threshold is high, and the cache is off
+unless SEMANTIC_CACHE is set.
+
+Anything personal never enters the cache: questions with digits, account-data
+words or sensitive keywords, answers that mention the caller, and turns that
+called a tool (those answers depend on ``user_id`` data).
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from loguru import logger
+
+from app.config import Settings, get_settings
+from app.security import SENSITIVE_DISCLOSURE_RE, contains_sensitive_request
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an the is are was be to of in on at for and or do does did can could would should "
+    "i me my you your we our it its this that there what's whats please hi hey so just "
+    "how when where will get need with up".split()
+)
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+# Questions about the caller's own account, which only tool calls can answer
+_PERSONAL_RE = re.compile(
+    r"\d|\b(?:balance|bill|statement|transactions?|charge[sd]?|payments?|paid|deposits?|owe|due|logged|login|"
+    r"address|phone number|email|my (?:account|limit|loan|mortgage|card number))\b",
+    re.IGNORECASE,
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def _words(text: str) -> list[str]:
+    return [_stem(word) for word in _TOKEN_RE.findall(text.lower()) if word not in _STOPWORDS]
+
+
+# Words that flip or narrow what a question asks; two questions only share an answer when
+# they contain exactly the same ones
+_KEY_TERMS = frozenset(
+    _stem(word)
+    for word in (
+        # negation
+        "not no never without cannot can't don't doesn't didn't won't isn't aren't "
+        # actions, most with an opposite
+        "open close cancel activate deactivate block unblock freeze unfreeze lock unlock add remove "
+        "increase decrease raise lower reduce start stop send receive deposit withdraw withdrawal "
+        "transfer report replace change update dispute apply upgrade downgrade pay join leave "
+        "enable disable reset "
+        # places and channels
+        "abroad overseas international domestic foreign local home online branch app phone mobile atm "
+        # products, tiers and card states
+        "premium student business personal joint savings checking current credit debit prepaid gold "
+        "platinum basic standard mortgage loan isa card account cheque check lost stolen damaged expired "
+        # periods
+        "daily weekly monthly annual yearly"
+    ).split()
+)
+
+
+def key_terms(text: str) -> frozenset[str]:
+    return frozenset(word for word in _words(text) if word in _KEY_TERMS)
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """Unit-length hashed bag of words, word bigrams and character trigrams.
+
+    crc32 rather than ``hash()``: string hashing is salted per process, and vectors
+    are shared between processes through the cache file.
+    """
+    words = _words(text)
+    features: list[tuple[str, float]] = [(word, 1.0) for word in words]
+    features += [(f"{a} {b}", 0.7) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [(padded[i : i + 3], 0.3) for i in range(len(padded) - 2)]
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode())
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _mentions(text: str, personal_terms: Iterable[str | None]) -> bool:
+    lowered = text.lower()
+    return any(term and term.lower() in lowered for term in personal_terms)
+
+
+def is_cacheable_question(question: str, personal_terms: Iterable[str | None] = ()) -> bool:
+    question = question.strip()
+    return bool(
+        _TOKEN_RE.search(question.lower())
+        and not _PERSONAL_RE.search(question)
+        and not contains_sensitive_request(question)
+        and not _mentions(question, personal_terms)
+    )
+
+
+def is_cacheable_answer(answer: str, personal_terms: Iterable[str | None] = ()) -> bool:
+    return bool(
+        answer.strip()
+        and not contains_sensitive_request(answer)
+        and not SENSITIVE_DISCLOSURE_RE.search(answer)
+        and not _mentions(answer, personal_terms)
+    )
+
+
+@dataclass
+class CacheEntry:
+    question: str
+    answer: str
+    expires_at: float
+    # Seconds the caller waited for the LLM's first words: what a hit saves
+    cost: float
+    last_used: float
+    hits: int = 0
+
+
+@dataclass
+class SemanticCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+            "saved_seconds": round(self.saved_seconds, 3),
+            "saved_per_hit": round(self.saved_seconds / self.hits, 3) if self.hits else 0.0,
+        }
+
+
+class SemanticCache:
+    """Nearest-question lookup over stored answers, with per-entry TTL and LRU eviction by count."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        threshold: float = 0.85,
+        ttl: float = 86400,
+        max_entries: int = 512,
+        dim: int = 512,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.dim = dim
+        self.stats = SemanticCacheStats()
+        self._entries: list[CacheEntry] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._save_task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> SemanticCache:
+        settings = settings or get_settings()
+        return cls(
+            path=settings.semantic_cache_path or None,
+            threshold=settings.semantic_cache_threshold,
+            ttl=settings.semantic_cache_ttl,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _nearest(self, question: str, vector: np.ndarray) -> tuple[int, float]:
+        """The closest entry above the threshold that agrees with ``question`` on its key terms."""
+        if not self._entries:
+            return -1, 0.0
+        scores = self._vectors @ vector
+        terms = key_terms(question)
+        for index in np.argsort(-scores):
+            if scores[index] < self.threshold:
+                break
+            if key_terms(self._entries[index].question) == terms:
+                return int(index), float(scores[index])
+        return -1, 0.0
+
+    def _drop(self, indices: list[int]) -> None:
+        if not indices:
+            return
+        dropped = set(indices)
+        keep = [i for i in range(len(self._entries)) if i not in dropped]
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep]
+
+    def _expire(self, now: float) -> None:
+        self._drop([i for i, entry in enumerate(self._entries) if entry.expires_at <= now])
+
+    def lookup(self, question: str) -> CacheEntry | None:
+        now = time.time()
+        self._expire(now)
+        index, _ = self._nearest(question, embed(question, self.dim))
+        if index < 0:
+            self.stats.misses += 1
+            return None
+        entry = self._entries[index]
+        entry.hits += 1
+        entry.last_used = now
+        self.stats.hits += 1
+        self.stats.saved_seconds += entry.cost
+        return entry
+
+    def put(self, question: str, answer: str, cost: float) -> None:
+        now = time.time()
+        vector = embed(question, self.dim)
+        entry = CacheEntry(question, answer, now + self.ttl, cost, now)
+        index, _ = self._nearest(question, vector)
+        if index >= 0:
+            # Same question phrased again: refresh the answer in place
+            self._entries[index] = entry
+            self._vectors[index] = vector
+        else:
+            self._entries.append(entry)
+            self._vectors = np.vstack([self._vectors, vector[None, :]])
+        self.stats.stored += 1
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._expire(now)
+        excess = len(self._entries) - self.max_entries
+        if excess > 0:
+            by_use = sorted(range(len(self._entries)), key=lambda i: self._entries[i].last_used)
+            self._drop(by_use[:excess])
+            self.stats.evictions += excess
+
+    # --- persistence --------------------------------------------------------------------
+
+    def _files(self) -> tuple[Path, Path, Path]:
+        assert self.path is not None
+        return self.path.with_suffix(".npy"), self.path.with_suffix(".json"), self.path.with_suffix(".lock")
+
+    def _read_files(self) -> tuple[list[CacheEntry], np.ndarray]:
+        vectors_path, meta_path, _ = self._files()
+        try:
+            entries = [CacheEntry(**item) for item in json.loads(meta_path.read_text())]
+            vectors = np.load(vectors_path, mmap_mode="r")
+        except (OSError, ValueError, TypeError):
+            return [], np.zeros((0, self.dim), dtype=np.float32)
+        if vectors.shape != (len(entries), self.dim):
+            return [], np.zeros((0, self.dim), dtype=np.float32)
+        return entries, np.array(vectors, dtype=np.float32)
+
+    def load(self) -> None:
+        """Replace the in-memory index with the file contents, other processes' answers included."""
+        if self.path is None:
+            return
+        self._entries, self._vectors = self._read_files()
+        self._expire(time.time())
+
+    def save(self) -> None:
+        if self.path is not None:
+            self._write(list(self._entries), self._vectors.copy())
+
+    def _write(self, entries: list[CacheEntry], vectors: np.ndarray) -> None:
+        """Merge with what other processes saved, then replace both files under a lock."""
+        vectors_path, meta_path, lock_path = self._files()
+        vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            now = time.time()
+            known = {entry.question for entry in entries}
+            rows = [(entry, vector) for entry, vector in zip(entries, vectors) if entry.expires_at > now]
+            disk_entries, disk_vectors = self._read_files()
+            rows += [
+                (entry, vector)
+                for entry, vector in zip(disk_entries, disk_vectors)
+                if entry.question not in known and entry.expires_at > now
+            ]
+            rows = sorted(rows, key=lambda row: row[0].last_used, reverse=True)[: self.max_entries]
+
+            vectors_tmp = vectors_path.with_name(f"{vectors_path.name}.{os.getpid()}.tmp")
+            meta_tmp = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+            out = np.lib.format.open_memmap(vectors_tmp, mode="w+", dtype=np.float32, shape=(len(rows), self.dim))
+            for i, (_, vector) in enumerate(rows):
+                out[i] = vector
+            out.flush()
+            del out
+            meta_tmp.write_text(json.dumps([asdict(entry) for entry, _ in rows]))
+            os.replace(vectors_tmp, vectors_path)
+            os.replace(meta_tmp, meta_path)
+
+    def schedule_save(self) -> None:
+        """Save off the event loop; puts that land while a save is pending ride along with it."""
+        if self.path is None or (self._save_task is not None and not self._save_task.done()):
+            return
+        self._save_task = asyncio.create_task(self._save_soon(), name="semantic_cache_save")
+
+    async def _save_soon(self) -> None:
+        await asyncio.sleep(1.0)
+        # Snapshot on the loop; lookups and puts keep mutating the live index meanwhile
+        entries, vectors = list(self._entries), self._vectors.copy()
+        try:
+            await asyncio.to_thread(self._write, entries, vectors)
+        except OSError as e:
+            logger.warning("Failed to save semantic cache: {}", e)
+
+
+_semantic_cache: SemanticCache | None = None
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """The process-wide cache, loaded from disk on first use; ``None`` when SEMANTIC_CACHE is off."""
+    global _semantic_cache
+    settings = get_settings()
+    if not settings.semantic_cache_enabled:
+        return None
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache.from_settings(settings)
+        _semantic_cache.load()
+    return _semantic_cache
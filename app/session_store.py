@@ -0,0 +1,463 @@
+"""Session snapshots so a caller who drops, or whose worker is redeployed, resumes where they were.
+
+At every turn boundary the session's ``ConversationContext``, active agent, per-session
+facts and the caller's last few turns are encoded into a small binary blob and
+written to a store. A rejoin inside the auth-validity window (SESSION_AUTH_WINDOW,
+counted from OTP verification) goes straight back to that agent instead of a new
+OTP challenge.
+
+Resuming skips the OTP, so it needs something only the verified caller holds.
+The first snapshot after OTP success issues a random resume token and sends it to
+the caller's participant alone, as a reliable data packet on RESUME_TOPIC. The
+client passes it back as ``resumeToken`` in its participant metadata when it
+rejoins. Snapshots are keyed by the token's SHA-256, so neither the user ID nor
+the store's contents are enough to resume.
+
+Stores are picked by SESSION_STORE_URL:
+
+    sqlite:///path/to/sessions.db   file on the pod (survives reconnects and restarts)
+    redis://[:password@]host:6379/0 shared across pods; any RESP server will do,
+                                    e.g. ``python -m benchmarks.stub_resp_server``
+
+Tool results, prefetched account data and the agent's own replies (which quote
+balances and bills) are never stored. The history keeps only what the caller said,
+with digits masked, and the agent refetches what it needs.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Protocol
+from urllib.parse import unquote, urlsplit
+
+from loguru import logger
+from livekit import rtc
+from livekit.agents import Agent, AgentSession
+
+from app.config import Settings, get_settings
+from app.instructions import SESSION_FACTS_HEADER
+from app.state import ConversationContext, SessionState
+
+KEY_PREFIX = "voice-agent:session:"
+# Data-packet topic the resume token is delivered on
+RESUME_TOPIC = "voice-agent.resume"
+_FORMAT_VERSION = 1
+
+
+# --- encoding ---------------------------------------------------------------------------
+
+
+@dataclass
+class SessionSnapshot:
+    state: SessionState
+    user_id: str | None
+    user_name: str | None
+    authenticated_at: float | None
+    auth_attempts: int = 0
+    # The SESSION INFO message the active agent was built with
+    session_info: str = ""
+    # (role, text) for the caller's most recent messages, oldest first
+    history: list[tuple[str, str]] = field(default_factory=list)
+    saved_at: float = field(default_factory=time.time)
+
+
+def encode_snapshot(snapshot: SessionSnapshot) -> bytes:
+    """Version byte plus deflated positional JSON: no field names, typically a few hundred bytes."""
+    payload = [
+        snapshot.state.name,
+        snapshot.user_id,
+        snapshot.user_name,
+        snapshot.authenticated_at,
+        snapshot.auth_attempts,
+        snapshot.session_info,
+        [[role, text] for role, text in snapshot.history],
+        round(snapshot.saved_at, 3),
+    ]
+    return bytes([_FORMAT_VERSION]) + zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 6)
+
+
+def decode_snapshot(data: bytes) -> SessionSnapshot | None:
+    if not data or data[0] != _FORMAT_VERSION:
+        return None
+    try:
+        state, user_id, user_name, authenticated_at, auth_attempts, session_info, history, saved_at = json.loads(
+            zlib.decompress(data[1:])
+        )
+        return SessionSnapshot(
+            state=SessionState[state],
+            user_id=user_id,
+            user_name=user_name,
+            authenticated_at=authenticated_at,
+            auth_attempts=int(auth_attempts),
+            session_info=session_info,
+            history=[(role, text) for role, text in history],
+            saved_at=saved_at,
+        )
+    except (zlib.error, ValueError, TypeError, KeyError):
+        return None
+
+
+# --- stores -----------------------------------------------------------------------------
+
+
+class SessionStore(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class SQLiteSessionStore:
+    """One table on local disk; calls run on a worker thread so the event loop never blocks on I/O."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=2.0, check_same_thread=False, isolation_level=None)
+            # Job processes share the file: WAL lets readers and a writer proceed together
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+            self._db = db
+        return self._db
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT value FROM sessions WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute("REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)", (key, value, now + ttl))
+            db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn().execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class RespError(Exception):
+    pass
+
+
+class RedisSessionStore:
+    """GET/SET PX/DEL over a single RESP connection, reconnecting after any failure.
+
+    Only the three commands above (plus AUTH/SELECT on connect) are used, so Redis,
+    Valkey, KeyDB or the benchmarks stub can all serve it.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    async def _read_reply(self) -> Any:
+        assert self._reader is not None
+        line = await self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("RESP connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [await self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"unexpected RESP reply type {kind!r}")
+
+    async def _roundtrip(self, *args: str | bytes) -> Any:
+        assert self._writer is not None
+        chunks = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            chunks += [f"${len(data)}\r\n".encode(), data, b"\r\n"]
+        self._writer.write(b"".join(chunks))
+        await self._writer.drain()
+        return await asyncio.wait_for(self._read_reply(), self.timeout)
+
+    async def execute(self, *args: str | bytes) -> Any:
+        async with self._lock:
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    await self._connect()
+                return await self._roundtrip(*args)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                # The stream may hold half a reply: never reuse it
+                self._close()
+                raise
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", key, value, "PX", str(max(1, int(ttl * 1000))))
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", key)
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            self._close()
+
+
+def open_session_store(url: str) -> SessionStore | None:
+    scheme = urlsplit(url).scheme
+    if scheme == "sqlite":
+        # sqlite:///relative.db or sqlite:////absolute/path.db, as in SQLAlchemy URLs
+        return SQLiteSessionStore(url[len("sqlite:///"):] or ":memory:")
+    if scheme in ("redis", "resp"):
+        return RedisSessionStore(url)
+    if url:
+        logger.warning("Unsupported SESSION_STORE_URL scheme {!r}, session resume disabled", scheme)
+    return None
+
+
+_store: SessionStore | None = None
+_store_opened = False
+
+
+def get_session_store() -> SessionStore | None:
+    global _store, _store_opened
+    if not _store_opened:
+        _store = open_session_store(get_settings().session_store_url)
+        _store_opened = True
+    return _store
+
+
+# --- snapshot and resume ----------------------------------------------------------------
+
+
+def new_resume_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def session_key(resume_token: str) -> str:
+    """Store key for a resume token; only its hash is stored, so a store dump can't be replayed."""
+    return KEY_PREFIX + hashlib.sha256(resume_token.encode()).hexdigest()
+
+
+async def publish_resume_token(room: rtc.Room, participant_identity: str, token: str) -> None:
+    """Send the token to the caller's participant only."""
+    await room.local_participant.publish_data(
+        json.dumps({"resumeToken": token}),
+        reliable=True,
+        destination_identities=[participant_identity],
+        topic=RESUME_TOPIC,
+    )
+
+
+def _session_info(agent: Agent) -> str:
+    for item in agent.chat_ctx.items:
+        if item.type == "message" and item.role == "system":
+            text = item.text_content or ""
+            if text.startswith(SESSION_FACTS_HEADER):
+                return text
+    return ""
+
+
+_DIGITS_RE = re.compile(r"\d")
+
+
+def _history(agent: Agent, limit: int) -> list[tuple[str, str]]:
+    """The caller's recent turns. Assistant replies quote account data and are left out; digits the
+    caller spoke (account or card numbers) are masked."""
+    history = []
+    for item in agent.chat_ctx.items:
+        if item.type == "message" and item.role == "user" and item.text_content:
+            history.append((item.role, _DIGITS_RE.sub("#", item.text_content)))
+    return history[-limit:] if limit > 0 else []
+
+
+class SessionSnapshotter:
+    """Writes the session's snapshot whenever the agent goes back to listening (end of a turn).
+
+    Writes never overlap: a turn that ends while one is in flight marks the session
+    dirty and the latest state is written right after. ``key`` is the resumed session's
+    key, or ``None`` until the first authenticated snapshot issues a token and hands it to
+    ``deliver_token``; logging out forgets it, so the next OTP success issues a new one.
+    """
+
+    def __init__(
+        self,
+        session: AgentSession,
+        store: SessionStore,
+        key: str | None,
+        deliver_token: Callable[[str], Awaitable[None]],
+        settings: Settings | None = None,
+    ) -> None:
+        self.session = session
+        self.store = store
+        self.key = key
+        self.deliver_token = deliver_token
+        self.settings = settings or get_settings()
+        self._task: asyncio.Task[None] | None = None
+        self._dirty = False
+
+    def attach(self) -> SessionSnapshotter:
+        self.session.on("agent_state_changed", self._on_agent_state)
+        return self
+
+    def _on_agent_state(self, ev: Any) -> None:
+        if ev.new_state == "listening":
+            self.request()
+
+    def request(self) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain(), name="session_snapshot")
+
+    def snapshot(self) -> SessionSnapshot | None:
+        """The current state, or ``None`` when there is nothing worth resuming."""
+        userdata: ConversationContext = self.session.userdata
+        agent = self.session.current_agent
+        if not userdata.is_authenticated or userdata.authenticated_at is None:
+            return None
+        return SessionSnapshot(
+            state=userdata.state,
+            user_id=userdata.user_id,
+            user_name=userdata.user_name,
+            authenticated_at=userdata.authenticated_at,
+            auth_attempts=userdata.auth_attempts,
+            session_info=_session_info(agent),
+            history=_history(agent, self.settings.session_history_items),
+        )
+
+    async def _drain(self) -> None:
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self.save()
+            except Exception as e:
+                logger.warning("Session snapshot failed: {}", e)
+                return
+
+    async def save(self) -> None:
+        snapshot = self.snapshot()
+        remaining = (
+            snapshot.authenticated_at + self.settings.session_auth_window - time.time() if snapshot is not None else 0
+        )
+        if snapshot is None or remaining <= 0:
+            # Logged out, never authenticated or past the window: a rejoin must start from the OTP again
+            if self.key is not None:
+                await self.store.delete(self.key)
+                self.key = None
+            return
+        if self.key is None:
+            token = new_resume_token()
+            self.key = session_key(token)
+            # Stored before it is handed out, so the token works as soon as the client has it
+            await self.store.set(self.key, encode_snapshot(snapshot), ttl=remaining)
+            await self.deliver_token(token)
+            return
+        await self.store.set(self.key, encode_snapshot(snapshot), ttl=remaining)
+
+
+async def load_resumable(
+    store: SessionStore, key: str, user_id: str | None, settings: Settings | None = None
+) -> SessionSnapshot | None:
+    """The stored snapshot for ``key`` if it is still inside the auth window and belongs to ``user_id``.
+
+    ``user_id`` is required: the token proves possession, and the caller must also claim the same user.
+    """
+    settings = settings or get_settings()
+    try:
+        snapshot = decode_snapshot(await store.get(key) or b"")
+    except Exception as e:
+        logger.warning("Session store unavailable, starting a fresh session: {}", e)
+        return None
+    if snapshot is None or snapshot.authenticated_at is None:
+        return None
+    from app.flow import get_flow
+
+    flow = get_flow()
+    if snapshot.state not in flow.states or snapshot.state == flow.entry:
+        # Only post-authentication agents are resumed; anything else starts over
+        return None
+    if time.time() - snapshot.authenticated_at > settings.session_auth_window:
+        return None
+    if not user_id or snapshot.user_id != user_id:
+        return None
+    return snapshot
+
+
+async def build_resumed_agent(snapshot: SessionSnapshot, userdata: ConversationContext, **agent_kwargs: Any) -> Agent:
+    """Restore ``userdata`` from the snapshot and build its agent with the recent history replayed."""
+    from app.flow import get_flow
+
+    userdata.user_id = snapshot.user_id
+    userdata.user_name = snapshot.user_name
+    userdata.is_authenticated = True
+    userdata.authenticated_at = snapshot.authenticated_at
+    userdata.auth_attempts = snapshot.auth_attempts
+    userdata.state = snapshot.state
+    userdata.resumed = True
+
+    agent = get_flow().create(snapshot.state, session_info=snapshot.session_info, **agent_kwargs)
+    chat_ctx = agent.chat_ctx.copy()
+    for role, text in snapshot.history:
+        chat_ctx.add_message(role=role, content=text)
+    await agent.update_chat_ctx(chat_ctx)
+    return agent
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any, AsyncIterable
+
+from livekit.agents import tokenize, tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
+
+from app.config import Settings, get_settings
+
+# --- spoken-form normalization ----------------------------------------------------------
+# BASE_USER_INSTRUCTIONS: read numbers as digit sequences, not currency, unless the
+# amount is money. The model doesn't always comply, so the TTS text is fixed up here.
+
+_ONES = (
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+    "fourteen fifteen sixteen seventeen eighteen nineteen"
+).split()
+_TENS = "_ _ twenty thirty forty fifty sixty seventy eighty ninety".split()
+_SCALES = ((1_000_000_000, "billion"), (1_000_000, "million"), (1_000, "thousand"))
+
+_CURRENCIES = {
+    "$": ("dollar", "dollars", "cent", "cents"),
+    "£": ("pound", "pounds", "penny", "pence"),
+    "€": ("euro", "euros", "cent", "cents"),
+}
+
+_MONEY_RE = re.compile(
+    r"(?P<symbol>[$£€])\s?(?P<whole>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<fraction>\d{1,2}))?(?!\d)"
+    r"(?:\s(?P<scale>thousand|million|billion)\b)?"
+)
+_PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)\s?%")
+
+
+def number_words(n: int) -> str:
+    if n < 20:
+        return _ONES[n]
+    if n < 100:
+        tens, ones = divmod(n, 10)
+        return _TENS[tens] + (f"-{_ONES[ones]}" if ones else "")
+    if n < 1000:
+        hundreds, rest = divmod(n, 100)
+        return f"{_ONES[hundreds]} hundred" + (f" {number_words(rest)}" if rest else "")
+    value, name = next((value, name) for value, name in _SCALES if n >= value)
+    head, rest = divmod(n, value)
+    return f"{number_words(head)} {name}" + (f" {number_words(rest)}" if rest else "")
+
+
+def _spoken_money(match: re.Match[str]) -> str:
+    unit, units, sub, subs = _CURRENCIES[match["symbol"]]
+    whole = match["whole"].replace(",", "")
+    if match["scale"]:
+        # "$1.5 million" -> "1.5 million dollars"; the TTS reads the decimal fine
+        amount = whole + (f".{match['fraction']}" if match["fraction"] else "")
+        return f"{amount} {match['scale']} {units}"
+    major = int(whole)
+    minor = int(match["fraction"].ljust(2, "0")) if match["fraction"] else 0
+    parts = []
+    if major or not minor:
+        parts.append(f"{number_words(major)} {unit if major == 1 else units}")
+    if minor:
+        parts.append(f"{number_words(minor)} {sub if minor == 1 else subs}")
+    return " and ".join(parts)
+
+
+def normalize_for_speech(text: str, digit_run_min: int = 5) -> str:
+    """Spell out money and percentages and space out long digit runs (account or reference numbers)."""
+    text = _MONEY_RE.sub(_spoken_money, text)
+    text = _PERCENT_RE.sub(r"\1 percent", text)
+    if digit_run_min > 0:
+        run = re.compile(rf"(?<![\d.,])\d{{{digit_run_min},}}(?![.,]?\d)")
+        text = run.sub(lambda m: " ".join(m.group()), text)
+    return text
+
+
+# --- chunking ---------------------------------------------------------------------------
+# A boundary only counts once the whitespace after it has arrived, so "12.50" and
+# "e.g." mid-stream are never cut and every chunk ends on a whole word.
+
+_SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s+")
+_CLAUSE_END_RE = re.compile(r"(?:[,;:—]|\s[-–])\s+")
+_ABBREVIATIONS = frozenset(
+    {"mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "etc", "e.g", "i.e", "a.m", "p.m", "approx", "dept"}
+)
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    if text[end - 1] != ".":
+        return False
+    words = text[:end].split()
+    if not words:
+        return False
+    word = words[-1].rstrip("\"')]").rstrip(".").lower()
+    return word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+
+class SpeechChunker:
+    """Cuts streamed LLM text into TTS chunks: a short first clause, then whole sentences.
+
+    The first chunk of each segment goes out at the first sentence or clause
+    boundary past ``first_min_chars`` (or at a word boundary past
+    ``first_max_chars``), so synthesis starts while the model is still writing.
+    Later chunks hold at least ``min_chars`` and end on a sentence boundary, which
+    keeps the prosody of full sentences; ``max_chars`` bounds a run-on sentence.
+    """
+
+    def __init__(
+        self,
+        first_min_chars: int = 20,
+        first_max_chars: int = 60,
+        min_chars: int = 80,
+        max_chars: int = 240,
+        normalize: bool = True,
+        digit_run_min: int = 5,
+    ) -> None:
+        self.first_min_chars = first_min_chars
+        self.first_max_chars = first_max_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.normalize = normalize
+        self.digit_run_min = digit_run_min
+        self._buffer = ""
+        self._emitted = 0
+
+    def push(self, text: str) -> list[str]:
+        self._buffer += text
+        chunks = []
+        while (cut := self._next_cut()) is not None:
+            chunk, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            chunks.extend(self._finish(chunk))
+        return chunks
+
+    def flush(self) -> list[str]:
+        """Emit whatever is buffered and start a new segment."""
+        chunk, self._buffer = self._buffer, ""
+        chunks = self._finish(chunk)
+        self._emitted = 0
+        return chunks
+
+    def _finish(self, chunk: str) -> list[str]:
+        chunk = chunk.strip()
+        if not chunk:
+            return []
+        self._emitted += 1
+        return [normalize_for_speech(chunk, self.digit_run_min) if self.normalize else chunk]
+
+    def _next_cut(self) -> int | None:
+        buffer = self._buffer
+        first = self._emitted == 0
+        min_len, max_len = (self.first_min_chars, self.first_max_chars) if first else (self.min_chars, self.max_chars)
+        if len(buffer) < min_len:
+            return None
+
+        for match in _SENTENCE_END_RE.finditer(buffer):
+            if match.end() >= min_len and not _is_abbreviation(buffer, match.start() + 1):
+                return match.end()
+        if first and (match := _CLAUSE_END_RE.search(buffer, min_len - 1)):
+            return match.end()
+        if len(buffer) <= max_len:
+            return None
+
+        # Run-on text: cut at the last clause boundary, else the last word, before the limit
+        clauses = [m.end() for m in _CLAUSE_END_RE.finditer(buffer, 0, max_len) if m.end() >= min_len]
+        if clauses:
+            return clauses[-1]
+        space = buffer.rfind(" ", min_len, max_len)
+        return space + 1 if space > 0 else None
+
+
+class SpeechChunkTokenizer(tokenize.SentenceTokenizer):
+    """``SpeechChunker`` as a LiveKit sentence tokenizer, for ``tts.StreamAdapter``."""
+
+    def __init__(
+        self,
+        *,
+        first_min_chars: int = 20,
+        first_max_chars: int = 60,
+        min_chars: int = 80,
+        max_chars: int = 240,
+        normalize: bool = True,
+        digit_run_min: int = 5,
+    ) -> None:
+        self._options = dict(
+            first_min_chars=first_min_chars,
+            first_max_chars=first_max_chars,
+            min_chars=min_chars,
+            max_chars=max_chars,
+            normalize=normalize,
+            digit_run_min=digit_run_min,
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> SpeechChunkTokenizer:
+        settings = settings or get_settings()
+        return cls(
+            first_min_chars=settings.tts_first_chunk_min_chars,
+            first_max_chars=settings.tts_first_chunk_max_chars,
+            min_chars=settings.tts_chunk_min_chars,
+            max_chars=settings.tts_chunk_max_chars,
+            normalize=settings.tts_normalize_numbers,
+            digit_run_min=settings.tts_digit_run_min,
+        )
+
+    def chunker(self) -> SpeechChunker:
+        return SpeechChunker(**self._options)
+
+    def tokenize(self, text: str, *, language: NotGivenOr[str] = NOT_GIVEN) -> list[str]:
+        chunker = self.chunker()
+        return chunker.push(text) + chunker.flush()
+
+    def stream(self, *, language: NotGivenOr[str] = NOT_GIVEN) -> SpeechChunkStream:
+        return SpeechChunkStream(self.chunker())
+
+
+class SpeechChunkStream(tokenize.SentenceStream):
+    def __init__(self, chunker: SpeechChunker) -> None:
+        super().__init__()
+        self._chunker = chunker
+        self._segment_id = utils.shortuuid()
+
+    def _send(self, chunks: list[str]) -> None:
+        for chunk in chunks:
+            self._event_ch.send_nowait(tokenize.TokenData(token=chunk, segment_id=self._segment_id))
+
+    def _check_open(self) -> None:
+        if self._event_ch.closed:
+            raise RuntimeError("speech chunk stream is closed")
+
+    def push_text(self, text: str) -> None:
+        self._check_open()
+        self._send(self._chunker.push(text))
+
+    def flush(self) -> None:
+        self._check_open()
+        self._send(self._chunker.flush())
+        self._segment_id = utils.shortuuid()
+
+    def end_input(self) -> None:
+        self.flush()
+        self._event_ch.close()
+
+    async def aclose(self) -> None:
+        self._event_ch.close()
+
+
+class FirstClauseTTS(tts.TTS):
+    """A streaming TTS whose first clause of each segment is synthesized on its own.
+
+    A streaming engine such as Deepgram's holds text until the segment is flushed, so
+    the first audio waits for the whole reply. Here the chunker's first chunk goes out
+    as a one-off ``synthesize()`` request while the model is still writing, and the
+    rest of the segment is pushed, normalized, into one native stream, whose audio
+    plays after the first clause's. Unlike ``tts.StreamAdapter`` that costs one extra
+    request per reply, not one per chunk.
+    """
+
+    def __init__(self, engine: tts.TTS, tokenizer: SpeechChunkTokenizer) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=True),
+            sample_rate=engine.sample_rate,
+            num_channels=engine.num_channels,
+        )
+        self._wrapped_tts = engine
+        self._tokenizer = tokenizer
+        self._wrapped_tts.on("metrics_collected", self._on_metrics_collected)
+
+    @property
+    def model(self) -> str:
+        return self._wrapped_tts.model
+
+    @property
+    def provider(self) -> str:
+        return self._wrapped_tts.provider
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> tts.ChunkedStream:
+        return self._wrapped_tts.synthesize(text, conn_options=conn_options)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> FirstClauseStream:
+        return FirstClauseStream(tts=self, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self._wrapped_tts.prewarm()
+
+    def _on_metrics_collected(self, *args: Any, **kwargs: Any) -> None:
+        self.emit("metrics_collected", *args, **kwargs)
+
+    async def aclose(self) -> None:
+        self._wrapped_tts.off("metrics_collected", self._on_metrics_collected)
+
+
+class FirstClauseStream(tts.SynthesizeStream):
+    def __init__(self, *, tts: FirstClauseTTS, conn_options: APIConnectOptions) -> None:
+        super().__init__(tts=tts, conn_options=conn_options)
+        self._tts: FirstClauseTTS = tts
+        self._wrapped_conn_options = conn_options
+
+    async def _metrics_monitor_task(self, event_aiter: AsyncIterable[tts.SynthesizedAudio]) -> None:
+        # The wrapped engine reports its own metrics
+        async for _ in event_aiter:
+            pass
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        engine = self._tts._wrapped_tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=self._tts.num_channels,
+            mime_type="audio/pcm",
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+        native = engine.stream(conn_options=self._wrapped_conn_options)
+        # What to play, in order: a first clause's own synthesis, or None for the native
+        # stream's next segment
+        playlist = utils.aio.Chan[tts.ChunkedStream | None]()
+        clauses: list[tts.ChunkedStream] = []
+
+        async def _forward_input() -> None:
+            chunker = self._tts._tokenizer.chunker()
+            first_sent = native_pending = False
+
+            def send(chunks: list[str]) -> None:
+                nonlocal first_sent, native_pending
+                for chunk in chunks:
+                    if not first_sent:
+                        first_sent = True
+                        self._mark_started()
+                        clauses.append(engine.synthesize(chunk, conn_options=self._wrapped_conn_options))
+                        playlist.send_nowait(clauses[-1])
+                        continue
+                    if not native_pending:
+                        native_pending = True
+                        playlist.send_nowait(None)
+                    native.push_text(chunk + " ")
+
+            def end_segment() -> None:
+                nonlocal first_sent, native_pending
+                send(chunker.flush())
+                if native_pending:
+                    native.flush()
+                first_sent = native_pending = False
+
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    end_segment()
+                else:
+                    send(chunker.push(data))
+            end_segment()
+            native.end_input()
+            playlist.close()
+
+        async def _play() -> None:
+            async for clause in playlist:
+                if clause is None:
+                    async for audio in native:
+                        output_emitter.push_frame(audio.frame)
+                        if audio.is_final:
+                            break
+                else:
+                    async for audio in clause:
+                        output_emitter.push_frame(audio.frame)
+                output_emitter.flush()
+
+        tasks = [asyncio.create_task(_forward_input()), asyncio.create_task(_play())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await utils.aio.cancel_and_wait(*tasks)
+            await asyncio.gather(*(clause.aclose() for clause in clauses), native.aclose())
+
+
+def chunked_tts(engine: tts.TTS, settings: Settings | None = None) -> tts.TTS:
+    """Feed ``engine`` through the speech chunker, or return it unchanged when TTS_CHUNKING is off.
+
+    A streaming engine keeps its native stream and only has each reply's first clause
+    synthesized separately (``FirstClauseTTS``); any other engine synthesizes every chunk.
+    """
+    settings = settings or get_settings()
+    if not settings.tts_chunking:
+        return engine
+    tokenizer = SpeechChunkTokenizer.from_settings(settings)
+    if engine.capabilities.streaming:
+        return FirstClauseTTS(engine, tokenizer)
+    return tts.StreamAdapter(tts=engine, sentence_tokenizer=tokenizer)
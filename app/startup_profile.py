@@ -0,0 +1,137 @@
+"""``python worker.py profile-startup``: per-module import time and RSS after importing the worker.
+
+Runs the import in a fresh interpreter with ``-X importtime`` so nothing already
+loaded in this process skews the numbers. ``--eager`` also imports every plugin
+and agent module, which is what a job process ends up paying after prewarm.
+Reports the modules ``worker`` imports directly, what ``--eager`` adds on top,
+and the slowest modules anywhere in the tree by self time.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.procstats import format_bytes
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import worker
+{eager}
+elapsed = time.perf_counter() - started
+from app.procstats import rss_bytes
+print(json.dumps({{"seconds": elapsed, "rss": rss_bytes(), "modules": len(sys.modules)}}))
+"""
+
+_EAGER = """
+from app.plugins import PLUGIN_MODULES, preload_plugins
+preload_plugins(tuple(PLUGIN_MODULES))
+import app.agents
+for name in app.agents.__all__:
+    getattr(app.agents, name)
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            timings.append(
+                ImportTiming(
+                    module=name.strip(),
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    depth=(len(name) - len(name.lstrip())) // 2,
+                )
+            )
+        except ValueError:
+            continue
+    return timings
+
+
+def children_of(timings: list[ImportTiming], root: str) -> list[ImportTiming]:
+    """Modules imported directly by the top-level import ``root``.
+
+    ``-X importtime`` reports a module after everything it imports, so the depth-1
+    lines just before a depth-0 line are that module's children.
+    """
+    children: list[ImportTiming] = []
+    for timing in timings:
+        if timing.depth == 0:
+            if timing.module == root:
+                return children
+            children = []
+        elif timing.depth == 1:
+            children.append(timing)
+    return []
+
+
+def imported_after(timings: list[ImportTiming], root: str) -> list[ImportTiming]:
+    """Top-level imports made after ``root`` finished, i.e. the probe's ``--eager`` loads."""
+    names = [t.module for t in timings]
+    if root not in names:
+        return []
+    return [t for t in timings[names.index(root) + 1 :] if t.depth == 0]
+
+
+def profile(eager: bool = False) -> tuple[dict[str, float], list[ImportTiming]]:
+    root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(root), os.environ.get("PYTHONPATH")]))}
+    code = _PROBE.format(eager=_EAGER if eager else "")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    summary = json.loads(proc.stdout.strip().splitlines()[-1])
+    return summary, parse_importtime(proc.stderr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="worker.py profile-startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=25, help="rows to list per table")
+    parser.add_argument("--eager", action="store_true", help="also import every plugin and agent module")
+    args = parser.parse_args(argv)
+
+    try:
+        summary, timings = profile(args.eager)
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        return 1
+
+    print(
+        f"import worker{' (eager)' if args.eager else ''}: {summary['seconds'] * 1000:.0f} ms, "
+        f"{summary['modules']} modules, rss={format_bytes(summary['rss'])}"
+    )
+    # Everything worker pulls in sits under it, so its own row says little; break it down one level
+    _print_table("imported by worker", children_of(timings, "worker"), "cumulative_us", args.top)
+    if args.eager:
+        _print_table("imported by --eager", imported_after(timings, "worker"), "cumulative_us", args.top)
+    _print_table("slowest modules by self time", timings, "self_us", args.top)
+    return 0
+
+
+def _print_table(title: str, timings: list[ImportTiming], key: str, top: int) -> None:
+    print(f"\n{title}")
+    print(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for timing in sorted(timings, key=lambda t: getattr(t, key), reverse=True)[:top]:
+        print(f"{timing.cumulative_us / 1000:>13.1f} {timing.self_us / 1000:>8.1f}  {timing.module}")
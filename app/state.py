@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from enum import Enum, auto
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Optional
+
+from app.tool_cache import get_tool_cache
 
 
 class SessionState(Enum):
@@ -23,11 +25,25 @@ class ConversationContext:
     last_user_message: Optional[str] = None
     last_agent_message: Optional[str] = None
     is_authenticated: bool = False
+    # Wall-clock time of OTP verification; bounds how long a dropped call can resume
+    authenticated_at: Optional[float] = None
+    # Set when the session was restored from a snapshot, until the agent has greeted
+    resumed: bool = False
+    # Account tool results fetched right after authentication, keyed by tool name
+    prefetched: dict[str, str] = field(default_factory=dict)
+    # MCP server used for direct (non-LLM) tool calls
+    mcp_server: Optional[Any] = field(default=None, repr=False, compare=False)
+    # Per-session audio profile and SNR meter (app.audio_budget.SessionAudioController)
+    audio_controller: Optional[Any] = field(default=None, repr=False, compare=False)
 
     def reset_auth(self) -> None:
+        get_tool_cache().invalidate_user(self.user_id)
         self.user_mobile = None
         self.user_id = None
         self.user_name = None
         self.auth_attempts = 0
         self.is_authenticated = False
+        self.authenticated_at = None
+        self.resumed = False
+        self.prefetched.clear()
         self.state = SessionState.GREETING
\ No newline at end of file
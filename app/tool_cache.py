@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+CacheKey = tuple[str, str, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+        }
+
+
+def normalize_arguments(arguments: dict[str, Any] | None) -> str:
+    normalized = {
+        key: value.strip() if isinstance(value, str) else value
+        for key, value in (arguments or {}).items()
+        if value is not None
+    }
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def parse_ttls(spec: str) -> dict[str, float]:
+    """Parse ``"get_user_info=300,get_user_bill=60"`` into a per-tool TTL map (seconds)."""
+    ttls: dict[str, float] = {}
+    for item in spec.split(","):
+        name, sep, seconds = item.partition("=")
+        if sep and name.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class _LeaderCancelled(Exception):
+    """Handed to coalesced callers when the call they were waiting on was cancelled."""
+
+
+class ToolCallCache:
+    """TTL cache with in-flight coalescing for tool calls, keyed by (tool, arguments, user_id).
+
+    Only tools with a positive TTL are cached or coalesced; everything else (for
+    example ``authenticate_user``) passes straight through.
+    """
+
+    def __init__(self, ttls: dict[str, float]) -> None:
+        self.ttls = ttls
+        self.stats = CacheStats()
+        self._entries: dict[CacheKey, tuple[float, Any]] = {}
+        self._inflight: dict[CacheKey, asyncio.Future[Any]] = {}
+        self._user_keys: dict[str, set[CacheKey]] = {}
+        # Bumped on invalidation so calls already in flight don't repopulate stale data
+        self._user_generation: dict[str, int] = {}
+
+    def is_cached_tool(self, name: str) -> bool:
+        return self.ttls.get(name, 0) > 0
+
+    @staticmethod
+    def make_key(name: str, arguments: dict[str, Any] | None, user_id: str | None = None) -> CacheKey:
+        if user_id is None and arguments:
+            user_id = arguments.get("user_id")
+        return (name, normalize_arguments(arguments), str(user_id or "").strip())
+
+    def peek(self, key: CacheKey) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def call(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None,
+        fetch: Callable[[], Awaitable[T]],
+        *,
+        user_id: str | None = None,
+        cacheable: Callable[[T], bool] = lambda _: True,
+    ) -> T:
+        if not self.is_cached_tool(name):
+            return await fetch()
+
+        key = self.make_key(name, arguments, user_id)
+        cached = self.peek(key)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # The caller that owned the fetch went away (e.g. an interrupted turn); this one
+                # still wants the result, so it fetches (or joins the next fetch) itself
+                return await self.call(name, arguments, fetch, user_id=user_id, cacheable=cacheable)
+
+        self.stats.misses += 1
+        user = key[2]
+        generation = self._user_generation.get(user, 0)
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except BaseException as e:
+            if not future.done():
+                # Followers see the error, but not the leader's own cancellation
+                future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+                # Mark it retrieved so an unshared failure isn't logged
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if cacheable(result) and self._user_generation.get(user, 0) == generation:
+                now = time.monotonic()
+                self._sweep(now)
+                self._entries[key] = (now + self.ttls[name], result)
+                self._user_keys.setdefault(user, set()).add(key)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries, which ``peek`` only removes when the same key is read again, and
+        the bookkeeping of users with nothing cached or in flight, so a long-lived process stays
+        the size of its live sessions."""
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        self._user_keys = {
+            user: live for user, keys in self._user_keys.items() if (live := {k for k in keys if k in self._entries})
+        }
+        # A generation only matters to calls started before an invalidation and still in flight
+        inflight = {key[2] for key in self._inflight}
+        self._user_generation = {user: n for user, n in self._user_generation.items() if user in inflight}
+
+    def invalidate_user(self, user_id: str | None) -> None:
+        user = str(user_id or "").strip()
+        if not user:
+            return
+        self._user_generation[user] = self._user_generation.get(user, 0) + 1
+        for key in self._user_keys.pop(user, set()):
+            self._entries.pop(key, None)
+        self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._user_keys.clear()
+
+
+_tool_cache: ToolCallCache | None = None
+
+
+def get_tool_cache() -> ToolCallCache:
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ToolCallCache(parse_ttls(get_settings().mcp_cache_ttls))
+    return _tool_cache
@@ -0,0 +1,276 @@
+"""Audio budget: sessions per core with every caller on BVC and with per-session profiles.
+
+Replays WAV fixtures (``--wav-dir``, mono 16-bit; clean and noisy speech is
+synthesized when none are given, and the SNRs of synthetic audio say little about
+real calls) through the controller's tap in 20 ms frames to measure the SNR it
+sees, the VAD tuning that follows and the tap's own cost per frame. Silero VAD is
+timed on the same audio when the plugin is installed.
+
+The NC and BVC filters refuse to run on a track outside a LiveKit room, so they
+are only timed with ``--livekit``, which publishes the fixtures to a throwaway
+room on LIVEKIT_URL and compares the process CPU of a filtered and an unfiltered
+stream of that track. Without it their costs are the AUDIO_COST_BVC and
+AUDIO_COST_NC settings, and every session count below is labelled an estimate.
+
+"Every caller on BVC" gives each session BVC and a 16 kHz VAD; "per-session
+profiles" mixes the fixtures' SNRs evenly across sessions and lets each take the
+profile its share covers. Noisy callers never drop below ``reduced`` (the NC
+model with an 8 kHz VAD), so the count is what the host holds with them kept
+there; clean callers run without noise cancellation.
+
+    python -m benchmarks.bench_audio_budget --wav-dir recordings/ --cores 4 --livekit
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import time
+import wave
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.audio_budget import (
+    FULL,
+    LIGHT,
+    MINIMAL,
+    NOISY_SNR_DB,
+    REDUCED,
+    STANDARD,
+    AudioProfile,
+    SessionAudioController,
+    allocate,
+    choose_profile,
+    vad_tuning,
+)
+from app.config import Settings, get_settings
+
+FRAME_SECONDS = 0.02
+
+
+@dataclass
+class Frame:
+    data: memoryview
+    sample_rate: int
+
+
+def _speech_like(seconds: float, rate: int, noise_db: float, seed: int) -> np.ndarray:
+    """Syllable-rate bursts of harmonics over steady noise ``noise_db`` below the speech level."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = sum(np.sin(2 * math.pi * 140 * k * t) / k for k in range(1, 8))
+    envelope = (np.sin(2 * math.pi * 3 * t) > 0.2) * (np.sin(2 * math.pi * 0.25 * t) > -0.3)
+    speech = 0.3 * voiced * envelope / np.abs(voiced).max()
+    noise = rng.normal(0, 0.3 * 10 ** (-noise_db / 20) / 3, t.size)
+    return np.clip((speech + noise) * 32767, -32768, 32767).astype(np.int16)
+
+
+def generate_fixtures(directory: Path, rate: int = 24000) -> list[Path]:
+    paths = []
+    for name, noise_db in (("clean", 40), ("office", 20), ("street", 4)):
+        path = directory / f"{name}.wav"
+        with wave.open(str(path), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            out.writeframes(_speech_like(12.0, rate, noise_db, seed=len(paths)).tobytes())
+        paths.append(path)
+    return paths
+
+
+def read_frames(path: Path) -> list[Frame]:
+    with wave.open(str(path), "rb") as source:
+        if source.getsampwidth() != 2:
+            raise SystemExit(f"{path}: only 16-bit PCM is supported")
+        rate, channels = source.getframerate(), source.getnchannels()
+        samples = np.frombuffer(source.readframes(source.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)[:, 0].copy()
+    size = int(rate * FRAME_SECONDS)
+    return [Frame(memoryview(samples[i : i + size]), rate) for i in range(0, len(samples) - size + 1, size)]
+
+
+async def _replay(controller: SessionAudioController, frames: list[Frame]) -> None:
+    async def source():
+        for frame in frames:
+            yield frame
+
+    async for _ in controller.tap(source()):
+        pass
+
+
+def _vad_cost(frames: list[Frame], sample_rate: int) -> float | None:
+    """Silero VAD CPU per second of audio, or None without the plugin."""
+    try:
+        from livekit import rtc
+        from livekit.plugins import silero
+    except ImportError:
+        return None
+
+    async def run() -> float:
+        vad = silero.VAD.load(sample_rate=sample_rate)
+        stream = vad.stream()
+        started = time.process_time()
+        for frame in frames:
+            samples = np.asarray(frame.data)
+            stream.push_frame(rtc.AudioFrame(samples.tobytes(), frame.sample_rate, 1, len(samples)))
+        stream.end_input()
+        async for _ in stream:
+            pass
+        return (time.process_time() - started) / (len(frames) * FRAME_SECONDS)
+
+    return asyncio.run(run())
+
+
+async def _filter_costs(frames: list[Frame], settings: Settings) -> dict[str, float]:
+    """Process CPU per second of audio that the NC and BVC filters add, timed on a track published
+    to a throwaway room (the filters need the room's credentials to run)."""
+    from livekit import api, rtc
+    from livekit.plugins import noise_cancellation
+
+    rate = frames[0].sample_rate
+    frames = [frame for frame in frames if frame.sample_rate == rate]
+    token = (
+        api.AccessToken(settings.livekit_api_key, settings.livekit_api_secret)
+        .with_identity("bench-audio-budget")
+        .with_grants(api.VideoGrants(room_join=True, room=f"bench-audio-budget-{os.getpid()}"))
+        .to_jwt()
+    )
+    room = rtc.Room()
+    await room.connect(settings.livekit_url, token)
+    try:
+        source = rtc.AudioSource(rate, 1)
+        track = rtc.LocalAudioTrack.create_audio_track("fixtures", source)
+        await room.local_participant.publish_track(track)
+        cpu: dict[str, float] = {}
+        for mode, options in (("off", None), ("nc", noise_cancellation.NC()), ("bvc", noise_cancellation.BVC())):
+            stream = rtc.AudioStream.from_track(track=track, sample_rate=rate, noise_cancellation=options)
+
+            async def drain() -> None:
+                async for _ in stream:
+                    pass
+
+            reader = asyncio.create_task(drain())
+            started = time.process_time()
+            for frame in frames:
+                samples = np.asarray(frame.data)
+                await source.capture_frame(rtc.AudioFrame(samples.tobytes(), rate, 1, len(samples)))
+            await source.wait_for_playout()
+            cpu[mode] = time.process_time() - started
+            reader.cancel()
+            await stream.aclose()
+        seconds = len(frames) * FRAME_SECONDS
+        return {
+            "audio_cost_nc": max(0.0, cpu["nc"] - cpu["off"]) / seconds,
+            "audio_cost_bvc": max(0.0, cpu["bvc"] - cpu["off"]) / seconds,
+        }
+    finally:
+        await room.disconnect()
+
+
+def _profiles(sessions: int, budget: float, tap: float, settings: Settings, snrs: list[float | None]) -> list[AudioProfile]:
+    """Each session's profile when session ``i`` has input SNR ``snrs[i % len(snrs)]``."""
+    by_session = {f"s{i:05d}": snrs[i % len(snrs)] for i in range(sessions)}
+    # The tap runs for every session, so it comes out of the budget before profiles are picked
+    shares = allocate(by_session, budget - tap * sessions, settings)
+    return [choose_profile(shares[key], settings, snr) for key, snr in by_session.items()]
+
+
+def _fit(budget: float, tap: float, settings: Settings, snrs: list[float | None]) -> tuple[int, Counter[str]]:
+    """Most sessions the budget holds, and the profiles they end up on."""
+    fitted, profiles = 0, Counter()
+    while True:
+        chosen = _profiles(fitted + 1, budget, tap, settings, snrs)
+        if sum(p.cost(settings) + tap for p in chosen) > budget:
+            return fitted, profiles
+        fitted, profiles = fitted + 1, Counter(p.name for p in chosen)
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav-dir", type=Path)
+    parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=settings.audio_cpu_budget)
+    parser.add_argument("--livekit", action="store_true", help="time NC and BVC in a room on LIVEKIT_URL")
+    args = parser.parse_args()
+
+    if args.wav_dir:
+        paths = sorted(args.wav_dir.glob("*.wav"))
+    else:
+        paths = generate_fixtures(Path(tempfile.mkdtemp(prefix="audio-fixtures-")))
+    if not paths:
+        raise SystemExit("no WAV fixtures found")
+
+    tap_costs = []
+    snrs: list[float | None] = []
+    print(
+        f"{'fixture':<16} {'seconds':>7} {'snr dB':>7} {'vad threshold':>13} {'min silence':>11}"
+        f" {'tap us/frame':>12} {'profile (ample)':>15} {'profile (tight)':>15}"
+    )
+    all_frames: list[Frame] = []
+    for path in paths:
+        frames = read_frames(path)
+        all_frames.extend(frames)
+        controller = SessionAudioController(path.stem, settings, sessions=1)
+        asyncio.run(_replay(controller, frames))
+        snr = controller.meter.snr()
+        snrs.append(snr)
+        tuning = vad_tuning(snr)
+        per_frame = controller.tap_seconds / max(1, len(frames))
+        tap_costs.append(per_frame / FRAME_SECONDS)
+        # Tight: a share that covers the NC model but not BVC
+        tight = choose_profile(STANDARD.cost(settings), settings, snr)
+        print(
+            f"{path.stem:<16} {len(frames) * FRAME_SECONDS:>7.1f} {snr if snr is not None else float('nan'):>7.1f}"
+            f" {tuning.activation_threshold:>13.2f} {tuning.min_silence_duration:>11.2f} {per_frame * 1e6:>12.1f}"
+            f" {choose_profile(float('inf'), settings, snr).name:>15} {tight.name:>15}"
+        )
+
+    overrides = {}
+    for rate, field in ((16000, "audio_cost_vad"), (8000, "audio_cost_vad_8k")):
+        measured = _vad_cost(all_frames, rate)
+        if measured is not None:
+            overrides[field] = measured
+    filters_measured = False
+    if args.livekit:
+        filters = asyncio.run(_filter_costs(all_frames, settings))
+        overrides.update(filters)
+        filters_measured = True
+    if overrides:
+        settings = settings.model_copy(update=overrides)
+    tap = max(tap_costs)
+    label = "" if filters_measured else " (estimate)"
+    print(f"\nmeasured costs: {overrides or 'silero not installed, using AUDIO_COST_* settings'}")
+    if not filters_measured:
+        print("NC and BVC costs are the AUDIO_COST_BVC/AUDIO_COST_NC settings, not measured; --livekit times them")
+    print(f"{'profile':<10} {'nc':>4} {'vad Hz':>7} {'cores/session':>13}")
+    for profile in (FULL, STANDARD, REDUCED, LIGHT, MINIMAL):
+        print(f"{profile.name:<10} {profile.noise_cancellation:>4} {profile.vad_sample_rate:>7} {profile.cost(settings):>13.4f}")
+
+    budget = args.budget * args.cores
+    before = int(budget // FULL.cost(settings))
+    by_snr, snr_profiles = _fit(budget, tap, settings, snrs)
+    noisy = [path.stem for path, snr in zip(paths, snrs) if snr is not None and snr < NOISY_SNR_DB]
+    print(f"\naudio budget {args.budget:.0%} of {args.cores} cores = {budget:.2f} cores (NC and VAD only)")
+    print(f"{'everyone on ' + FULL.name + label:<32} {before} sessions, {before / args.cores:.1f} per core")
+    print(
+        f"{'per-session profiles' + label:<32} {by_snr} sessions, {by_snr / args.cores:.1f} per core,"
+        f" {dict(snr_profiles)} (noisy: {', '.join(noisy) or 'none'}, floor {REDUCED.name})"
+    )
+    print("sessions with the fixtures mixed evenly -> profile per fixture")
+    for sessions in sorted({len(paths), before, (before + by_snr) // 2, by_snr} - {0}):
+        chosen = _profiles(sessions, budget, tap, settings, snrs)
+        mix = ", ".join(
+            f"{path.stem}={dict(Counter(p.name for p in chosen[i :: len(paths)]))}" for i, path in enumerate(paths)
+        )
+        print(f"  {sessions:>4}: {mix}")
+
+
+if __name__ == "__main__":
+    main()
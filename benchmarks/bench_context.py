@@ -0,0 +1,110 @@
+"""Prompt size and first-token latency as a helpline call grows, with and without compaction.
+
+Builds a synthetic call (questions, tool calls with bulky JSON results, replies)
+and, at each checkpoint, reports the estimated prompt tokens of the full history
+versus ``ContextCompactor`` output and how long compaction took. With
+``--base-url`` it also measures TTFT for both prompts; start the mock server with
+a prefill cost so longer prompts are slower, as they are on real providers:
+
+    python -m benchmarks.mock_openai_server --port 8900 --ttft-ms 150 --prefill-ms-per-1k 120 &
+    python -m benchmarks.bench_context --base-url http://127.0.0.1:8900/v1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput
+
+from app.agents.helpline_agent import HELPLINE_INSTRUCTIONS
+from app.context import ContextCompactor, estimate_tokens, item_text
+from app.instructions import session_facts
+
+CHECKPOINTS = (5, 10, 20, 40, 80, 160)
+
+BILL = {
+    "user_id": "u001",
+    "statement": [{"date": f"2024-05-{day:02d}", "merchant": f"Merchant {day}", "amount": day * 3.25} for day in range(1, 21)],
+    "due": "2024-06-12",
+    "total": 683.25,
+}
+
+
+def _add_turn(ctx: ChatContext, turn: int) -> None:
+    ctx.add_message(role="user", content=f"Question {turn}: can you check the charge from merchant {turn % 20} again?")
+    if turn % 3 == 0:
+        call_id = f"call_{turn}"
+        ctx.items.append(FunctionCall(call_id=call_id, name="get_user_bill", arguments='{"user_id": "u001"}'))
+        ctx.items.append(FunctionCallOutput(call_id=call_id, name="get_user_bill", output=json.dumps(BILL), is_error=False))
+    ctx.add_message(
+        role="assistant",
+        content=f"That charge from merchant {turn % 20} was {turn % 20 * 3.25:.2f} dollars on the statement. Anything else?",
+    )
+
+
+def _messages(ctx: ChatContext) -> list[dict[str, str]]:
+    messages = []
+    for item in ctx.items:
+        role = getattr(item, "role", None) or "assistant"
+        messages.append({"role": "system" if role == "developer" else role, "content": item_text(item)})
+    return messages
+
+
+async def _ttft(client, model: str, ctx: ChatContext) -> float:
+    started = time.perf_counter()
+    stream = await client.chat.completions.create(model=model, messages=_messages(ctx), stream=True)
+    ttft = None
+    async for _ in stream:
+        if ttft is None:
+            ttft = time.perf_counter() - started
+    return ttft if ttft is not None else time.perf_counter() - started
+
+
+async def _run(args: argparse.Namespace) -> None:
+    client = None
+    if args.base_url:
+        from openai import AsyncClient
+
+        client = AsyncClient(api_key="bench", base_url=args.base_url)
+
+    compactor = ContextCompactor(
+        budget_tokens=args.budget, keep_turns=args.keep_turns, tool_digest_chars=args.digest_chars
+    )
+    ctx = ChatContext.empty()
+    ctx.add_message(role="system", content=HELPLINE_INSTRUCTIONS)
+    ctx.add_message(role="system", content=session_facts("You're a human support specialist helping Sam.", "Their account ID is u001."))
+
+    print(f"{'turns':>5} {'full tok':>9} {'compact tok':>11} {'compact us':>10} {'full ttft':>10} {'compact ttft':>12}")
+    turn = 0
+    for checkpoint in CHECKPOINTS:
+        while turn < checkpoint:
+            turn += 1
+            _add_turn(ctx, turn)
+        started = time.perf_counter()
+        compacted = compactor.compact(ctx)
+        elapsed = time.perf_counter() - started
+        row = f"{turn:>5} {estimate_tokens(ctx.items):>9} {estimate_tokens(compacted.items):>11} {elapsed * 1e6:>10.0f}"
+        if client is not None:
+            full = await _ttft(client, args.model, ctx)
+            short = await _ttft(client, args.model, compacted)
+            row += f" {full * 1000:>8.0f}ms {short * 1000:>10.0f}ms"
+        print(row)
+
+    if client is not None:
+        await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="")
+    parser.add_argument("--model", default="mock")
+    parser.add_argument("--budget", type=int, default=2500)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--digest-chars", type=int, default=200)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-handoff cost: the agents' original hard-coded construction versus the compiled flow.
+
+The baseline path is what the tools did before the flow existed: build the
+session facts and call the next agent class directly (imported at module level,
+except ``end_session``'s function-local import of ``MultiAgent``). The flow path
+builds the same facts and goes through ``CompiledFlow.handoff``. Both construct a
+fresh agent, so the difference is the flow's lookup, not a saving: the flow is
+there for validation at prewarm and to take the cross-imports out of the agents.
+
+    python -m benchmarks.bench_flow --iterations 5000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from livekit.agents import Agent
+
+from app.agents.helpline_agent import HelplineAgent
+from app.agents.main_agent import MainAgent
+from app.flow import compile_flow
+from app.instructions import session_facts
+from app.state import SessionState
+
+USER_NAME = "Sam"
+USER_ID = "u001"
+
+
+def _main_facts() -> str:
+    return session_facts(
+        f"User {USER_NAME} is authenticated.",
+        f"Always use user_id '{USER_ID}' for all MCP calls.",
+        "Be helpful and conversational. No special formatting.",
+    )
+
+
+def _helpline_facts() -> str:
+    return session_facts(
+        f"You're a human support specialist helping {USER_NAME}.",
+        f"Their account ID is {USER_ID}.",
+        "Be helpful and professional. Talk naturally like a real person.",
+        "If they want to end the call, use the end_session function.",
+        "Never use special formatting or mention technical processes.",
+    )
+
+
+def _baseline_end_session() -> Agent:
+    from app.agents.multi_agent import MultiAgent
+
+    return MultiAgent(job_context=None, user_name=USER_NAME, user_id=USER_ID)
+
+
+BASELINE: list[Callable[[], Agent]] = [
+    lambda: MainAgent(job_context=None, session_info=_main_facts()),
+    lambda: HelplineAgent(job_context=None, session_info=_helpline_facts()),
+    _baseline_end_session,
+]
+
+
+def _time(handoffs: list[Callable[[], Agent]], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        handoffs[i % len(handoffs)]()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    flow = compile_flow()
+    print(f"compile_flow: {(time.perf_counter() - started) * 1000:.1f} ms (once per process)")
+
+    multi_agent = flow.create(SessionState.AUTHENTICATING, job_context=None, user_name=USER_NAME, user_id=USER_ID)
+    main_agent = flow.create(SessionState.MAIN, job_context=None)
+    helpline_agent = flow.create(SessionState.HELPLINE, job_context=None)
+    compiled: list[Callable[[], Agent]] = [
+        lambda: flow.handoff(multi_agent, "switch_to_main", job_context=None, session_info=_main_facts()),
+        lambda: flow.handoff(main_agent, "switch_to_helpline", job_context=None, session_info=_helpline_facts()),
+        lambda: flow.handoff(
+            helpline_agent, "end_session", job_context=None, user_name=USER_NAME, user_id=USER_ID
+        ),
+    ]
+
+    # Interleaved rounds, best of each, so warm-up and GC pauses don't land on one side
+    rounds = [(_time(BASELINE, args.iterations // 5), _time(compiled, args.iterations // 5)) for _ in range(5)]
+    baseline = min(r[0] for r in rounds)
+    flowed = min(r[1] for r in rounds)
+
+    print(f"baseline handoff {baseline * 1e6:8.1f} us")
+    print(f"flow handoff     {flowed * 1e6:8.1f} us  ({(flowed - baseline) * 1e6:+.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
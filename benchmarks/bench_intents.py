@@ -0,0 +1,134 @@
+"""Intent router: per-intent precision and coverage on labeled transcripts, and turn latency.
+
+Precision is the share of router answers for an intent that were right; coverage
+is the share of that intent's transcripts the router answered (the rest go to the
+LLM, which is always safe). Turn latency is measured, not modelled: a MainAgent
+session runs on the offline fakes (``benchmarks.fakes``) against the stub MCP
+server, and each lookup in ``TURNS`` is asked with the router on and off in
+alternating rounds, timed from the final transcript to the first agent audio.
+MainAgent prefetches the account on entry as it does live, so the router reads
+the prefetched results and only the LLM path calls the stub.
+The fake LLM's time to first token and the stub's tool latency set the scale, so
+compare the two paths rather than reading the absolute numbers.
+
+    python -m benchmarks.bench_intents --llm-ttft-ms 350 --mcp-ms 250
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from livekit.agents import AgentSession
+
+from app.agents.main_agent import MainAgent
+from app.config import get_settings
+from app.instructions import session_facts
+from app.intents import INTENTS, classify
+from app.mcp_server import CachedMCPServerHTTP
+from app.speech_chunker import chunked_tts
+from app.state import ConversationContext
+from benchmarks.fakes import FakeAudioOutput, FakeLatencies, FakeLLM, FakeTTS
+from benchmarks.load_test import TURN_TIMEOUT, _SessionProbe, _start_stub_mcp, _user_turn
+
+FIXTURE = Path(__file__).parent / "fixtures" / "intent_transcripts.jsonl"
+
+# Lookups both the router and the fake LLM's tool rules recognise
+TURNS = ["what's my bill", "what's my last login", "what's my contact info"]
+
+
+async def _measure_turns(mcp_url: str, latencies: FakeLatencies, rounds: int) -> dict[bool, list[float]]:
+    """Seconds from final transcript to first agent audio for each of ``TURNS``, by router on/off."""
+    settings = get_settings()
+    mcp_server = CachedMCPServerHTTP(url=mcp_url)
+    session = AgentSession(
+        llm=FakeLLM(latencies),
+        tts=chunked_tts(FakeTTS(latencies)),
+        userdata=ConversationContext(mcp_server=mcp_server, user_id="u001", user_name="Sam", is_authenticated=True),
+        mcp_servers=[mcp_server],
+    )
+    session.output.audio = FakeAudioOutput()
+    probe = _SessionProbe(session)
+    facts = session_facts("User Sam is authenticated.", "Always use user_id 'u001' for all MCP calls.")
+    timings: dict[bool, list[float]] = {True: [], False: []}
+    try:
+        await session.start(agent=MainAgent(job_context=None, session_info=facts))
+        await probe.settle()
+        for i in range(rounds * 2):
+            # Alternate which path goes first so drift in the stub or the loop hits both
+            router = i % 2 == 0
+            settings.intent_router = router
+            for text in TURNS:
+                probe.speaking.clear()
+                started = time.perf_counter()
+                await _user_turn(session, text)
+                await asyncio.wait_for(probe.speaking.wait(), TURN_TIMEOUT)
+                timings[router].append(time.perf_counter() - started)
+                # The reply's playback adds nothing to the comparison
+                session.interrupt()
+                await probe.settle()
+    finally:
+        await session.aclose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", type=Path, default=FIXTURE)
+    parser.add_argument("--llm-ttft-ms", type=float, default=350.0)
+    parser.add_argument("--mcp-ms", type=float, default=250.0, help="stub MCP server latency")
+    parser.add_argument("--mcp-port", type=int, default=8912)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    samples = [json.loads(line) for line in args.fixture.read_text().splitlines() if line.strip()]
+    labeled, predicted, correct = Counter(), Counter(), Counter()
+    false_answers = 0
+    for sample in samples:
+        intent = classify(sample["text"])
+        guess = intent.name if intent else None
+        if sample["intent"]:
+            labeled[sample["intent"]] += 1
+        if guess:
+            predicted[guess] += 1
+            if guess == sample["intent"]:
+                correct[guess] += 1
+            elif sample["intent"] is None:
+                false_answers += 1
+
+    print(f"{'intent':<12} {'precision':>9} {'coverage':>9} {'answered':>9}")
+    for intent in INTENTS:
+        name = intent.name
+        precision = correct[name] / predicted[name] if predicted[name] else 0.0
+        coverage = correct[name] / labeled[name] if labeled[name] else 0.0
+        print(f"{name:<12} {precision:>9.0%} {coverage:>9.0%} {predicted[name]:>4}/{labeled[name]:<4}")
+    unlabeled = sum(1 for sample in samples if sample["intent"] is None)
+    print(f"answered although the LLM was needed: {false_answers}/{unlabeled}")
+
+    timings = []
+    for _ in range(args.iterations):
+        for sample in samples:
+            started = time.perf_counter()
+            classify(sample["text"])
+            timings.append(time.perf_counter() - started)
+    print(f"classify p50 {statistics.median(timings) * 1e6:.0f} us")
+
+    stub = _start_stub_mcp(args.mcp_port, args.mcp_ms)
+    try:
+        turns = asyncio.run(
+            _measure_turns(f"http://127.0.0.1:{args.mcp_port}/sse", FakeLatencies(llm_ttft=args.llm_ttft_ms / 1000), args.rounds)
+        )
+    finally:
+        stub.terminate()
+    llm_p50, router_p50 = statistics.median(turns[False]) * 1000, statistics.median(turns[True]) * 1000
+    print(f"turn to first audio, {len(turns[True])} answered turns per path (fake LLM, stub MCP):")
+    print(f"  LLM path p50 {llm_p50:.0f} ms, router p50 {router_p50:.0f} ms, difference {llm_p50 - router_p50:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
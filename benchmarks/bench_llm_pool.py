@@ -0,0 +1,64 @@
+"""First-token latency of a fresh OpenAI client per session versus the shared pool.
+
+Start a server first (``python -m benchmarks.mock_openai_server``) or point
+``--base-url`` at a real OpenAI-compatible endpoint; TLS endpoints show the
+largest gain because the pooled client skips the handshake.
+
+    python -m benchmarks.bench_llm_pool --base-url http://127.0.0.1:8900/v1 --sessions 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai import AsyncClient
+
+from app.llm_pool import LLMClientRegistry
+
+MESSAGES = [{"role": "user", "content": "What is my bill?"}]
+
+
+async def _first_token(client: AsyncClient, model: str) -> float:
+    started = time.perf_counter()
+    stream = await client.chat.completions.create(model=model, messages=MESSAGES, stream=True)
+    ttft = None
+    async for _ in stream:
+        if ttft is None:
+            ttft = time.perf_counter() - started
+    return ttft if ttft is not None else time.perf_counter() - started
+
+
+async def _run(base_url: str, api_key: str, model: str, sessions: int) -> None:
+    fresh = []
+    for _ in range(sessions):
+        client = AsyncClient(api_key=api_key, base_url=base_url)
+        fresh.append(await _first_token(client, model))
+        await client.close()
+
+    registry = LLMClientRegistry()
+    pooled_client = AsyncClient(api_key=api_key, base_url=base_url, http_client=registry.http_client(base_url))
+    pooled = [await _first_token(pooled_client, model) for _ in range(sessions)]
+
+    for label, samples in (("fresh client", fresh), ("pooled client", pooled)):
+        print(
+            f"{label:<14} ttft median={statistics.median(samples) * 1000:7.1f} ms  "
+            f"max={max(samples) * 1000:7.1f} ms"
+        )
+    print("pool stats:", registry.stats())
+    await registry.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8900/v1")
+    parser.add_argument("--api-key", default="mock")
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_run(args.base_url, args.api_key, args.model, args.sessions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""RoutedLLM against two local mock endpoints whose latency and error rate change mid-run.
+
+Both mock servers run in-process. Each phase sends a series of requests through
+one ``RoutedLLM`` and reports TTFT percentiles, which endpoint won, and how
+often a hedge fired:
+
+    normal     both endpoints fast, primary slightly faster
+    slow       primary's TTFT jumps to --slow-ms; hedges and the EWMA move traffic
+    failing    primary returns 503s; the circuit breaker takes it out of rotation
+    recovered  primary is healthy again and wins back traffic once a probe measures it
+
+    python -m benchmarks.bench_llm_router --requests 40
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import uvicorn
+from livekit.agents.llm import ChatContext
+
+from app.config import get_settings
+from app.instrumentation import LatencyHistogram, get_latency_registry
+from app.llm_pool import LLMClientRegistry
+from app.llm_router import RoutedLLM, RouteEndpoint, router_stats
+from benchmarks.mock_openai_server import create_app
+
+PRIMARY_PORT = 8911
+BACKUP_PORT = 8912
+
+
+async def _serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server
+
+
+async def _one(router: RoutedLLM) -> tuple[float, str]:
+    ctx = ChatContext.empty()
+    ctx.add_message(role="user", content="What is my bill?")
+    wins = {name: health.wins for name, health in router.health.items()}
+    started = time.perf_counter()
+    ttft = None
+    async with router.chat(chat_ctx=ctx) as stream:
+        async for _ in stream:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+    winner = next((name for name, health in router.health.items() if health.wins > wins[name]), "-")
+    return ttft if ttft is not None else time.perf_counter() - started, winner
+
+
+def _hedges() -> int:
+    return sum(hist.count for (stage, _, _), hist in get_latency_registry().histograms.items() if stage == "llm_hedge_deadline")
+
+
+async def _phase(label: str, router: RoutedLLM, requests: int) -> None:
+    ttfts = LatencyHistogram()
+    winners: Counter[str] = Counter()
+    hedges = _hedges()
+    failed = 0
+    for _ in range(requests):
+        try:
+            ttft, winner = await _one(router)
+        except Exception:
+            failed += 1
+            continue
+        ttfts.record(ttft)
+        winners[winner] += 1
+    print(
+        f"{label:<10} p50={ttfts.quantile(0.5) * 1000:6.0f} ms  p95={ttfts.quantile(0.95) * 1000:6.0f} ms  "
+        f"hedges={_hedges() - hedges:<3} failed={failed:<3} winners={dict(winners)}"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    primary_app = create_app(ttft_ms=args.fast_ms, tokens_per_sec=200)
+    backup_app = create_app(ttft_ms=args.fast_ms * 1.5, tokens_per_sec=200)
+    servers = [await _serve(primary_app, PRIMARY_PORT), await _serve(backup_app, BACKUP_PORT)]
+
+    settings = get_settings().model_copy(update={"llm_breaker_cooldown": args.cooldown, "llm_http2": False})
+    registry = LLMClientRegistry(settings)
+    router = RoutedLLM(
+        [
+            RouteEndpoint("primary", f"http://127.0.0.1:{PRIMARY_PORT}/v1", "bench", "mock"),
+            RouteEndpoint("backup", f"http://127.0.0.1:{BACKUP_PORT}/v1", "bench", "mock"),
+        ],
+        registry=registry,
+        settings=settings,
+    )
+    try:
+        await _phase("normal", router, args.requests)
+        primary_app.state.ttft = args.slow_ms / 1000
+        await _phase("slow", router, args.requests)
+        primary_app.state.ttft = args.fast_ms / 1000
+        primary_app.state.error_rate = 1.0
+        await _phase("failing", router, args.requests)
+        primary_app.state.error_rate = 0.0
+        await asyncio.sleep(args.cooldown)
+        await _phase("recovered", router, args.requests)
+        print("endpoints:", router_stats())
+    finally:
+        await registry.aclose()
+        for server in servers:
+            server.should_exit = True
+        await asyncio.sleep(0.2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--fast-ms", type=float, default=120.0)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--cooldown", type=float, default=3.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Event-loop lag under concurrent sessions: legacy f-string logging vs app.log.
+
+The legacy mode reproduces the old HelplineAgent pattern: a dozen eagerly
+formatted ``logger.info("DEBUG - ...")`` lines per turn into a synchronous sink.
+The new mode uses ``app.log``: debug calls compiled out (or sampled with
+``--debug``) and a queue-backed JSON sink. Output goes to a temporary file in
+both cases.
+
+    python -m benchmarks.bench_logging --sessions 100 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+from app.instrumentation import LatencyHistogram
+
+TURN_INTERVAL = 0.05
+
+
+async def _legacy_session(index: int, stop: asyncio.Event) -> None:
+    userdata = {"user_name": f"Caller {index}", "user_id": f"u{index:03d}", "state": "HELPLINE"}
+    while not stop.is_set():
+        logger.info("DEBUG - HelplineAgent.on_enter() called")
+        logger.info(f"DEBUG - Session state set to: {userdata['state']}")
+        logger.info(f"DEBUG - Session userdata.user_name: '{userdata['user_name']}'")
+        logger.info(f"DEBUG - Session userdata.user_id: '{userdata['user_id']}'")
+        for step in range(8):
+            logger.info(f"DEBUG - step {step} for {userdata} completed")
+        await asyncio.sleep(TURN_INTERVAL)
+
+
+async def _structured_session(index: int, stop: asyncio.Event) -> None:
+    from app import log
+
+    log.bind_session(f"RM_{index:05d}", turn_id=lambda: 0)
+    userdata = {"user_name": f"Caller {index}", "user_id": f"u{index:03d}", "state": "HELPLINE"}
+    while not stop.is_set():
+        log.debug("HelplineAgent entered | user_id={}", lambda: userdata["user_id"])
+        for step in range(11):
+            log.sample_debug("step", "step {} completed | state={}", step, userdata["state"])
+        await asyncio.sleep(TURN_INTERVAL)
+
+
+async def _measure(session_fn, sessions: int, seconds: float) -> LatencyHistogram:
+    lag = LatencyHistogram()
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(session_fn(i, stop)) for i in range(sessions)]
+    deadline = time.perf_counter() + seconds
+    interval = 0.01
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag.record(max(0.0, time.perf_counter() - started - interval))
+    stop.set()
+    await asyncio.gather(*tasks)
+    return lag
+
+
+def _report(label: str, lag: LatencyHistogram) -> None:
+    print(
+        f"{label:<11} loop lag p50={lag.quantile(0.5) * 1000:6.2f} ms  p99={lag.quantile(0.99) * 1000:6.2f} ms  "
+        f"max={lag.max * 1000:6.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--debug", action="store_true", help="keep sampled debug records in the new mode")
+    args = parser.parse_args()
+
+    os.environ["LOG_LEVEL"] = "DEBUG" if args.debug else "INFO"
+    os.environ["LOG_JSON"] = "true"
+    from app import log
+
+    with tempfile.TemporaryFile("w") as out:
+        logger.remove()
+        logger.add(out, level="INFO")
+        _report("legacy", asyncio.run(_measure(_legacy_session, args.sessions, args.seconds)))
+
+        real_stderr, sys.stderr = sys.stderr, out
+        try:
+            log.configure_logging()
+            _report("structured", asyncio.run(_measure(_structured_session, args.sessions, args.seconds)))
+            logger.complete()
+            logger.remove()
+        finally:
+            sys.stderr = real_stderr
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Time-to-first-greeting for cold jobs versus jobs served from a prewarmed process.
+
+A cold job loads VAD, turn detector and noise cancellation itself (the old
+``entrypoint`` behaviour). A warm job reads them from ``proc.userdata`` filled
+by ``app.prewarm.prewarm``. The greeting itself is simulated with a fixed
+delay so the numbers isolate model setup.
+
+    python -m benchmarks.bench_prewarm --jobs 5 --greeting-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+from app.prewarm import MODEL_LOADERS, LOAD_REPORT_KEY, get_model, prewarm
+from app.procstats import format_bytes, rss_bytes
+
+
+async def _job(ctx: SimpleNamespace, greeting_delay: float) -> float:
+    started = time.perf_counter()
+    for name in MODEL_LOADERS:
+        get_model(ctx, name)
+    await asyncio.sleep(greeting_delay)
+    return time.perf_counter() - started
+
+
+async def _run(jobs: int, greeting_delay: float) -> None:
+    cold = []
+    for _ in range(jobs):
+        ctx = SimpleNamespace(proc=SimpleNamespace(userdata={}))
+        cold.append(await _job(ctx, greeting_delay))
+
+    proc = SimpleNamespace(userdata={})
+    prewarm(proc)
+    warm = []
+    for _ in range(jobs):
+        warm.append(await _job(SimpleNamespace(proc=proc), greeting_delay))
+
+    for load in proc.userdata[LOAD_REPORT_KEY]:
+        print(
+            f"{load.name:<20} load={load.seconds * 1000:8.1f} ms  "
+            f"rss+={format_bytes(load.rss_delta_bytes)}"
+        )
+    print(f"cold first greeting: median={statistics.median(cold) * 1000:8.1f} ms  max={max(cold) * 1000:8.1f} ms")
+    print(f"warm first greeting: median={statistics.median(warm) * 1000:8.1f} ms  max={max(warm) * 1000:8.1f} ms")
+    print(f"process rss: {format_bytes(rss_bytes())}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--greeting-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args.jobs, args.greeting_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
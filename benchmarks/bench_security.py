@@ -0,0 +1,77 @@
+"""Throughput of the sensitive-content checks: legacy substring scan vs the combined regex.
+
+Also reports the per-chunk cost of ``StreamingGuard`` over a token-sized stream,
+which is what runs on every LLM delta before TTS.
+
+    python -m benchmarks.bench_security --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+
+from app.security import SENSITIVE_KEYWORDS, StreamingGuard, contains_sensitive_request
+
+SAMPLES = [
+    "Can you tell me what my bill is for this month?",
+    "I was spinning around trying to find the login page yesterday.",
+    "What's my PIN, I forgot it again",
+    "Sure, I can help with that. Your last login was on Tuesday from the mobile app.",
+    "I'd like to speak to a specialist about a charge I don't recognise on my statement.",
+    "I can't share passwords or other secrets, but I can connect you to our helpline.",
+]
+
+RESPONSE = (
+    "Your bill for this month comes to forty two dollars and is due on the fifteenth. "
+    "I can't read out your PIN or password, but our specialists can help you reset them securely. "
+    "Is there anything else I can help you with today?"
+)
+
+
+def legacy_contains_sensitive_request(text: str) -> bool:
+    lowered = (text or "").lower()
+    return any(keyword in lowered for keyword in SENSITIVE_KEYWORDS)
+
+
+def _per_call(fn, texts: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (iterations * len(texts))
+
+
+def _stream_cost(chunks: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        guard = StreamingGuard()
+        for chunk in chunks:
+            guard.feed(chunk)
+        guard.flush()
+    return (time.perf_counter() - started) / (iterations * len(chunks))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    chars = sum(len(text) for text in SAMPLES) / len(SAMPLES)
+    for label, fn in (("legacy scan", legacy_contains_sensitive_request), ("combined re", contains_sensitive_request)):
+        seconds = _per_call(fn, SAMPLES, args.iterations)
+        print(f"{label:<12} {seconds * 1e6:6.2f} us/text  {chars / seconds / 1e6:7.1f} Mchar/s")
+
+    disagreements = [
+        text for text in SAMPLES if legacy_contains_sensitive_request(text) != contains_sensitive_request(text)
+    ]
+    for text in disagreements:
+        print(f"  differs (legacy={legacy_contains_sensitive_request(text)}): {text!r}")
+
+    chunks = re.findall(r"\S+\s*", RESPONSE)
+    per_chunk = _stream_cost(chunks, args.iterations // 10 or 1)
+    print(f"stream guard {per_chunk * 1e6:6.2f} us/chunk over {len(chunks)} token-sized chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Helpline semantic cache: hit rate on paraphrased FAQs, false hits, lookup cost.
+
+The cache is seeded with one phrasing per FAQ, then queried with paraphrases
+(which should hit the right answer), unrelated questions (which should miss)
+and personal questions (which must never reach the cache at all). Contrastive
+pairs seed one question and ask its near-opposite, which shares most of the
+wording but needs a different answer; every one of them must miss. Saved latency
+assumes each hit skips an LLM turn of ``--llm-ttft-ms``.
+
+    python -m benchmarks.bench_semantic_cache --threshold 0.85
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.semantic_cache import SemanticCache, is_cacheable_question
+
+FAQS = {
+    "How do I replace a lost card?": [
+        "how can I replace my lost card",
+        "I need to replace a lost debit card",
+        "replace lost card",
+    ],
+    "What are your branch opening hours?": [
+        "what are the branch hours",
+        "branch opening hours please",
+        "when are your branches open",
+    ],
+    "What is the daily transfer limit?": [
+        "whats the daily transfer limit",
+        "is there a daily limit on transfers",
+        "daily transfer limit",
+    ],
+    "How do I set up online banking?": [
+        "how can I set up online banking",
+        "setting up online banking",
+        "how do I get set up with online banking",
+    ],
+    "How long does an international transfer take?": [
+        "how long do international transfers take",
+        "international transfer how long",
+        "how long will an international transfer take to arrive",
+    ],
+}
+
+UNRELATED = [
+    "how do I close an account",
+    "can I get a mortgage",
+    "how do I report a stolen card",
+    "what's the daily withdrawal limit",
+    "do you have a branch in the city centre",
+    "how do I activate a new card",
+]
+
+# (seeded, asked): worded alike, answered differently
+CONTRASTIVE = [
+    ("How do I open a joint savings account?", "how do I close a joint savings account"),
+    ("Can I use my card at an ATM abroad?", "can I use my card at an ATM at home"),
+    ("What is the daily ATM limit on a premium account?", "what is the daily ATM limit on a student account"),
+    ("How do I open a business account?", "how do I close a business account"),
+    ("Can I pay by card online?", "can I pay by card without going online"),
+    ("How do I report a lost card?", "how do I report a stolen card"),
+    ("How do I freeze my card?", "how do I unfreeze my card"),
+    ("What is the monthly fee on a current account?", "what is the annual fee on a current account"),
+    ("Do you charge for transfers abroad?", "do you charge for transfers in the app"),
+    ("How do I increase my credit card limit?", "how do I decrease my credit card limit"),
+]
+
+PERSONAL = [
+    "what's my balance",
+    "when is my bill due",
+    "why was I charged twice",
+    "can you read me my PIN",
+    "send it to my email please",
+    "transfer 200 to my savings",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--llm-ttft-ms", type=float, default=350.0)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cache = SemanticCache(path=None, threshold=args.threshold)
+    for question in FAQS:
+        cache.put(question, f"answer: {question}", cost=args.llm_ttft_ms / 1000)
+
+    correct = wrong = missed = 0
+    for question, paraphrases in FAQS.items():
+        for paraphrase in paraphrases:
+            entry = cache.lookup(paraphrase)
+            if entry is None:
+                missed += 1
+            elif entry.question == question:
+                correct += 1
+            else:
+                wrong += 1
+    false_hits = sum(cache.lookup(question) is not None for question in UNRELATED)
+    contrastive_hits = 0
+    for seeded, asked in CONTRASTIVE:
+        contrast = SemanticCache(path=None, threshold=args.threshold)
+        contrast.put(seeded, f"answer: {seeded}", cost=args.llm_ttft_ms / 1000)
+        contrastive_hits += contrast.lookup(asked) is not None
+    leaked = sum(is_cacheable_question(question, ("Sam", "u001")) for question in PERSONAL)
+
+    paraphrases = [p for group in FAQS.values() for p in group]
+    lookups = []
+    for _ in range(args.iterations):
+        for paraphrase in paraphrases:
+            started = time.perf_counter()
+            cache.lookup(paraphrase)
+            lookups.append(time.perf_counter() - started)
+
+    total = sum(len(group) for group in FAQS.values())
+    print(f"paraphrase hits   {correct}/{total} ({correct / total:.0%}), wrong answer {wrong}, missed {missed}")
+    print(f"unrelated hits    {false_hits}/{len(UNRELATED)}")
+    print(f"contrastive hits  {contrastive_hits}/{len(CONTRASTIVE)} (must be 0)")
+    print(f"personal cachable {leaked}/{len(PERSONAL)}")
+    print(f"lookup p50 {statistics.median(lookups) * 1e6:.0f} us, saved per hit {args.llm_ttft_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
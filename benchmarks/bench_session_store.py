@@ -0,0 +1,109 @@
+"""Session snapshot size and save/load latency for each store backend.
+
+Encodes a realistic post-auth snapshot (session facts plus the caller's last
+dozen turns), compares its size with plain JSON and pickle, then times a
+save and a resume-time load against SQLite and the stub RESP server.
+
+    python -m benchmarks.bench_session_store --iterations 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import pickle
+import statistics
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from app.instructions import session_facts
+from app.session_store import (
+    RedisSessionStore,
+    SessionSnapshot,
+    SessionStore,
+    SQLiteSessionStore,
+    decode_snapshot,
+    encode_snapshot,
+)
+from app.state import SessionState
+from benchmarks.stub_resp_server import serve
+
+# Only the caller's turns are stored; the agent's replies quote account data
+TURNS = [
+    ("user", "what's my bill this month"),
+    ("user", "and when did I last log in"),
+    ("user", "can I talk to a person please"),
+    ("user", "it's about the charge on card ending ####"),
+]
+
+
+def _snapshot() -> SessionSnapshot:
+    return SessionSnapshot(
+        state=SessionState.HELPLINE,
+        user_id="u001",
+        user_name="John Carter",
+        authenticated_at=time.time(),
+        auth_attempts=1,
+        session_info=session_facts(
+            "You're a human support specialist helping John Carter.",
+            "Their account ID is u001.",
+            "Be helpful and professional. Talk naturally like a real person.",
+            "If they want to end the call, use the end_session function.",
+            "Never use special formatting or mention technical processes.",
+        ),
+        history=TURNS * 3,
+    )
+
+
+async def _time_store(name: str, store: SessionStore, blob: bytes, iterations: int) -> None:
+    saves, loads = [], []
+    for i in range(iterations):
+        key = f"bench:{i % 50}"
+        started = time.perf_counter()
+        await store.set(key, blob, ttl=60)
+        saves.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        assert decode_snapshot(await store.get(key) or b"") is not None
+        loads.append(time.perf_counter() - started)
+    await store.aclose()
+    print(
+        f"{name:<8} save p50 {statistics.median(saves) * 1000:6.2f} ms  "
+        f"load+decode p50 {statistics.median(loads) * 1000:6.2f} ms"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    snapshot = _snapshot()
+    blob = encode_snapshot(snapshot)
+    as_json = json.dumps({**asdict(snapshot), "state": snapshot.state.name}).encode()
+    print(f"encoded {len(blob)} B | json {len(as_json)} B | pickle {len(pickle.dumps(snapshot))} B")
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        decode_snapshot(encode_snapshot(snapshot))
+    print(f"encode+decode {(time.perf_counter() - started) / args.iterations * 1e6:.0f} us")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await _time_store("sqlite", SQLiteSessionStore(str(Path(tmp) / "sessions.db")), blob, args.iterations)
+
+    server = asyncio.create_task(serve("127.0.0.1", args.resp_port))
+    await asyncio.sleep(0.1)
+    try:
+        await _time_store("resp", RedisSessionStore(f"redis://127.0.0.1:{args.resp_port}/0"), blob, args.iterations)
+    finally:
+        # Let the server see the client's EOF before it is torn down
+        await asyncio.sleep(0.05)
+        server.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--resp-port", type=int, default=6390)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
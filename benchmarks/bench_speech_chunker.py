@@ -0,0 +1,114 @@
+"""Time to first and last audio: sentence tokenizers, a native TTS stream and the first-clause split.
+
+Agent-style responses are streamed word by word at the fake LLM's token rate; the
+clock runs from the first LLM token to the first and to the last synthesized frame.
+For an engine without streaming (``FakeTTS``), ``tts.StreamAdapter`` synthesizes
+every chunk of LiveKit's basic sentence tokenizer or of the speech chunker as its
+own request. For a streaming engine (``FakeStreamingTTS``, modelled on Deepgram's
+websocket, which holds text until the reply is flushed) the native stream is
+compared with ``chunked_tts``'s ``FirstClauseTTS``, which synthesizes only the
+first clause separately. Chunk counts and sizes show what the later chunks trade
+for prosody.
+
+    python -m benchmarks.bench_speech_chunker --tokens-per-sec 60 --tts-ttfb-ms 120
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import statistics
+import time
+from typing import Callable
+
+from livekit.agents import tokenize, tts
+
+from app.speech_chunker import FirstClauseTTS, SpeechChunkTokenizer
+from benchmarks.fakes import FakeLatencies, FakeStreamingTTS, FakeTTS
+
+RESPONSES = [
+    "Sure John, your current bill is $82.40 and it's due on March 3rd. "
+    "You can pay it in the app or at any branch. Is there anything else I can help with?",
+    "Of course, I'd be happy to help with that. Your last login was yesterday at 4:15 PM from your phone. "
+    "If that wasn't you, let me know and I'll connect you to our security team.",
+    "A replacement card usually arrives within five to seven business days, and you can freeze the old one "
+    "right away in the app. Would you like me to walk you through it?",
+    "Branches are open nine to five on weekdays and ten to two on Saturdays. "
+    "Transfers above $10,000 need a quick confirmation call from us.",
+]
+
+
+async def _audio_times(engine: tts.TTS, text: str, latencies: FakeLatencies) -> tuple[float, float]:
+    """Seconds from the first token to the first and to the last frame of ``text``."""
+    words = re.findall(r"\S+\s*", text)
+    stream = engine.stream()
+    started = time.perf_counter()
+
+    async def feed() -> None:
+        for word in words:
+            stream.push_text(word)
+            await asyncio.sleep(1 / latencies.llm_tokens_per_sec)
+        stream.end_input()
+
+    feeder = asyncio.create_task(feed())
+    first = last = None
+    try:
+        async for _ in stream:
+            last = time.perf_counter() - started
+            first = first if first is not None else last
+        if first is None:
+            raise RuntimeError("no audio")
+        return first, last
+    finally:
+        feeder.cancel()
+        await stream.aclose()
+        await engine.aclose()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    latencies = FakeLatencies(llm_tokens_per_sec=args.tokens_per_sec, tts_ttfb=args.tts_ttfb_ms / 1000)
+    basic, chunker = tokenize.basic.SentenceTokenizer(), SpeechChunkTokenizer()
+    # name -> (engine factory, tokenizer whose chunks become separate requests)
+    paths: dict[str, tuple[Callable[[], tts.TTS], tokenize.SentenceTokenizer | None]] = {
+        "basic": (lambda: tts.StreamAdapter(tts=FakeTTS(latencies), sentence_tokenizer=basic), basic),
+        "chunker": (lambda: tts.StreamAdapter(tts=FakeTTS(latencies), sentence_tokenizer=chunker), chunker),
+        "native": (lambda: FakeStreamingTTS(latencies), None),
+        "first-clause": (lambda: FirstClauseTTS(FakeStreamingTTS(latencies), chunker), None),
+    }
+    print(
+        f"{'path':<13} {'ttfa p50 ms':>12} {'ttfa max ms':>12} {'last p50 ms':>12} {'last max ms':>12}"
+        f" {'chunks':>7} {'first chars':>12} {'mean chars':>11}"
+    )
+    for name, (engine, tokenizer) in paths.items():
+        ttfa, ttla, counts, firsts, sizes = [], [], [], [], []
+        for _ in range(args.rounds):
+            for text in RESPONSES:
+                first, last = await _audio_times(engine(), text, latencies)
+                ttfa.append(first)
+                ttla.append(last)
+                if tokenizer is not None:
+                    chunks = tokenizer.tokenize(text)
+                    counts.append(len(chunks))
+                    firsts.append(len(chunks[0]))
+                    sizes.extend(len(chunk) for chunk in chunks)
+        chunk_columns = (
+            f"{statistics.mean(counts):>7.1f} {statistics.mean(firsts):>12.0f} {statistics.mean(sizes):>11.0f}"
+            if counts
+            else f"{'-':>7} {'-':>12} {'-':>11}"
+        )
+        print(
+            f"{name:<13} {statistics.median(ttfa) * 1000:>12.0f} {max(ttfa) * 1000:>12.0f}"
+            f" {statistics.median(ttla) * 1000:>12.0f} {max(ttla) * 1000:>12.0f} {chunk_columns}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--tts-ttfb-ms", type=float, default=120.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Exercise the MCP tool cache against the stub server and report counters.
+
+    python -m benchmarks.stub_mcp_server --port 8901 &
+    python -m benchmarks.bench_tool_cache --url http://127.0.0.1:8901/sse
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.mcp_server import CachedMCPServerHTTP, result_text
+from app.tool_cache import ToolCallCache
+
+TOOLS = ["get_user_info", "get_user_bill", "get_user_contact", "get_user_last_login"]
+
+
+async def _timed(server: CachedMCPServerHTTP, tool: str, user_id: str) -> float:
+    started = time.perf_counter()
+    await server.call_tool(tool, {"user_id": user_id})
+    return time.perf_counter() - started
+
+
+async def _run(url: str, user_id: str, concurrency: int) -> None:
+    cache = ToolCallCache({tool: 60.0 for tool in TOOLS})
+    server = CachedMCPServerHTTP(url=url, cache=cache)
+    await server.initialize()
+    try:
+        # Concurrent identical questions collapse into one backend call per tool
+        started = time.perf_counter()
+        await asyncio.gather(*(_timed(server, tool, user_id) for tool in TOOLS for _ in range(concurrency)))
+        print(f"cold burst of {len(TOOLS) * concurrency} calls: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        warm = await asyncio.gather(*(_timed(server, tool, user_id) for tool in TOOLS))
+        print(f"warm repeat: max {max(warm) * 1000:.2f} ms per call")
+
+        cache.invalidate_user(user_id)
+        after = await _timed(server, "get_user_bill", user_id)
+        print(f"after invalidate_user: {after * 1000:.1f} ms")
+
+        print("cache stats:", cache.stats.as_dict())
+        print("backend calls:", result_text(await server.call_tool("stub_call_counts", {})))
+    finally:
+        await server.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8901/sse")
+    parser.add_argument("--user-id", default="u001")
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_run(args.url, args.user_id, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Offline stand-ins for Deepgram STT/TTS and the OpenAI-compatible LLM.
+
+Latencies and token rates are configurable so the load test can model slow
+providers without touching the network. The MCP side uses
+``benchmarks.stub_mcp_server`` in a subprocess, so tool calls still go over HTTP.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from livekit import rtc
+from livekit.agents import APIConnectOptions, llm, tts
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+from livekit.agents.voice.io import AudioOutput, AudioOutputCapabilities
+
+_USER_ID_RE = re.compile(r"user_id\s*=?\s*'(\w+)'")
+_OTP_RE = re.compile(r"\b\d{4}\b")
+
+
+@dataclass
+class FakeLatencies:
+    stt_final: float = 0.15
+    llm_ttft: float = 0.35
+    llm_tokens_per_sec: float = 60.0
+    tts_ttfb: float = 0.12
+    # How many times faster than realtime the fake engine synthesizes audio
+    tts_speedup: float = 10.0
+
+
+def _tool_names(tools: list[Any]) -> set[str]:
+    names: set[str] = set()
+    for tool in tools:
+        if isinstance(tool, llm.Toolset):
+            # MCP servers arrive as toolsets wrapping their function tools
+            names |= _tool_names(list(tool.tools))
+        elif isinstance(tool, (llm.FunctionTool, llm.RawFunctionTool)):
+            names.add(tool.info.name)
+    return names
+
+
+class FakeLLM(llm.LLM):
+    """Rule-based LLM that picks tools the way the real prompts ask it to."""
+
+    def __init__(self, latencies: FakeLatencies) -> None:
+        super().__init__()
+        self.latencies = latencies
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: list[Any] | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        **kwargs: Any,
+    ) -> FakeLLMStream:
+        return FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class FakeLLMStream(llm.LLMStream):
+    def _plan(self) -> tuple[str, str | None, dict[str, Any]]:
+        tools = _tool_names(self._tools)
+        items = self._chat_ctx.items
+        instructions = " ".join(
+            item.text_content or "" for item in items if getattr(item, "role", None) == "system"
+        )
+        match = _USER_ID_RE.search(instructions)
+        user_id = match.group(1) if match else "u001"
+
+        last = items[-1] if items else None
+        if getattr(last, "type", None) == "function_call_output":
+            if last.name == "authenticate_user" and "true" in last.output.lower() and "switch_to_main" in tools:
+                return "", "switch_to_main", {}
+            return "Here is what I found on your account. Anything else?", None, {}
+
+        user_text = ""
+        for item in reversed(items):
+            if getattr(item, "role", None) == "user":
+                user_text = (item.text_content or "").lower()
+                break
+
+        if "authenticate_user" in tools and _OTP_RE.search(user_text):
+            return "", "authenticate_user", {"user_id": user_id, "otp": _OTP_RE.search(user_text).group(0)}
+        if "bye" in user_text and "end_session" in tools:
+            return "", "end_session", {}
+        if any(word in user_text for word in ("person", "human", "specialist")) and "switch_to_helpline" in tools:
+            return "", "switch_to_helpline", {}
+        for keyword, tool in (("bill", "get_user_bill"), ("login", "get_user_last_login"), ("contact", "get_user_contact")):
+            if keyword in user_text and tool in tools:
+                return "", tool, {"user_id": user_id}
+        return "Sure, I can help with that. Could you tell me a little more?", None, {}
+
+    async def _run(self) -> None:
+        text, tool, arguments = self._plan()
+        request_id = uuid.uuid4().hex
+        await asyncio.sleep(self._llm.latencies.llm_ttft)
+        if tool is not None:
+            call = llm.FunctionToolCall(name=tool, arguments=json.dumps(arguments), call_id=f"call_{request_id[:8]}")
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", tool_calls=[call]))
+            )
+            return
+
+        interval = 1 / self._llm.latencies.llm_tokens_per_sec
+        for i, word in enumerate(text.split(" ")):
+            if i:
+                await asyncio.sleep(interval)
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=(" " if i else "") + word))
+            )
+
+
+SAMPLE_RATE = 24000
+FRAME_MS = 20
+_SAMPLES_PER_FRAME = SAMPLE_RATE * FRAME_MS // 1000
+# Roughly 15 characters of speech per second
+_CHARS_PER_SECOND = 15
+
+
+_SILENT_FRAME = bytes(_SAMPLES_PER_FRAME * 2)
+
+
+class FakeTTS(tts.TTS):
+    def __init__(self, latencies: FakeLatencies) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.latencies = latencies
+
+    @property
+    def model(self) -> str:
+        return "fake-voice"
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> FakeChunkedStream:
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+async def _speak(text: str, latencies: FakeLatencies, output_emitter: tts.AudioEmitter) -> None:
+    """Push ``text``'s worth of silent frames at the fake engine's synthesis speed."""
+    frames = max(1, int(len(text) / _CHARS_PER_SECOND * 1000 / FRAME_MS))
+    pace = FRAME_MS / 1000 / latencies.tts_speedup if latencies.tts_speedup > 0 else 0
+    for _ in range(frames):
+        output_emitter.push(_SILENT_FRAME)
+        if pace:
+            await asyncio.sleep(pace)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        latencies = self._tts.latencies
+        await asyncio.sleep(latencies.tts_ttfb)
+        output_emitter.initialize(
+            request_id=uuid.uuid4().hex,
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+            frame_size_ms=FRAME_MS,
+        )
+        await _speak(self._input_text, latencies, output_emitter)
+        output_emitter.flush()
+
+
+class FakeStreamingTTS(FakeTTS):
+    """Modelled on Deepgram's websocket TTS: ``synthesize`` is one HTTP request per text, while
+    ``stream`` buffers text on an open connection until a flush and starts audio ``tts_ttfb`` later."""
+
+    def __init__(self, latencies: FakeLatencies) -> None:
+        super().__init__(latencies)
+        self._capabilities = tts.TTSCapabilities(streaming=True)
+
+    def stream(self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> FakeSynthesizeStream:
+        return FakeSynthesizeStream(tts=self, conn_options=conn_options)
+
+
+class FakeSynthesizeStream(tts.SynthesizeStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        latencies = self._tts.latencies
+        output_emitter.initialize(
+            request_id=uuid.uuid4().hex,
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+            frame_size_ms=FRAME_MS,
+            stream=True,
+        )
+        text = ""
+        async for data in self._input_ch:
+            if isinstance(data, str):
+                text += data
+                continue
+            if not text.strip():
+                continue
+            output_emitter.start_segment(segment_id=uuid.uuid4().hex)
+            self._mark_started()
+            await asyncio.sleep(latencies.tts_ttfb)
+            await _speak(text, latencies, output_emitter)
+            output_emitter.end_segment()
+            text = ""
+
+
+class FakeAudioOutput(AudioOutput):
+    """Plays frames out in real time without a room, so speech handles finish like they would live."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            label="FakeAudioOutput",
+            capabilities=AudioOutputCapabilities(pause=False),
+            next_in_chain=None,
+            sample_rate=SAMPLE_RATE,
+        )
+        self._pushed = 0.0
+        self._playout: asyncio.Task[None] | None = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if not self._pushed:
+            # The session only turns "speaking" once the sink reports the segment started
+            self.on_playback_started(created_at=time.time())
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        duration, self._pushed = self._pushed, 0.0
+        self._playout = asyncio.create_task(self._play(duration))
+
+    async def _play(self, duration: float) -> None:
+        await asyncio.sleep(duration)
+        self.on_playback_finished(playback_position=duration, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        if self._playout is not None and not self._playout.done():
+            self._playout.cancel()
+            self.on_playback_finished(playback_position=0.0, interrupted=True)
+        self._pushed = 0.0
+
+
+class FakeSTT:
+    """Final-transcript source: waits the configured STT latency, then yields the text."""
+
+    def __init__(self, latencies: FakeLatencies) -> None:
+        self.latencies = latencies
+
+    async def transcribe(self, text: str) -> str:
+        await asyncio.sleep(self.latencies.stt_final)
+        return text
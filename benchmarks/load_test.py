@@ -0,0 +1,213 @@
+"""Concurrent-session load test for one worker process, fully offline.
+
+Each simulated call walks the real agents through auth -> main -> helpline ->
+end_session with fake STT/LLM/TTS (``benchmarks.fakes``) and the stub MCP
+server. The number of simultaneous sessions is ramped and, per level, the
+harness reports event-loop lag, CPU, RSS per session and user-turn latency
+(final transcript to first agent audio) percentiles.
+
+    python -m benchmarks.load_test --levels 1,10,25,50 --llm-ttft-ms 350
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from livekit.agents import AgentSession, StopResponse
+from livekit.agents.llm import ChatMessage
+
+from app.agents import MultiAgent
+from app.instrumentation import LatencyHistogram
+from app.mcp_server import CachedMCPServerHTTP
+from app.procstats import format_bytes, rss_bytes
+from app.speech_chunker import chunked_tts
+from app.state import ConversationContext
+from benchmarks.fakes import FakeAudioOutput, FakeLatencies, FakeLLM, FakeSTT, FakeTTS
+
+# (user utterance, agent expected afterwards or None when it should not change)
+CALL_SCRIPT: list[tuple[str, str | None]] = [
+    ("one two three four", "MainAgent"),
+    ("what's my bill", None),
+    ("when did I last log in", None),
+    ("can I talk to a person please", "HelplineAgent"),
+    ("how do I replace a lost card", None),
+    ("that's all, thanks bye", None),
+]
+
+TURN_TIMEOUT = 30.0
+
+
+class _SessionProbe:
+    def __init__(self, session: AgentSession) -> None:
+        self.speaking = asyncio.Event()
+        self.state = "initializing"
+        session.on("agent_state_changed", self._on_state)
+
+    def _on_state(self, ev) -> None:
+        self.state = ev.new_state
+        if ev.new_state == "speaking":
+            self.speaking.set()
+
+    async def settle(self, quiet: float = 0.25) -> None:
+        """Wait for the agent to speak, then to stay listening for ``quiet`` seconds (handoffs speak twice)."""
+        await asyncio.wait_for(self.speaking.wait(), TURN_TIMEOUT)
+        deadline = time.perf_counter() + TURN_TIMEOUT
+        quiet_since = None
+        while time.perf_counter() < deadline:
+            if self.state == "listening":
+                quiet_since = quiet_since or time.perf_counter()
+                if time.perf_counter() - quiet_since >= quiet:
+                    return
+            else:
+                quiet_since = None
+            await asyncio.sleep(0.05)
+        raise TimeoutError("agent did not settle")
+
+
+async def _user_turn(session: AgentSession, text: str) -> None:
+    """Mimic the pipeline after STT: run the agent's turn hook, then generate a reply."""
+    agent = session.current_agent
+    message = ChatMessage(role="user", content=[text])
+    try:
+        await agent.on_user_turn_completed(agent.chat_ctx.copy(), message)
+    except StopResponse:
+        return
+    session.generate_reply(user_input=text)
+
+
+async def _run_call(index: int, mcp_url: str, latencies: FakeLatencies, turns: LatencyHistogram) -> None:
+    user_id = f"u{100 + index % 900:03d}"
+    mcp_server = CachedMCPServerHTTP(url=mcp_url)
+    session = AgentSession(
+        llm=FakeLLM(latencies),
+        tts=chunked_tts(FakeTTS(latencies)),
+        userdata=ConversationContext(mcp_server=mcp_server),
+        mcp_servers=[mcp_server],
+    )
+    session.output.audio = FakeAudioOutput()
+    probe = _SessionProbe(session)
+    stt = FakeSTT(latencies)
+    try:
+        await session.start(agent=MultiAgent(job_context=None, user_name=f"Caller {index}", user_id=user_id))
+        await probe.settle()
+        for utterance, expected_agent in CALL_SCRIPT:
+            transcript = await stt.transcribe(utterance)
+            probe.speaking.clear()
+            started = time.perf_counter()
+            await _user_turn(session, transcript)
+            await asyncio.wait_for(probe.speaking.wait(), TURN_TIMEOUT)
+            turns.record(time.perf_counter() - started)
+            await probe.settle()
+            if expected_agent and type(session.current_agent).__name__ != expected_agent:
+                print(f"call {index}: expected {expected_agent}, got {type(session.current_agent).__name__}", file=sys.stderr)
+    finally:
+        await session.aclose()
+
+
+@dataclass
+class LevelResult:
+    sessions: int
+    wall: float
+    cpu: float
+    rss_per_session: float
+    lag: LatencyHistogram
+    turns: LatencyHistogram
+    failures: int
+
+
+async def _run_level(sessions: int, mcp_url: str, latencies: FakeLatencies) -> LevelResult:
+    lag = LatencyHistogram()
+    turns = LatencyHistogram()
+    rss_before = rss_bytes()
+    peak_rss = rss_before
+    stop = asyncio.Event()
+
+    async def monitor() -> None:
+        nonlocal peak_rss
+        interval = 0.05
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag.record(max(0.0, time.perf_counter() - started - interval))
+            peak_rss = max(peak_rss, rss_bytes())
+
+    monitor_task = asyncio.create_task(monitor())
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_run_call(i, mcp_url, latencies, turns) for i in range(sessions)), return_exceptions=True
+    )
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    stop.set()
+    await monitor_task
+    failures = [r for r in results if isinstance(r, BaseException)]
+    for failure in failures[:3]:
+        print(f"session failed: {failure!r}", file=sys.stderr)
+    return LevelResult(sessions, wall, cpu, (peak_rss - rss_before) / sessions, lag, turns, len(failures))
+
+
+def _start_stub_mcp(port: int, latency_ms: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_mcp_server", "--port", str(port), "--latency-ms", str(latency_ms)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    time.sleep(1.5)
+    return process
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:7.1f}"
+
+
+async def _run(levels: list[int], mcp_url: str, latencies: FakeLatencies) -> None:
+    print(
+        "sessions  cpu%   rss/session   lag p50/p99 ms     turn p50/p95/p99 ms        failures"
+    )
+    for sessions in levels:
+        r = await _run_level(sessions, mcp_url, latencies)
+        print(
+            f"{r.sessions:8d} {r.cpu / r.wall * 100:5.0f}  {format_bytes(r.rss_per_session):>12}  "
+            f"{_ms(r.lag.quantile(0.5))}/{_ms(r.lag.quantile(0.99))}  "
+            f"{_ms(r.turns.quantile(0.5))}/{_ms(r.turns.quantile(0.95))}/{_ms(r.turns.quantile(0.99))}  "
+            f"{r.failures:8d}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,5,10,25,50")
+    parser.add_argument("--mcp-url", default="", help="use a running MCP server instead of the stub")
+    parser.add_argument("--mcp-port", type=int, default=8911)
+    parser.add_argument("--mcp-latency-ms", type=float, default=150.0)
+    parser.add_argument("--stt-ms", type=float, default=150.0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=350.0)
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--tts-ttfb-ms", type=float, default=120.0)
+    args = parser.parse_args()
+
+    latencies = FakeLatencies(
+        stt_final=args.stt_ms / 1000,
+        llm_ttft=args.llm_ttft_ms / 1000,
+        llm_tokens_per_sec=args.llm_tokens_per_sec,
+        tts_ttfb=args.tts_ttfb_ms / 1000,
+    )
+    stub = None
+    mcp_url = args.mcp_url
+    if not mcp_url:
+        stub = _start_stub_mcp(args.mcp_port, args.mcp_latency_ms)
+        mcp_url = f"http://127.0.0.1:{args.mcp_port}/sse"
+    try:
+        asyncio.run(_run([int(level) for level in args.levels.split(",")], mcp_url, latencies))
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Local OpenAI-compatible chat completions server with configurable latency.
+
+    python -m benchmarks.mock_openai_server --port 8900 --ttft-ms 200 --tokens-per-sec 40
+
+``--prefill-ms-per-1k`` adds first-token delay proportional to prompt size, the
+way real providers spend longer on prefill for longer prompts. ``--error-rate``
+answers that fraction of requests with a 503. Both ``app.state.ttft`` and
+``app.state.error_rate`` can be changed while the server runs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_REPLY = "Sure, your current bill is forty five dollars and it is due on the twelfth."
+
+
+def _prompt_tokens(messages: list[dict]) -> int:
+    return sum(len(str(message.get("content") or "")) // 4 + 4 for message in messages)
+
+
+def create_app(
+    ttft_ms: float = 200.0,
+    tokens_per_sec: float = 40.0,
+    reply: str = DEFAULT_REPLY,
+    prefill_ms_per_1k: float = 0.0,
+    error_rate: float = 0.0,
+) -> FastAPI:
+    app = FastAPI()
+    app.state.ttft = ttft_ms / 1000
+    app.state.prefill = prefill_ms_per_1k / 1000 / 1000
+    app.state.error_rate = error_rate
+    app.state.token_interval = 1 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+    app.state.reply = reply
+    app.state.requests = 0
+
+    def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str | None = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if app.state.error_rate and random.random() < app.state.error_rate:
+            return JSONResponse({"error": {"message": "mock overloaded"}}, status_code=503)
+        model = body.get("model", "mock")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        # Per-request override so one server can emulate a slow endpoint in tests
+        ttft = float(request.headers.get("x-mock-ttft-ms", app.state.ttft * 1000)) / 1000
+        prompt_tokens = _prompt_tokens(body.get("messages", []))
+        ttft += app.state.prefill * prompt_tokens
+        words = app.state.reply.split(" ")
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft + app.state.token_interval * len(words))
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": app.state.reply},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(words),
+                        "total_tokens": prompt_tokens + len(words),
+                    },
+                }
+            )
+
+        async def stream():
+            await asyncio.sleep(ttft)
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                yield _chunk(completion_id, model, {"content": word if i == 0 else " " + word})
+                if app.state.token_interval:
+                    await asyncio.sleep(app.state.token_interval)
+            yield _chunk(completion_id, model, {}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_app(
+        args.ttft_ms, args.tokens_per_sec, prefill_ms_per_1k=args.prefill_ms_per_1k, error_rate=args.error_rate
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Local stand-in for the account MCP server with configurable per-call latency.
+
+Serves the same tool names the agents use, over SSE at ``http://HOST:PORT/sse``.
+
+    python -m benchmarks.stub_mcp_server --port 8901 --latency-ms 250
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+from collections import Counter
+
+from mcp.server.fastmcp import FastMCP
+
+USERS = {
+    "u001": {
+        "name": "John Carter",
+        "otp": "1234",
+        "email": "john.carter@example.com",
+        "phone": "+1 555 0101",
+        "bill": {"amount": 45.20, "currency": "USD", "due_date": "2026-11-12"},
+        "last_login": "2026-10-15T08:42:00Z",
+    },
+    "u002": {
+        "name": "Priya Nair",
+        "otp": "4321",
+        "email": "priya.nair@example.com",
+        "phone": "+1 555 0102",
+        "bill": {"amount": 120.00, "currency": "USD", "due_date": "2026-11-03"},
+        "last_login": "2026-10-16T19:05:00Z",
+    },
+}
+
+
+_SYNTHETIC_ID = re.compile(r"^u\d{3}$")
+
+
+def _synthetic_user(user_id: str) -> dict | None:
+    """Any other well-formed id gets generated data, so load tests can use one id per session."""
+    if not _SYNTHETIC_ID.match(user_id):
+        return None
+    n = int(user_id[1:])
+    return {
+        "name": f"Test User {n}",
+        "otp": "1234",
+        "email": f"user{n}@example.com",
+        "phone": f"+1 555 {n:04d}",
+        "bill": {"amount": 10.0 + n, "currency": "USD", "due_date": "2026-11-20"},
+        "last_login": "2026-10-16T12:00:00Z",
+    }
+
+
+def create_server(latency_ms: float = 250.0, host: str = "127.0.0.1", port: int = 8901) -> FastMCP:
+    server = FastMCP("stub-bank", host=host, port=port)
+    latency = latency_ms / 1000
+    calls: Counter[str] = Counter()
+
+    async def _lookup(tool: str, user_id: str) -> dict:
+        calls[tool] += 1
+        await asyncio.sleep(latency)
+        user = USERS.get(user_id.strip()) or _synthetic_user(user_id.strip())
+        if user is None:
+            raise ValueError(f"Unknown user_id {user_id!r}")
+        return user
+
+    @server.tool()
+    async def authenticate_user(user_id: str, otp: str) -> str:
+        """Verify the 4-digit OTP for a user."""
+        user = await _lookup("authenticate_user", user_id)
+        ok = user["otp"] == otp.strip()
+        return json.dumps({"success": ok, "message": "Authentication successful" if ok else "Invalid OTP"})
+
+    @server.tool()
+    async def get_user_info(user_id: str) -> str:
+        """Profile details for the user."""
+        user = await _lookup("get_user_info", user_id)
+        return json.dumps({"user_id": user_id, "name": user["name"]})
+
+    @server.tool()
+    async def get_user_bill(user_id: str) -> str:
+        """Current bill for the user."""
+        user = await _lookup("get_user_bill", user_id)
+        return json.dumps(user["bill"])
+
+    @server.tool()
+    async def get_user_contact(user_id: str) -> str:
+        """Contact details on file."""
+        user = await _lookup("get_user_contact", user_id)
+        return json.dumps({"email": user["email"], "phone": user["phone"]})
+
+    @server.tool()
+    async def get_user_last_login(user_id: str) -> str:
+        """Most recent login timestamp."""
+        user = await _lookup("get_user_last_login", user_id)
+        return json.dumps({"last_login": user["last_login"]})
+
+    @server.tool()
+    async def stub_call_counts() -> str:
+        """Number of backend calls served per tool, for benchmarks."""
+        return json.dumps(dict(calls))
+
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    create_server(args.latency_ms, args.host, args.port).run(transport="sse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Local stand-in for Redis: GET, SET (with EX/PX), DEL, PING, AUTH and SELECT over RESP.
+
+Enough for ``SESSION_STORE_URL=redis://127.0.0.1:6390`` in local runs and the
+session store benchmark; keys live in memory and expire lazily.
+
+    python -m benchmarks.stub_resp_server --port 6390
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+_data: dict[bytes, tuple[bytes, float | None]] = {}
+
+
+def _bulk(value: bytes | None) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _command(args: list[bytes]) -> bytes:
+    name = args[0].upper()
+    if name == b"PING":
+        return b"+PONG\r\n"
+    if name in (b"AUTH", b"SELECT"):
+        return b"+OK\r\n"
+    if name == b"GET" and len(args) == 2:
+        entry = _data.get(args[1])
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            _data.pop(args[1], None)
+            entry = None
+        return _bulk(entry[0] if entry else None)
+    if name == b"SET" and len(args) >= 3:
+        expires_at = None
+        options = [arg.upper() for arg in args[3:]]
+        for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+            if unit in options:
+                expires_at = time.monotonic() + float(args[3 + options.index(unit) + 1]) * scale
+        _data[args[1]] = (args[2], expires_at)
+        return b"+OK\r\n"
+    if name == b"DEL":
+        return b":%d\r\n" % sum(_data.pop(key, None) is not None for key in args[1:])
+    return b"-ERR unsupported command '%s'\r\n" % name.lower()
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while line := await reader.readline():
+            if not line.startswith(b"*"):
+                writer.write(b"-ERR inline commands are not supported\r\n")
+                break
+            args = []
+            for _ in range(int(line[1:])):
+                length = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(length + 2))[:-2])
+            writer.write(_command(args))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(_handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
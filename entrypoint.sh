@@ -13,17 +13,7 @@ export PYTHONPATH=/home/user/app:$PYTHONPATH
 # Run download-files
 python worker.py download-files
 
-# Function to cleanup background processes on exit
-cleanup() {
-    echo "Stopping processes..."
-    kill $WORKER_PID 2>/dev/null || true
-    exit
-}
-trap cleanup SIGTERM SIGINT
-
-# Start worker in background and capture PID
-python worker.py start &
-WORKER_PID=$!
-
-# Start health server in foreground (this will keep the script running)
-python health.py
+# Replace the shell with the worker so it receives SIGTERM directly: LiveKit stops
+# taking jobs, drains active calls and /readyz reports draining meanwhile.
+# Health probes (/livez, /readyz, /metrics) are served by the worker on HEALTH_PORT.
+exec python worker.py start
@@ -1,12 +1,10 @@
 # health.py
-from fastapi import FastAPI
-import uvicorn, os
+# Standalone health server for local runs. In production `python worker.py start`
+# serves the same routes from inside the worker; without a worker attached here,
+# liveness and drain state are not reported.
+import asyncio
 
-app = FastAPI()
-
-@app.get("/")
-def ok():
-    return {"status": "ok"}
+from app.health_server import HealthServer
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=2000)
+    asyncio.run(HealthServer().serve_forever())
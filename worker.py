@@ -1,88 +1,186 @@
 from __future__ import annotations
 
-import os
 import asyncio
+import functools
 import json
+import sys
 from dotenv import load_dotenv
 from loguru import logger
-from openai import AsyncClient
-
 from livekit.agents import (
     JobContext,
     WorkerOptions,
     cli,
     AgentSession,
-    RoomInputOptions,
+    room_io,
 )
-from livekit.agents import mcp  # import as mcp for clarity
-from livekit.plugins import deepgram, openai, silero, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from app.capacity import CapacityGate, ensure_monitor, session_started
+from app.config import get_settings
+from app.instrumentation import SessionInstrumentation, ensure_publisher, flush_snapshot
+from app.llm_pool import get_llm_registry
+from app.llm_router import RoutedLLM, build_llm
+from app.log import bind_session, configure_logging
+from app.plugins import DOWNLOAD_PLUGINS, load_plugin, preload_plugins
+from app.security import TranscriptGuard
 from app.state import ConversationContext
-from app.agents import MultiAgent
+from app.prewarm import (
+    NOISE_CANCELLATION_KEY,
+    TURN_DETECTOR_KEY,
+    VAD_KEY,
+    get_model,
+    prewarm,
+)
 
 
+# Nothing reads the settings at import; the first get_settings() call, below, caches them
 load_dotenv()
+configure_logging()
 
 
 async def entrypoint(ctx: JobContext) -> None:
+    # Imported here rather than at module load so the supervisor and download-files stay light
+    from app.audio_budget import SessionAudioController
+    from app.flow import get_flow
+    from app.mcp_server import CachedMCPServerHTTP
+    from app.session_store import (
+        SessionSnapshotter,
+        build_resumed_agent,
+        get_session_store,
+        load_resumable,
+        publish_resume_token,
+        session_key,
+    )
+    from app.speech_chunker import chunked_tts
+
+    deepgram = load_plugin("deepgram")
+
     await ctx.connect()
 
     participant = await ctx.wait_for_participant()
-    logger.info(f"Participant metadata: {participant.metadata}")
 
     user_name = None
     user_id = None
+    resume_token = None
 
     if participant.metadata:
         try:
             metadata = json.loads(participant.metadata)
-            logger.info(f"Participant metadata loaded: {metadata}")
+            logger.debug("Participant metadata keys: {}", sorted(metadata))
 
             user_name = metadata.get("userName", "").strip()
             user_id = metadata.get("userId", "").strip()
+            resume_token = metadata.get("resumeToken", "").strip() or None
 
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse participant metadata: {e}")
+            logger.error("Failed to parse participant metadata: {}", e)
             metadata = {}
 
-    logger.info(f"Room '{ctx.room.name}' is ready to accept connections")
-    logger.info(f"Room SID: {ctx.room.sid}")
-    print("User name:", user_name)
-    print("User ID:", user_id)
-
-    # Build LLM using AsyncClient (e.g., NVIDIA via OpenAI-compatible endpoint)
-    llm_api_key = os.getenv("LLM_API_KEY", "").strip()
-    llm_base_url = os.getenv("LLM_BASE_URL", "").strip()
-    llm_model = os.getenv("LLM_MODEL_NAME", "gpt-4o-mini").strip()
-
-    print("LLM Model Name:", llm_model)
-
-    openai_client = AsyncClient(api_key=llm_api_key, base_url=llm_base_url)
-    llm = openai.LLM(client=openai_client, model=llm_model)
+    # Room.sid is resolved asynchronously once the server assigns it
+    room_sid = await ctx.room.sid
+    bind_session(room_sid)
+    logger.info("Room {} is ready to accept connections | user_id={}", ctx.room.name, user_id)
+
+    # Reuse the process-wide OpenAI-compatible clients so keep-alive connections survive across jobs;
+    # with OpenRouter configured too, requests are routed and hedged across both
+    settings = get_settings()
+    llm_registry = get_llm_registry()
+    llm_registry.close_on_shutdown()
+    # Report this process's loop lag, CPU and sessions for load-based job admission
+    ensure_monitor()
+    ctx.add_shutdown_callback(session_started())
+    llm = build_llm(settings, llm_registry)
+    logger.info("Using LLM model {} | routed={}", llm.model, isinstance(llm, RoutedLLM))
 
     # Register MCP server(s) so the LLM can choose tools directly
-    mcp_url = os.getenv("MCP_SERVER_URL", "").strip()
+    mcp_url = settings.mcp_server_url
+    mcp_server = CachedMCPServerHTTP(url=mcp_url) if mcp_url else None
+
+    # Noise cancellation and VAD sized to this session's share of the host's audio CPU budget and
+    # to the caller's input SNR
+    audio_controller = SessionAudioController(room_sid, settings)
+    vad, noise_cancellation = audio_controller.models(
+        get_model(ctx, VAD_KEY), get_model(ctx, NOISE_CANCELLATION_KEY), ctx.proc.userdata
+    )
+    ctx.add_shutdown_callback(audio_controller.start(participant).aclose)
 
     session = AgentSession(
-        vad=silero.VAD.load(),
+        vad=vad,
         stt=deepgram.STT(model="nova-3", language="en"),
         llm=llm,
-        tts=deepgram.TTS(model="aura-asteria-en"),
-        userdata=ConversationContext(),
-        turn_detection=MultilingualModel(),
-        mcp_servers=([mcp.MCPServerHTTP(url=mcp_url)] if mcp_url else []),
+        # Text reaches TTS in chunks sized for first-audio latency, with numbers in spoken form
+        tts=chunked_tts(deepgram.TTS(model="aura-asteria-en"), settings),
+        userdata=ConversationContext(mcp_server=mcp_server, audio_controller=audio_controller),
+        turn_detection=get_model(ctx, TURN_DETECTOR_KEY),
+        mcp_servers=([mcp_server] if mcp_server else []),
     )
 
+    # Flag requests for secrets from interim transcripts, before the turn is even committed
+    transcript_guard = TranscriptGuard(user_id=lambda: session.userdata.user_id)
+    session.on("user_input_transcribed", transcript_guard.on_transcribed)
+
+    if settings.metrics_enabled:
+        instrumentation = SessionInstrumentation(session, room_sid=room_sid).attach()
+        bind_session(room_sid, turn_id=lambda: instrumentation.turn_id)
+        ensure_publisher()
+        ctx.add_shutdown_callback(flush_snapshot)
+
+    # A caller back within the auth window, holding the resume token issued at OTP success,
+    # skips the OTP and returns to the agent they were with
+    agent = None
+    store = get_session_store()
+    if store is not None:
+        key = session_key(resume_token) if resume_token else None
+        snapshot = await load_resumable(store, key, user_id, settings) if key else None
+        if snapshot is not None:
+            agent = await build_resumed_agent(snapshot, session.userdata, job_context=ctx)
+            logger.info("Resuming session | user_id={} state={}", snapshot.user_id, snapshot.state.name)
+        else:
+            key = None
+        SessionSnapshotter(
+            session,
+            store,
+            key,
+            functools.partial(publish_resume_token, ctx.room, participant.identity),
+            settings,
+        ).attach()
+    if agent is None:
+        agent = get_flow().create(get_flow().entry, job_context=ctx, user_name=user_name, user_id=user_id)
+
     await session.start(
-        agent=MultiAgent(job_context=ctx, user_name=user_name, user_id=user_id),
+        agent=agent,
         room=ctx.room,
-        room_input_options=RoomInputOptions(
-            text_enabled=True,
-            noise_cancellation=noise_cancellation.BVC(),
+        room_options=room_io.RoomOptions(
+            text_input=True,
+            audio_input=room_io.AudioInputOptions(
+                noise_cancellation=noise_cancellation,
+                # A selector turns AGC on by default; keep it off as with the filter passed directly
+                auto_gain_control=False,
+            ),
         ),
     )
+    audio_controller.attach(session)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    if sys.argv[1:2] == ["profile-startup"]:
+        from app.startup_profile import main as profile_startup
+
+        sys.exit(profile_startup(sys.argv[2:]))
+    if sys.argv[1:2] == ["download-files"]:
+        # Plugins register their downloadable files on import
+        preload_plugins(DOWNLOAD_PLUGINS)
+    capacity = CapacityGate()
+    if sys.argv[1:2] == ["start"]:
+        # Probes live in the worker so they see its drain state and loop heartbeat
+        from app.health_server import HealthServer
+
+        HealthServer(capacity).start_in_thread()
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            load_fnc=capacity.load_fnc,
+            load_threshold=capacity.settings.capacity_load_threshold,
+            request_fnc=capacity.request_fnc,
+        )
+    )